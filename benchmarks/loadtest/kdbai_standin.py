@@ -0,0 +1,299 @@
+"""
+Offline stand-in for a KDB.AI server, serving the REST API the MCP server uses from in-memory tables.
+
+The 'default' database holds a 'documents' table of synthetic passages with a dense index on
+hash embeddings and a sparse index on hashed word counts, computed with the deterministic 'hash'
+embedding provider, so searches through the MCP server return sensible neighbours without any
+model or network access. Query and search implement filters, sort, group by, aggregations and
+limits in pandas; search scores by brute force. Answers are deterministic for a given --seed.
+
+    uv run python benchmarks/loadtest/kdbai_standin.py --rows 20000 --latency-ms 2
+
+Start the MCP server against it in REST mode:
+
+    uv run mcp-server --db.mode rest --db.port 8081 \\
+        --db.embedding-csv-path benchmarks/loadtest/embeddings.csv
+"""
+
+import argparse
+import fnmatch
+import json
+import sys
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--host", default="127.0.0.1")
+parser.add_argument("--port", type=int, default=8081)
+parser.add_argument("--rows", type=int, default=10000, help="rows of the documents table")
+parser.add_argument("--dims", type=int, default=64, help="dimension of the dense vectors, matches the 'hash-<dims>' model")
+parser.add_argument("--latency-ms", type=float, default=0.0, help="added latency of every query and search")
+parser.add_argument("--seed", type=int, default=0)
+args = parser.parse_args()
+# The server settings parse the command line on import
+sys.argv = sys.argv[:1]
+
+from kdbai_client.utils import kx  # noqa: E402
+from mcp_server.utils.embeddings import HashProvider  # noqa: E402
+
+DATABASE = "default"
+TABLE = "documents"
+VERSION = {"serverVersion": "dev", "clientMinVersion": "1.0.0", "clientMaxVersion": "latest"}
+
+_WORDS = ("market price trade order volume risk bond equity yield rate curve option future swap credit "
+          "index sensor device reading alert signal weather storm rain wind energy power grid battery "
+          "solar carbon vector search model embedding query latency memory cluster node replica shard").split()
+_CATEGORIES = ["finance", "iot", "energy", "search"]
+
+
+class StandinTable:
+    def __init__(self, name: str, df: pd.DataFrame, schema: List[Dict[str, Any]], indexes: List[Dict[str, Any]]):
+        self.name = name
+        self.df = df
+        self.schema = schema
+        self.indexes = indexes
+        self.dense = {i["name"]: np.stack(df[i["column"]].to_numpy()) for i in indexes if i["type"] == "flat"}
+
+    def meta(self) -> Dict[str, Any]:
+        return {"table": self.name, "schema": self.schema, "index": self.indexes}
+
+    def info(self) -> Dict[str, Any]:
+        return {"name": self.name, "rowCount": len(self.df), "columns": len(self.schema)}
+
+
+def make_documents(rows: int, dims: int, seed: int) -> StandinTable:
+    rng = np.random.default_rng(seed)
+    words = rng.choice(_WORDS, size=(rows, 12))
+    texts = [" ".join(w) for w in words]
+    provider = HashProvider()
+    token_ids = [provider._token_ids(text) for text in texts]
+    df = pd.DataFrame({
+        "id": [f"doc-{i:07d}" for i in range(rows)],
+        "category": rng.choice(_CATEGORIES, size=rows).astype(object),
+        "price": np.round(rng.gamma(2.0, 50.0, size=rows), 2),
+        "published": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 365 * 86400, size=rows)), unit="s"),
+        "text": [text.encode("utf-8") for text in texts],
+        "embedding": list(provider._encode(texts, f"hash-{dims}")),
+        "sparse": [dict(Counter(token_id & 0x7fffffff for token_id in ids)) for ids in token_ids],
+    })
+    schema = [
+        {"name": "id", "type": "symbol", "attributes": ""},
+        {"name": "category", "type": "symbol", "attributes": ""},
+        {"name": "price", "type": "float", "attributes": ""},
+        {"name": "published", "type": "timestamp", "attributes": ""},
+        {"name": "text", "type": "chars", "attributes": ""},
+        {"name": "embedding", "type": "reals", "attributes": ""},
+        {"name": "sparse", "type": "", "attributes": ""},
+    ]
+    indexes = [
+        {"name": "dense_index", "column": "embedding", "type": "flat", "params": {"dims": dims, "metric": "CS"}},
+        {"name": "sparse_index", "column": "sparse", "type": "bm25", "params": {"k": 1.25, "b": 0.75}},
+    ]
+    return StandinTable(TABLE, df, schema, indexes)
+
+
+# ---- Query semantics ----
+
+def _value(df: pd.DataFrame, column: str, value: Any) -> Any:
+    if pd.api.types.is_datetime64_any_dtype(df[column]):
+        return pd.to_datetime(value)
+    return value
+
+
+def _mask(df: pd.DataFrame, clause: List[Any]) -> pd.Series:
+    op = clause[0]
+    if op == "and":
+        return np.logical_and.reduce([_mask(df, c) for c in clause[1:]])
+    if op == "or":
+        return np.logical_or.reduce([_mask(df, c) for c in clause[1:]])
+    if op == "not":
+        return ~_mask(df, clause[1])
+    column, value = clause[1], clause[2]
+    col = df[column]
+    if op == "in":
+        return col.isin([_value(df, column, v) for v in value])
+    if op == "within":
+        lo, hi = (_value(df, column, v) for v in value)
+        return (col >= lo) & (col <= hi)
+    if op == "like":
+        pattern = value.decode() if isinstance(value, bytes) else value
+        text = col.map(lambda v: v.decode() if isinstance(v, bytes) else str(v))
+        return text.map(lambda v: fnmatch.fnmatchcase(v, pattern))
+    value = _value(df, column, value)
+    comparisons = {"=": col.eq, "<>": col.ne, "<": col.lt, ">": col.gt, "<=": col.le, ">=": col.ge}
+    if op not in comparisons:
+        raise ValueError(f"Unsupported filter operator: {op}")
+    return comparisons[op](value)
+
+
+def _filter(df: pd.DataFrame, filters: Optional[List[Any]]) -> pd.DataFrame:
+    for clause in filters or []:
+        df = df[np.asarray(_mask(df, clause), dtype=bool)]
+    return df
+
+
+_AGGREGATIONS = {"count": "count", "sum": "sum", "avg": "mean", "min": "min", "max": "max",
+                 "first": "first", "last": "last", "dev": "std", "distinct": "nunique"}
+
+
+def _aggregate(df: pd.DataFrame, group_by: Optional[List[str]], aggs: Optional[Dict[str, Any]]) -> pd.DataFrame:
+    if not aggs:
+        return df
+    specs = {alias: (spec if isinstance(spec, list) else [None, spec]) for alias, spec in aggs.items()}
+    if all(op is None for op, _ in specs.values()) and not group_by:
+        return pd.DataFrame({alias: df[column].to_numpy() for alias, (_, column) in specs.items()})
+    for op, _ in specs.values():
+        if op is not None and op not in _AGGREGATIONS:
+            raise ValueError(f"Unsupported aggregation: {op}")
+    # A plain column next to aggregations takes the last value of each group
+    named = {alias: (column, _AGGREGATIONS[op or "last"]) for alias, (op, column) in specs.items()}
+    if group_by:
+        return df.groupby(group_by, sort=True).agg(**named).reset_index()
+    if df.empty:
+        return pd.DataFrame({alias: [0 if func in ("count", "nunique") else None] for alias, (_, func) in named.items()})
+    return df.assign(_all=0).groupby("_all").agg(**named).reset_index(drop=True)
+
+
+def query(table: StandinTable, body: Dict[str, Any]) -> pd.DataFrame:
+    df = _filter(table.df, body.get("filter"))
+    if body.get("sortColumns"):
+        df = df.sort_values(body["sortColumns"], kind="stable")
+    df = _aggregate(df, body.get("groupBy"), body.get("aggs"))
+    if body.get("limit") is not None:
+        df = df.head(int(body["limit"]))
+    return df.reset_index(drop=True)
+
+
+def _scores(table: StandinTable, index: Dict[str, Any], df: pd.DataFrame, vector: Any) -> np.ndarray:
+    if index["type"] == "flat":
+        vectors = table.dense[index["name"]][df.index.to_numpy()]
+        q = np.asarray(vector, dtype=np.float32)
+        if index["params"].get("metric") == "L2":
+            return -np.linalg.norm(vectors - q, axis=1)
+        if index["params"].get("metric") == "IP":
+            return vectors @ q
+        return (vectors @ q) / np.clip(np.linalg.norm(vectors, axis=1) * np.linalg.norm(q), 1e-12, None)
+    weights = {int(k): v for k, v in vector.items()}
+    return df[index["column"]].map(lambda doc: float(sum(weights.get(t, 0) for t in doc))).to_numpy()
+
+
+def search(table: StandinTable, body: Dict[str, Any]) -> List[pd.DataFrame]:
+    df = _filter(table.df, body.get("filter"))
+    n = int(body.get("n") or 10)
+    indexes = {i["name"]: i for i in table.indexes}
+    vectors = body["vectors"]
+    params = body.get("indexParams") or {}
+    results = []
+    for q in range(len(next(iter(vectors.values())))):
+        if len(vectors) == 1:
+            name, batch = next(iter(vectors.items()))
+            score = _scores(table, indexes[name], df, batch[q])
+        else:
+            # Weighted reciprocal rank fusion, as for hybrid and multi-index search
+            score = np.zeros(len(df))
+            for name, batch in vectors.items():
+                ranks = np.argsort(np.argsort(-_scores(table, indexes[name], df, batch[q])))
+                score += params.get(name, {}).get("weight", 1.0) / (60 + ranks)
+        top = np.argsort(-score, kind="stable")[:n]
+        result = df.iloc[top].assign(__nn_distance=score[top].astype(np.float32))
+        if body.get("sortColumns"):
+            result = result.sort_values(body["sortColumns"], kind="stable")
+        results.append(_aggregate(result, body.get("groupBy"), body.get("aggs")).reset_index(drop=True))
+    return results
+
+
+# ---- REST API ----
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    tables: Dict[str, Dict[str, StandinTable]] = {}
+
+    def log_message(self, *_):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, result: Any, status: int = 200) -> None:
+        payload = {"result": result} if status < 400 else {"error": result}
+        self._send(status, json.dumps(payload, default=str).encode("utf-8"), "application/json")
+
+    def _qipc(self, result: Any) -> None:
+        self._send(200, bytes(kx._wrappers.k_pickle(kx.toq({"success": True, "result": result}))), "application/octet-stream")
+
+    def _table(self, database: str, table: str) -> Optional[StandinTable]:
+        found = self.tables.get(database, {}).get(table)
+        if found is None:
+            self._json(f"Table {database}.{table} does not exist", 400)
+        return found
+
+    def _database_info(self, database: str) -> Dict[str, Any]:
+        return {"name": database, "tables": [t.info() for t in self.tables[database].values()]}
+
+    def do_GET(self):
+        parts = self.path.split("?")[0].strip("/").split("/")[2:]
+        if parts == ["ready"]:
+            return self._json(True)
+        if parts == ["version"]:
+            return self._send(200, json.dumps(VERSION).encode("utf-8"), "application/json")
+        if parts == ["databases"]:
+            return self._json(list(self.tables))
+        if parts[:1] == ["databases"] and len(parts) == 2:
+            if parts[1] not in self.tables:
+                return self._json(f"Database {parts[1]} does not exist", 400)
+            return self._json({"database": parts[1], "tables": [t.meta() for t in self.tables[parts[1]].values()]})
+        if parts[:1] == ["databases"] and len(parts) == 4:
+            table = self._table(parts[1], parts[3])
+            return table and self._json(table.meta())
+        if parts == ["info", "databases"]:
+            return self._json({"databases": [self._database_info(d) for d in self.tables]})
+        if parts[:2] == ["info", "databases"] and len(parts) == 3 and parts[2] in self.tables:
+            return self._json(self._database_info(parts[2]))
+        if parts[:2] == ["info", "databases"] and len(parts) == 5:
+            table = self._table(parts[2], parts[4])
+            return table and self._json(table.info())
+        self._json(f"Not supported by the stand-in: GET {self.path}", 404)
+
+    def do_POST(self):
+        parts = self.path.split("?")[0].strip("/").split("/")[2:]
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if len(parts) != 5 or parts[4] not in ("query", "search"):
+            return self._json(f"Not supported by the stand-in: POST {self.path}", 404)
+        table = self._table(parts[1], parts[3])
+        if table is None:
+            return
+        if args.latency_ms:
+            time.sleep(args.latency_ms / 1000)
+        try:
+            result = query(table, body) if parts[4] == "query" else search(table, body)
+        except (KeyError, ValueError, TypeError) as e:
+            return self._json(f"Invalid {parts[4]}: {e}", 400)
+        self._qipc(result)
+
+
+def main():
+    started = time.perf_counter()
+    Handler.tables = {DATABASE: {TABLE: make_documents(args.rows, args.dims, args.seed)}}
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.daemon_threads = True
+    print(f"KDB.AI stand-in on http://{args.host}:{args.port}: {DATABASE}.{TABLE} with {args.rows} rows, "
+          f"hash-{args.dims} embeddings (ready in {time.perf_counter() - started:.1f}s)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Replay a recorded trace of tool calls against a streamable-http MCP server and report latency per tool.
+
+A trace is the JSON Lines file written by a server started with --mcp.trace-path, one
+{"tool", "arguments", ...} object per call. Calls are replayed in trace order, cycling through the
+trace until --requests calls or --duration seconds are done, in one of two modes:
+
+  closed loop (default)  --concurrency clients each send their next call when the previous one returns
+  open loop              --rate calls per second arrive as a Poisson process whatever the server's speed,
+                         latency is measured from the scheduled arrival so queueing delay is included
+
+A call is an error when it raises, the result is flagged as an error, or the tool returns
+{"status": "error"}. The report gives calls, errors, error rate, throughput and p50/p95/p99 latency
+per tool and overall.
+
+    uv run python benchmarks/loadtest/trace_replay.py benchmarks/loadtest/sample_trace.jsonl \\
+        --url http://127.0.0.1:7000/mcp --concurrency 16 --requests 2000
+    uv run python benchmarks/loadtest/trace_replay.py trace.jsonl --rate 200 --duration 60
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("trace", help="JSON Lines trace recorded with --mcp.trace-path")
+parser.add_argument("--url", default="http://127.0.0.1:7000/mcp", help="streamable-http endpoint of the MCP server")
+parser.add_argument("--concurrency", type=int, default=8, help="clients of the closed loop, sessions of the open loop")
+parser.add_argument("--rate", type=float, default=None, help="open-loop arrival rate in calls per second")
+parser.add_argument("--requests", type=int, default=None, help="calls to replay, defaults to one pass over the trace")
+parser.add_argument("--duration", type=float, default=None, help="stop sending calls after this many seconds")
+parser.add_argument("--warmup", type=int, default=0, help="calls sent before measuring, not reported")
+parser.add_argument("--tools", nargs="*", default=None, help="only replay these tools")
+parser.add_argument("--timeout", type=float, default=60.0, help="seconds before a call counts as an error")
+parser.add_argument("--seed", type=int, default=0, help="seed of the open-loop arrival times")
+parser.add_argument("--json", dest="json_path", default=None, help="also write the report to this JSON file")
+args = parser.parse_args()
+
+
+def load_trace(path: str, tools: Optional[List[str]]) -> List[Tuple[str, Dict[str, Any]]]:
+    calls = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if tools and record["tool"] not in tools:
+                continue
+            calls.append((record["tool"], record.get("arguments") or {}))
+    if not calls:
+        raise SystemExit(f"No tool calls to replay in {path}")
+    return calls
+
+
+def error_message(result) -> Optional[str]:
+    """Message of a failed call, None when the call succeeded."""
+    text = getattr(result.content[0], "text", None) if result.content else None
+    if result.isError:
+        return text or "tool call failed"
+    payload = result.structuredContent
+    if payload is None and text:
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            return None
+    if isinstance(payload, dict) and set(payload) == {"result"}:
+        payload = payload["result"]
+    if isinstance(payload, dict) and payload.get("status") == "error":
+        return payload.get("message") or "tool returned an error"
+    return None
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.messages: Dict[str, str] = {}
+
+    def add(self, tool: str, seconds: float, error: Optional[str]) -> None:
+        self.latencies[tool].append(seconds)
+        if error is not None:
+            self.errors[tool] += 1
+            self.messages.setdefault(tool, error)
+
+
+async def call(session: ClientSession, tool: str, arguments: Dict[str, Any], started: float, recorder: Optional[Recorder]) -> None:
+    error = None
+    try:
+        result = await asyncio.wait_for(session.call_tool(tool, arguments), args.timeout)
+        error = error_message(result)
+    except asyncio.TimeoutError:
+        error = f"no response in {args.timeout}s"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    if recorder is not None:
+        recorder.add(tool, time.perf_counter() - started, error)
+
+
+async def closed_loop(sessions: List[ClientSession], calls, count: int, deadline: float, recorder: Optional[Recorder]) -> None:
+    sent = itertools.count()
+
+    async def client(session: ClientSession):
+        while next(sent) < count and time.perf_counter() < deadline:
+            tool, arguments = next(calls)
+            await call(session, tool, arguments, time.perf_counter(), recorder)
+
+    await asyncio.gather(*(client(session) for session in sessions))
+
+
+async def open_loop(sessions: List[ClientSession], calls, count: int, deadline: float, recorder: Recorder) -> None:
+    rng = np.random.default_rng(args.seed)
+    tasks = []
+    scheduled = time.perf_counter()
+    for i in range(count):
+        scheduled += rng.exponential(1.0 / args.rate)
+        if scheduled >= deadline:
+            break
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        tool, arguments = next(calls)
+        tasks.append(asyncio.create_task(call(sessions[i % len(sessions)], tool, arguments, scheduled, recorder)))
+    await asyncio.gather(*tasks)
+
+
+def summary(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    ms = np.asarray(latencies) * 1000
+    return {
+        "calls": len(ms),
+        "errors": errors,
+        "errorRate": round(errors / len(ms), 4),
+        "throughput": round(len(ms) / elapsed, 2),
+        "meanMs": round(float(ms.mean()), 2),
+        "p50Ms": round(float(np.percentile(ms, 50)), 2),
+        "p95Ms": round(float(np.percentile(ms, 95)), 2),
+        "p99Ms": round(float(np.percentile(ms, 99)), 2),
+    }
+
+
+def report(recorder: Recorder, elapsed: float) -> Dict[str, Any]:
+    tools = {tool: summary(latencies, recorder.errors[tool], elapsed) for tool, latencies in sorted(recorder.latencies.items())}
+    everything = list(itertools.chain.from_iterable(recorder.latencies.values()))
+    total = summary(everything, sum(recorder.errors.values()), elapsed)
+
+    header = f"{'tool':<32} {'calls':>7} {'errors':>7} {'err %':>6} {'calls/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, row in [*tools.items(), ("total", total)]:
+        print(f"{name:<32} {row['calls']:>7} {row['errors']:>7} {row['errorRate'] * 100:>6.1f} {row['throughput']:>8.1f} "
+              f"{row['p50Ms']:>9.1f} {row['p95Ms']:>9.1f} {row['p99Ms']:>9.1f}")
+    for tool, message in recorder.messages.items():
+        print(f"first error of {tool}: {message}")
+
+    mode = {"mode": "open", "rate": args.rate} if args.rate else {"mode": "closed", "concurrency": args.concurrency}
+    return {**mode, "url": args.url, "elapsedSeconds": round(elapsed, 3), "tools": tools, "total": total}
+
+
+async def main():
+    trace = load_trace(args.trace, args.tools)
+    calls = itertools.cycle(trace)
+    count = args.requests if args.requests is not None else (len(trace) if args.duration is None else 2**62)
+
+    async with AsyncExitStack() as stack:
+        sessions = []
+        for _ in range(max(1, args.concurrency)):
+            read, write, _ = await stack.enter_async_context(streamablehttp_client(args.url))
+            session = await stack.enter_async_context(ClientSession(read, write))
+            await session.initialize()
+            sessions.append(session)
+
+        if args.warmup:
+            await closed_loop(sessions, calls, args.warmup, float("inf"), None)
+
+        recorder = Recorder()
+        start = time.perf_counter()
+        deadline = start + args.duration if args.duration is not None else float("inf")
+        if args.rate:
+            await open_loop(sessions, calls, count, deadline, recorder)
+        else:
+            await closed_loop(sessions, calls, count, deadline, recorder)
+        elapsed = time.perf_counter() - start
+
+    if not recorder.latencies:
+        raise SystemExit("No calls were replayed")
+    result = report(recorder, elapsed)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
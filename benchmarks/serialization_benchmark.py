@@ -0,0 +1,83 @@
+"""
+Compare the default and the orjson serialization of a query result through FastMCP.
+
+Each run normalizes a KDB.AI-like result and lets FastMCP turn the tool's return value into
+the content it sends to the client, which is where the JSON encoding happens.
+
+    uv run python benchmarks/serialization_benchmark.py --rows 10000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--rows", type=int, default=10000)
+parser.add_argument("--repeat", type=int, default=5)
+args = parser.parse_args()
+# The server settings parse the command line on import
+sys.argv = sys.argv[:1]
+
+from mcp.server.fastmcp import FastMCP  # noqa: E402
+from mcp_server.server import app_settings  # noqa: E402
+from mcp_server.tools.kdbai_data import normalize_result  # noqa: E402
+from mcp_server.utils.serialization import fast_json_enabled, to_tool_result  # noqa: E402
+
+
+class Table:
+    indexes = [{"name": "flat", "column": "embedding", "type": "flat"}]
+
+
+def make_result(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "id": [f"doc-{i}" for i in range(rows)],
+        "text": [(f"passage {i} " * 20).encode() for i in range(rows)],
+        "published": pd.date_range("2024-01-01", periods=rows, freq="min"),
+        "score": rng.random(rows),
+        "position": list(rng.random((rows, 8), dtype=np.float32)),
+        "embedding": list(rng.random((rows, 384), dtype=np.float32)),
+        "__nn_distance": rng.random(rows, dtype=np.float32),
+    })
+
+
+def make_server(result: pd.DataFrame) -> FastMCP:
+    mcp = FastMCP("benchmark")
+
+    @mcp.tool(structured_output=not fast_json_enabled())
+    async def query() -> Dict[str, Any]:
+        records = normalize_result(result, Table())
+        return to_tool_result({"status": "success", "recordsCount": len(records), "records": records})
+
+    return mcp
+
+
+async def measure(result: pd.DataFrame, fast: bool) -> float:
+    app_settings.mcp.fast_json = fast
+    mcp = make_server(result)
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        await mcp.call_tool("query", {})
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    result = make_result(args.rows)
+    default = asyncio.run(measure(result, False))
+    print(f"default: {default * 1000:8.1f} ms for {args.rows} rows")
+    fast = asyncio.run(measure(result, True))
+    if not fast_json_enabled():
+        print("orjson is not installed")
+        return
+    print(f"orjson:  {fast * 1000:8.1f} ms for {args.rows} rows ({default / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -64,6 +64,9 @@ async def kdbai_table_analysis_prompt_impl(
     You are a data analyst conducting an in-depth analysis of the KDB.AI table: {table_name}
     First, examine the table structure and sample data to understand its content and characteristics.
     Use the available KDB.AI tools to get detailed information about this table.
+    Use kdbai_column_profile for statistics, completeness, cardinality, duplicates and text lengths
+    instead of pulling raw rows through kdbai_query_data.
+    Use kdbai_sample for the sample records, a query with a limit only returns the first rows.
 
     {focus.strip()}
 
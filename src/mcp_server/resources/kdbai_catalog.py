@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List
+import pandas as pd
+from mcp_server.utils.catalog import Catalog, CatalogSnapshot, get_catalog
+from mcp_server.utils.embeddings_helpers import get_csv_data
+from mcp_server.utils.sampling import NUMERIC_TYPES
+from mcp_server.server import app_settings
+
+db_config = app_settings.db
+logger = logging.getLogger(__name__)
+
+CATALOG_URI = "kdbai://catalog"
+TABLE_URI = "kdbai://tables/{database_name}/{table_name}"
+
+
+def content_hash(content: Dict[str, Any]) -> str:
+    """Stable hash of a resource's content, unchanged as long as the content is."""
+    canonical = json.dumps(content, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def _catalog_snapshot() -> CatalogSnapshot:
+    catalog = get_catalog()
+    if catalog is not None:
+        return catalog.snapshot()
+    # Catalog caching disabled, fetch a one-off snapshot
+    return Catalog(0, 0).refresh()
+
+
+def _embedding_config(database_name: str, table_name: str, indexes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    if not indexes or not db_config.embedding_csv_path:
+        return {}
+    try:
+        df = get_csv_data(db_config.embedding_csv_path)
+    except Exception as e:
+        logger.warning(f"Could not read embedding configuration: {e}")
+        return {}
+    rows = df[(df['database'] == database_name) & (df['table'] == table_name)]
+    if len(rows) != 1:
+        return {}
+    row = rows.iloc[0].map(lambda v: None if pd.isna(v) else v)
+    config = {}
+    for index in indexes:
+        sparse = index.get('type') == 'bm25'
+        config[index['name']] = {
+            "column": index.get('column'),
+            "provider": row['sparse_tokenizer_provider'] if sparse else row['embedding_provider'],
+            "model": row['sparse_tokenizer_model'] if sparse else row['embedding_model'],
+        }
+    return config
+
+
+def _example_filters(schema: List[Dict[str, str]], index_columns: set) -> List[List[Any]]:
+    examples = []
+    for column in schema:
+        name, col_type = column['name'], column['type']
+        if name in index_columns:
+            continue
+        if col_type == "str":
+            examples.append(["in", name, ["<value1>", "<value2>"]])
+        elif col_type in ("bytes", "strs"):
+            examples.append(["like", name, "*<word>*"])
+        elif col_type.startswith("datetime64"):
+            examples.append(["within", name, ["2025-01-01T00:00:00", "2025-01-31T23:59:59"]])
+        elif col_type in NUMERIC_TYPES:
+            examples.append(["within", name, [0, 100]])
+    return examples
+
+
+def table_document(database_name: str, table_name: str, meta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Schema, indexes, embedding configuration and example filters of a table.
+    Row counts change with every insert and are left out so the hash only follows the structure.
+    """
+    indexes = meta["indexes"] or []
+    document = {
+        "uri": TABLE_URI.format(database_name=database_name, table_name=table_name),
+        "database": database_name,
+        "table": table_name,
+        "schema": meta["schema"],
+        "indexes": indexes,
+        "embedding": _embedding_config(database_name, table_name, indexes),
+        "exampleFilters": _example_filters(meta["schema"], {i.get('column') for i in indexes}),
+    }
+    return {**document, "hash": content_hash(document)}
+
+
+def catalog_document(snapshot: CatalogSnapshot) -> Dict[str, Any]:
+    """Every table resource with its hash, so clients only read the ones that changed."""
+    databases = {
+        database_name: {
+            table_name: {key: doc[key] for key in ("uri", "hash")}
+            for table_name, doc in (
+                (t, table_document(database_name, t, meta)) for t, meta in sorted(tables.items())
+            )
+        }
+        for database_name, tables in sorted(snapshot.tables.items())
+    }
+    document = {"databases": databases}
+    return {**document, "hash": content_hash(document)}
+
+
+def kdbai_catalog_impl() -> str:
+    try:
+        return json.dumps(catalog_document(_catalog_snapshot()), default=str)
+    except Exception as e:
+        logger.error(f"Error building catalog resource: {e}")
+        return json.dumps({"status": "error", "message": str(e)})
+
+
+def kdbai_table_resource_impl(database_name: str, table_name: str) -> str:
+    try:
+        catalog = get_catalog()
+        if catalog is not None:
+            meta = catalog.table(table_name, database_name)
+        else:
+            snapshot = _catalog_snapshot()
+            meta = snapshot.tables.get(database_name, {}).get(table_name)
+            if meta is None:
+                raise LookupError(f"Table '{table_name}' not found in database '{database_name}'")
+        return json.dumps(table_document(database_name, table_name, meta), default=str)
+    except Exception as e:
+        logger.error(f"Error building resource for table {table_name}: {e}")
+        return json.dumps({"status": "error", "message": str(e), "database": database_name, "table": table_name})
+
+
+def register_resources(mcp_server):
+    @mcp_server.resource(CATALOG_URI, mime_type="application/json")
+    async def kdbai_catalog() -> str:
+        """
+        Index of the per-table resources of every KDB.AI database, with a content hash for each.
+        Re-read a table resource only when its hash has changed.
+
+        Returns:
+            str: JSON with databases -> tables -> {uri, hash}, and a hash of the whole index.
+        """
+        return await asyncio.to_thread(kdbai_catalog_impl)
+
+    @mcp_server.resource(TABLE_URI, mime_type="application/json")
+    async def kdbai_table_resource(database_name: str, table_name: str) -> str:
+        """
+        Schema, indexes, embedding configuration and example filters of a KDB.AI table.
+
+        Returns:
+            str: JSON document of the table, with a hash that changes only when its structure does.
+        """
+        return await asyncio.to_thread(kdbai_table_resource_impl, database_name, table_name)
+
+    return [CATALOG_URI, TABLE_URI]
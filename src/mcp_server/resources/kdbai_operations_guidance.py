@@ -1,12 +1,14 @@
 import logging
+from functools import lru_cache
+from importlib.resources import files
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache()
 def kdbai_operations_guidance_impl() -> str:
-    path = "src/mcp_server/resources/kdbai_operations_guidance.txt"
-    with open(path, "r", encoding="utf-8") as file:
-        return file.read()
+    # Read once from the installed package, independent of the working directory
+    return files(__package__).joinpath("kdbai_operations_guidance.txt").read_text(encoding="utf-8")
 
 
 def register_resources(mcp_server):
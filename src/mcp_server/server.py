@@ -1,7 +1,10 @@
+import os
 import sys
 import logging
 import socket
 from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 from mcp_server.utils.logging import setup_logging
 from mcp_server.settings import AppSettings
 from mcp_server.tools import register_tools
@@ -20,17 +23,28 @@ class McpServer:
         self.logger.info(f"ServerConfig: {self.mcp_config=}")
 
         # Initialize server
-        self.mcp = FastMCP(
-            self.mcp_config.server_name,
+        # Requests of one session can reach any worker, so sessions cannot be kept in process memory
+        mcp_options = dict(
             port=self.mcp_config.port,
-            host=self.mcp_config.host
+            host=self.mcp_config.host,
+            stateless_http=self._multi_worker(),
         )
+        if self.mcp_config.trace_path:
+            from mcp_server.utils.tracing import TracingFastMCP
+            self.mcp = TracingFastMCP(self.mcp_config.server_name, trace_path=self.mcp_config.trace_path, **mcp_options)
+        else:
+            self.mcp = FastMCP(self.mcp_config.server_name, **mcp_options)
 
         self._check_port_availability()
         self._check_kdbai_connection()
         self._register_tools()
         self._register_prompts()
         self._register_resources()
+        self._register_health_route()
+        self._init_embedding_cache()
+
+    def _multi_worker(self) -> bool:
+        return self.mcp_config.workers > 1 and self.mcp_config.transport == "streamable-http"
 
     def _check_port_availability(self):
         """Check if the configured mcp-port is available for HTTP transports."""
@@ -126,11 +140,39 @@ class McpServer:
             self.logger.error(f"Failed to register resources: {e}")
             raise
 
+    def _register_health_route(self):
+        """Per-process health endpoint for load balancers, reports which worker answered."""
+        from mcp_server import supervisor
+        from mcp_server.utils.kdbai import get_connection_state
+
+        @self.mcp.custom_route("/health", methods=["GET"])
+        async def health(request: Request) -> JSONResponse:
+            return JSONResponse({
+                "status": "ok",
+                "pid": os.getpid(),
+                "worker": supervisor.worker_index,
+                "kdbai": get_connection_state(),
+            })
+
+    def _init_embedding_cache(self):
+        """Open the persistent embedding cache at startup so its warm-load is not paid by the first search."""
+        # Imported here, utils modules import app_settings from this module
+        from mcp_server.utils.embeddings_helpers import get_embedding_cache
+
+        if self.db_config.embedding_cache_path:
+            get_embedding_cache()
+
     def run(self):
         """Start the MCP server."""
         try:
             self.logger.info(f"Starting {self.mcp_config.server_name} MCP Server with {self.mcp_config.transport} transport")
-            self.mcp.run(transport=self.mcp_config.transport)
+            if self._multi_worker():
+                from mcp_server.supervisor import WorkerSupervisor
+                WorkerSupervisor(self.mcp, self.mcp_config).run()
+            else:
+                if self.mcp_config.workers > 1:
+                    self.logger.warning("--mcp.workers is only supported with streamable-http transport, running a single process")
+                self.mcp.run(transport=self.mcp_config.transport)
         except KeyboardInterrupt:
             self.logger.info("Server shutdown requested")
         except Exception as e:
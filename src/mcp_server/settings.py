@@ -43,6 +43,14 @@ class KDBAIConfig(BaseSettings):
         default="http",
         description="Select protocol for REST mode, not considered for QIPC mode [env: KDBAI_DB_REST_PROTOCOL]"
     )
+    rest_async: bool = Field(
+        default=False,
+        description="Use the native asyncio REST client for data and catalog tools in REST mode [env: KDBAI_DB_REST_ASYNC]"
+    )
+    rest_pool_size: int = Field(
+        default=32,
+        description="Maximum number of pooled keep-alive connections of the async REST client [env: KDBAI_DB_REST_POOL_SIZE]"
+    )
     qipc_tls: bool = Field(
         default=False,
         description="""Enable TLS for QIPC mode, not considered for REST mode.
@@ -59,6 +67,54 @@ class KDBAIConfig(BaseSettings):
         default=2,
         description="Number of connection retry attempts on failure [env: KDBAI_DB_RETRY]"
     )
+    retry_backoff: float = Field(
+        default=0.2,
+        description="Base delay in seconds for exponential backoff with jitter between connection attempts [env: KDBAI_DB_RETRY_BACKOFF]"
+    )
+    retry_backoff_max: float = Field(
+        default=5.0,
+        description="Maximum delay in seconds between connection attempts [env: KDBAI_DB_RETRY_BACKOFF_MAX]"
+    )
+    breaker_failure_threshold: int = Field(
+        default=3,
+        description="Consecutive connection failures before requests fail fast while KDB.AI is down [env: KDBAI_DB_BREAKER_FAILURE_THRESHOLD]"
+    )
+    breaker_reset_timeout: float = Field(
+        default=10.0,
+        description="Seconds to fail fast before letting a probe request through to KDB.AI [env: KDBAI_DB_BREAKER_RESET_TIMEOUT]"
+    )
+    query_timeout: float = Field(
+        default=30.0,
+        description="Default deadline in seconds for query tool calls, 0 disables it [env: KDBAI_DB_QUERY_TIMEOUT]"
+    )
+    search_timeout: float = Field(
+        default=60.0,
+        description="Default deadline in seconds for search tool calls including embedding, 0 disables it [env: KDBAI_DB_SEARCH_TIMEOUT]"
+    )
+    max_response_bytes: int = Field(
+        default=128 * 1024 * 1024,
+        description="Budget in bytes for the result of one query or search, checked on the estimated and the fetched result, 0 disables it [env: KDBAI_DB_MAX_RESPONSE_BYTES]"
+    )
+    large_result_action: Literal["error", "truncate"] = Field(
+        default="error",
+        description="What a query or search over the byte budget does: 'error' returns a suggested limit, 'truncate' returns the rows that fit [env: KDBAI_DB_LARGE_RESULT_ACTION]"
+    )
+    catalog_refresh_interval: float = Field(
+        default=30.0,
+        description="Seconds between background refreshes of the cached database and table catalog, 0 disables the catalog [env: KDBAI_DB_CATALOG_REFRESH_INTERVAL]"
+    )
+    catalog_stale_after: float = Field(
+        default=120.0,
+        description="Maximum age in seconds of catalog data served by listing tools, older data is refreshed before answering [env: KDBAI_DB_CATALOG_STALE_AFTER]"
+    )
+    profile_sample_size: int = Field(
+        default=1000,
+        description="Rows sampled by kdbai_column_profile for null fractions, distinct estimates and text lengths [env: KDBAI_DB_PROFILE_SAMPLE_SIZE]"
+    )
+    profile_group_limit: int = Field(
+        default=10000,
+        description="Maximum number of distinct values kdbai_column_profile counts exactly per symbol column [env: KDBAI_DB_PROFILE_GROUP_LIMIT]"
+    )
     k: int = Field(
         default=5,
         description="Default number of results to return from vector searches [env: KDBAI_DB_K]"
@@ -75,6 +131,94 @@ class KDBAIConfig(BaseSettings):
         default = "src/mcp_server/utils/embeddings.csv",
         description = "Path to embeddings csv [env: KDBAI_DB_EMBEDDING_CSV_PATH]"
     )
+    embedding_cache_path: str = Field(
+        default="",
+        description="Path to a SQLite file that persists query embeddings across restarts, empty disables it [env: KDBAI_DB_EMBEDDING_CACHE_PATH]"
+    )
+    embedding_cache_max_mb: float = Field(
+        default=256.0,
+        description="Size in MB above which least recently used embeddings are evicted from the cache file [env: KDBAI_DB_EMBEDDING_CACHE_MAX_MB]"
+    )
+    embedding_cache_memory_entries: int = Field(
+        default=10000,
+        description="Number of recently used embeddings kept in memory and warm-loaded on startup [env: KDBAI_DB_EMBEDDING_CACHE_MEMORY_ENTRIES]"
+    )
+    embedding_cache_read_only: bool = Field(
+        default=False,
+        description="Open the embedding cache file read-only, for worker processes sharing a cache written by another process [env: KDBAI_DB_EMBEDDING_CACHE_READ_ONLY]"
+    )
+    semantic_cache: bool = Field(
+        default=False,
+        description="Serve similarity searches from recent results whose query vector is close enough to the new one [env: KDBAI_DB_SEMANTIC_CACHE]"
+    )
+    semantic_cache_threshold: float = Field(
+        default=0.95,
+        description="Minimum cosine similarity between query vectors for a semantic cache hit [env: KDBAI_DB_SEMANTIC_CACHE_THRESHOLD]"
+    )
+    semantic_cache_entries: int = Field(
+        default=256,
+        description="Number of recent queries kept per table, index and search parameters in the semantic cache [env: KDBAI_DB_SEMANTIC_CACHE_ENTRIES]"
+    )
+    semantic_cache_ttl: float = Field(
+        default=300.0,
+        description="Seconds a semantic cache entry is served for, 0 keeps entries until evicted or invalidated [env: KDBAI_DB_SEMANTIC_CACHE_TTL]"
+    )
+    query_handle_entries: int = Field(
+        default=1024,
+        description="Number of query texts whose embeddings are kept for reuse through query handles [env: KDBAI_DB_QUERY_HANDLE_ENTRIES]"
+    )
+    query_handle_ttl: float = Field(
+        default=1800.0,
+        description="Seconds after its last use a query handle expires, 0 keeps handles until evicted [env: KDBAI_DB_QUERY_HANDLE_TTL]"
+    )
+    watermark_cursor_entries: int = Field(
+        default=1024,
+        description="Number of kdbai_query_since cursors kept with their watermarks [env: KDBAI_DB_WATERMARK_CURSOR_ENTRIES]"
+    )
+    watermark_cursor_ttl: float = Field(
+        default=86400.0,
+        description="Seconds after its last use a kdbai_query_since cursor expires, 0 keeps cursors until evicted [env: KDBAI_DB_WATERMARK_CURSOR_TTL]"
+    )
+    ingest_chunk_size: int = Field(
+        default=1000,
+        description="Number of rows embedded and inserted per batch by kdbai_insert [env: KDBAI_DB_INGEST_CHUNK_SIZE]"
+    )
+    ingest_max_inflight: int = Field(
+        default=1,
+        description="Number of batches kdbai_insert may have in flight to KDB.AI while embedding the next one [env: KDBAI_DB_INGEST_MAX_INFLIGHT]"
+    )
+    ingest_allowed_dir: str = Field(
+        default="",
+        description="Directory on the server host kdbai_insert may read files from, empty disables file_path [env: KDBAI_DB_INGEST_ALLOWED_DIR]"
+    )
+    onnx_intra_op_threads: int = Field(
+        default=0,
+        description="Intra-op threads for the 'onnx' embedding provider, 0 lets ONNX Runtime decide [env: KDBAI_DB_ONNX_INTRA_OP_THREADS]"
+    )
+    onnx_quantize: bool = Field(
+        default=False,
+        description="Run 'onnx' embedding models with dynamic int8 quantization, the quantized model is written next to the original on first use [env: KDBAI_DB_ONNX_QUANTIZE]"
+    )
+    onnx_batch_size: int = Field(
+        default=32,
+        description="Maximum number of texts per ONNX Runtime inference call [env: KDBAI_DB_ONNX_BATCH_SIZE]"
+    )
+    embedding_model_memory_mb: float = Field(
+        default=4096,
+        description="Memory budget in MB of loaded local embedding models, least recently used models are unloaded beyond it, 0 for no limit [env: KDBAI_DB_EMBEDDING_MODEL_MEMORY_MB]"
+    )
+    embedding_precision: Literal["float32", "float16", "bfloat16", "int8"] = Field(
+        default="float32",
+        description="Weight precision of local embedding models: 'float16' and 'bfloat16' halve sentence_transformers models, 'int8' dynamically quantizes sentence_transformers models on CPU and onnx models [env: KDBAI_DB_EMBEDDING_PRECISION]"
+    )
+    embedding_workers: int = Field(
+        default=0,
+        description="Worker processes running the sentence_transformers and onnx embedding models outside the server process, 0 embeds in process [env: KDBAI_DB_EMBEDDING_WORKERS]"
+    )
+    embedding_worker_threads: int = Field(
+        default=1,
+        description="Inference threads of each embedding worker process [env: KDBAI_DB_EMBEDDING_WORKER_THREADS]"
+    )
 
 
 class ServerConfig(BaseSettings):
@@ -106,6 +250,26 @@ class ServerConfig(BaseSettings):
         default="127.0.0.1",
         description="HTTP server bind address - ignored when using stdio transport [env: KDBAI_MCP_HOST]"
     )
+    workers: int = Field(
+        default=1,
+        description="Number of server processes sharing the HTTP port, more than 1 runs streamable-http statelessly under a supervisor [env: KDBAI_MCP_WORKERS]"
+    )
+    worker_health_timeout: float = Field(
+        default=30.0,
+        description="Seconds without a heartbeat after which a worker is killed and restarted [env: KDBAI_MCP_WORKER_HEALTH_TIMEOUT]"
+    )
+    worker_graceful_timeout: float = Field(
+        default=30.0,
+        description="Seconds a stopping worker gets to finish in-flight requests [env: KDBAI_MCP_WORKER_GRACEFUL_TIMEOUT]"
+    )
+    fast_json: bool = Field(
+        default=False,
+        description="Serialize query and search results with orjson, returned as JSON text without structured content [env: KDBAI_MCP_FAST_JSON]"
+    )
+    trace_path: str = Field(
+        default="",
+        description="Append every tool call with its arguments to this JSON Lines file, for replay by the load generator [env: KDBAI_MCP_TRACE_PATH]"
+    )
 
 
 class AppSettings(BaseSettings):
@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+from multiprocessing.sharedctypes import RawArray
+from typing import Dict, Optional
+
+from mcp.server.fastmcp import FastMCP
+from mcp_server.settings import ServerConfig
+
+logger = logging.getLogger(__name__)
+
+# Index of this process among the workers, None in the supervisor or when running a single process
+worker_index: Optional[int] = None
+
+# Seconds between worker heartbeats
+_HEARTBEAT_INTERVAL = 1.0
+# Workers that exit sooner than this after starting are restarted with a growing delay
+_CRASH_WINDOW = 5.0
+_MAX_RESTART_DELAY = 30.0
+
+
+class WorkerSupervisor:
+    """
+    Pre-forking supervisor for the streamable-http transport.
+
+    The supervisor binds the listening socket once and forks `workers` processes that all accept
+    on it, each running its own uvicorn server and event loop. Each worker writes a heartbeat into
+    shared memory while its event loop is responsive. Workers that exit are restarted, and workers
+    whose heartbeat is older than `worker_health_timeout` are killed and restarted.
+
+    SIGHUP restarts the workers one at a time: a replacement is started and once it serves the old
+    worker is shut down gracefully, so the port keeps accepting throughout. SIGTERM and SIGINT
+    shut all workers down gracefully.
+    """
+
+    def __init__(self, mcp: FastMCP, config: ServerConfig):
+        self.mcp = mcp
+        self.config = config
+        self.workers = config.workers
+        # Heartbeat time and pid of the worker that wrote it, two cells per worker slot so that
+        # a replacement never shares one with the worker it replaces
+        self._beats = RawArray("d", 2 * self.workers)
+        self._beat_pids = RawArray("l", 2 * self.workers)
+        self._pids: Dict[int, int] = {}  # pid -> slot
+        self._cells: Dict[int, int] = {}  # pid -> heartbeat cell
+        self._spawned_at: Dict[int, float] = {}
+        self._restart_delay = [0.0] * self.workers
+        self._restart_at: Dict[int, float] = {}  # slot -> time its worker is restarted, not before
+        self._retiring: set = set()  # workers being replaced, not restarted when they exit
+        self._replacing: set = set()  # replacements that have not become ready yet
+        self._sock: Optional[socket.socket] = None
+        self._stopping = False
+        self._reload = False
+
+    def _bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.config.host, self.config.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _spawn(self, slot: int) -> int:
+        in_use = {self._cells[pid] for pid, s in self._pids.items() if s == slot}
+        cell = slot if slot not in in_use else slot + self.workers
+        self._beat_pids[cell] = 0
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._run_worker(slot, cell)
+            except BaseException as e:
+                logger.error(f"Worker {slot} failed: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        self._pids[pid] = slot
+        self._cells[pid] = cell
+        self._spawned_at[pid] = time.time()
+        logger.info(f"Started worker {slot} (pid {pid})")
+        return pid
+
+    def _run_worker(self, slot: int, cell: int) -> None:
+        global worker_index
+        worker_index = slot
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_DFL)
+
+        import uvicorn
+
+        config = uvicorn.Config(
+            self.mcp.streamable_http_app(),
+            log_level=self.mcp.settings.log_level.lower(),
+            timeout_graceful_shutdown=self.config.worker_graceful_timeout,
+        )
+        server = uvicorn.Server(config)
+
+        async def heartbeat():
+            while not server.should_exit:
+                if server.started:
+                    self._beats[cell] = time.time()
+                    self._beat_pids[cell] = os.getpid()
+                await asyncio.sleep(_HEARTBEAT_INTERVAL)
+
+        async def serve():
+            task = asyncio.create_task(heartbeat())
+            try:
+                await server.serve(sockets=[self._sock])
+            finally:
+                task.cancel()
+
+        asyncio.run(serve())
+
+    def _ready(self, pid: int) -> bool:
+        return self._beat_pids[self._cells[pid]] == pid
+
+    def _healthy(self, pid: int, now: float) -> bool:
+        # Before its first heartbeat a worker gets the timeout as startup grace
+        last = self._beats[self._cells[pid]] if self._ready(pid) else self._spawned_at[pid]
+        return now - last <= self.config.worker_health_timeout
+
+    def _reap(self) -> None:
+        while self._pids:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            slot = self._pids.pop(pid, None)
+            self._cells.pop(pid, None)
+            spawned_at = self._spawned_at.pop(pid, time.time())
+            if slot is None:
+                continue
+            if pid in self._retiring or pid in self._replacing:
+                self._retiring.discard(pid)
+                self._replacing.discard(pid)
+                continue
+            if self._stopping:
+                continue
+
+            logger.warning(f"Worker {slot} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}")
+            if time.time() - spawned_at < _CRASH_WINDOW:
+                self._restart_delay[slot] = min(_MAX_RESTART_DELAY, max(1.0, self._restart_delay[slot] * 2))
+                logger.warning(f"Worker {slot} crashed on startup, restarting in {self._restart_delay[slot]:.0f}s")
+            else:
+                self._restart_delay[slot] = 0.0
+            self._restart_at[slot] = time.time() + self._restart_delay[slot]
+
+    def _restart_due(self) -> None:
+        now = time.time()
+        for slot, restart_at in list(self._restart_at.items()):
+            if restart_at <= now and not self._stopping:
+                del self._restart_at[slot]
+                self._spawn(slot)
+
+    def _check_health(self) -> None:
+        now = time.time()
+        for pid, slot in list(self._pids.items()):
+            if pid not in self._retiring and pid not in self._replacing and not self._healthy(pid, now):
+                logger.error(f"Worker {slot} (pid {pid}) missed heartbeats, killing it")
+                self._kill(pid, signal.SIGKILL)
+
+    def _kill(self, pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _rolling_restart(self) -> None:
+        logger.info("Rolling restart of workers")
+        for old_pid, slot in list(self._pids.items()):
+            if old_pid in self._retiring or old_pid not in self._pids:
+                continue
+            new_pid = self._spawn(slot)
+            self._replacing.add(new_pid)
+            deadline = time.time() + self.config.worker_health_timeout
+            while (new_pid in self._pids and not self._ready(new_pid)
+                   and time.time() < deadline and not self._stopping):
+                time.sleep(0.1)
+                self._reap()
+                self._restart_due()
+            if new_pid not in self._pids or not self._ready(new_pid):
+                logger.error(f"Replacement worker {slot} (pid {new_pid}) did not become ready, keeping pid {old_pid}")
+                self._kill(new_pid, signal.SIGKILL)
+                continue
+            self._replacing.discard(new_pid)
+            self._retiring.add(old_pid)
+            self._kill(old_pid, signal.SIGTERM)
+        logger.info("Rolling restart complete")
+
+    def _shutdown(self) -> None:
+        logger.info(f"Stopping {len(self._pids)} workers")
+        for pid in list(self._pids):
+            self._kill(pid, signal.SIGTERM)
+        deadline = time.time() + self.config.worker_graceful_timeout + 5
+        while self._pids and time.time() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self._pids):
+            logger.warning(f"Worker pid {pid} did not stop in time, killing it")
+            self._kill(pid, signal.SIGKILL)
+
+    def _on_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _on_reload(self, signum, frame) -> None:
+        self._reload = True
+
+    def run(self) -> None:
+        self._sock = self._bind()
+        logger.info(f"Supervisor pid {os.getpid()} starting {self.workers} workers on {self.config.host}:{self.config.port}")
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+
+        for slot in range(self.workers):
+            self._spawn(slot)
+        try:
+            while not self._stopping:
+                time.sleep(0.5)
+                self._reap()
+                self._restart_due()
+                self._check_health()
+                if self._reload:
+                    self._reload = False
+                    self._rolling_restart()
+        finally:
+            self._stopping = True
+            self._shutdown()
+            self._sock.close()
@@ -1,7 +1,7 @@
 import logging
 from typing import Dict, Any, List, Optional
 from mcp_server.utils.kdb import get_kdb_connection
-from mcp_server.utils.kdbai import get_table
+from mcp_server.utils.kdbai import get_table_async, kdbai_acall
 from mcp_server.utils.embeddings import encode_text
 
 logger = logging.getLogger(__name__)
@@ -20,8 +20,9 @@ async def my_tool_impl(
         # Vector search operations
 
         # vec = encode_text(userQuery)
-        # table = get_table("your_table")
-        # docs = table.search(vectors={'index_name': [vec]}, n=param2)
+        # KDB.AI calls block, await them so they run off the event loop
+        # table = await get_table_async("your_table")
+        # docs = await kdbai_acall(table.search, vectors={'index_name': [vec]}, n=param2)
 
         results = []
 
@@ -0,0 +1,363 @@
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+import numpy as np
+import pandas as pd
+from mcp_server.utils.kdbai import get_table, kdbai_call
+from mcp_server.utils.catalog import get_catalog
+from mcp_server.utils.filters import parse_temporal_filters, validate_filters, InvalidFilter, invalid_filter_response
+from mcp_server.utils.sampling import (NUMERIC_TYPES, TEMPORAL_TYPES, ORDERABLE_TYPES, MAX_QUERIES, MAX_STRATA,
+                                        pick_order_column, sample_rows, stratum_sizes)
+from mcp_server.tools.kdbai_data import normalize_result
+from mcp_server.utils.serialization import fast_json_enabled, to_tool_result
+from mcp_server.server import app_settings
+
+db_config = app_settings.db
+logger = logging.getLogger(__name__)
+
+TEXT_TYPES = {"bytes", "strs"}
+SYMBOL_TYPES = {"str"}
+
+# Profiles keyed by table and arguments, each stored with the row count it was computed at
+_PROFILE_CACHE_SIZE = 128
+_profiles: "OrderedDict[Tuple, Tuple[Any, Dict[str, Any]]]" = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def estimate_distinct(values: pd.Series, row_count: int) -> int:
+    """
+    GEE distinct value estimate from a uniform sample: sqrt(N/n) * f1 + sum(f_j, j >= 2),
+    where f1 is the number of values seen once in the sample.
+    """
+    n = len(values)
+    if n == 0:
+        return 0
+    frequencies = values.value_counts(dropna=True)
+    singletons = int((frequencies == 1).sum())
+    estimate = np.sqrt(max(row_count, n) / n) * singletons + (len(frequencies) - singletons)
+    return int(min(round(estimate), max(row_count, n)))
+
+
+def _is_null(values: pd.Series) -> pd.Series:
+    return values.isna() | values.map(lambda v: isinstance(v, (str, bytes)) and len(v) == 0)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, pd.Timedelta)):
+        return str(value)
+    return value
+
+
+def _table_version(table, table_name: str, database_name: str) -> Any:
+    catalog = get_catalog()
+    if catalog is not None:
+        return catalog.table(table_name, database_name)["rowCount"]
+    return kdbai_call(table.info).get("rowCount")
+
+
+def _profile_table(table, row_count: int, columns: List[Dict[str, str]], top_k: int, sample_size: int,
+                   order_column: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    profiles: Dict[str, Dict[str, Any]] = {c['name']: {"type": c['type']} for c in columns}
+    sampled_rows = 0
+
+    # min/max/avg of every numeric and temporal column in a single pushed-down aggregation
+    aggs = {}
+    for c in columns:
+        if c['type'] in NUMERIC_TYPES or c['type'] in TEMPORAL_TYPES:
+            aggs[f"min_{c['name']}"] = ["min", c['name']]
+            aggs[f"max_{c['name']}"] = ["max", c['name']]
+            if c['type'] in NUMERIC_TYPES:
+                aggs[f"avg_{c['name']}"] = ["avg", c['name']]
+    if aggs:
+        stats = kdbai_call(table.query, aggs=aggs).iloc[0]
+        for alias, (_, name) in aggs.items():
+            profiles[name][alias.split("_", 1)[0]] = _plain(stats[alias])
+
+    # Symbol columns: exact distinct counts and top values from a grouped count
+    group_limit = db_config.profile_group_limit
+    for c in columns:
+        if c['type'] in SYMBOL_TYPES:
+            counts = kdbai_call(table.query, group_by=[c['name']], aggs={"n": ["count", c['name']]}, limit=group_limit)
+            counts = counts.reset_index() if c['name'] not in counts.columns else counts
+            counts = counts.sort_values("n", ascending=False)
+            profiles[c['name']]["distinct"] = len(counts)
+            profiles[c['name']]["distinctExact"] = len(counts) < group_limit
+            profiles[c['name']]["topValues"] = [
+                {"value": _plain(v), "count": int(n)} for v, n in zip(counts[c['name']].head(top_k), counts["n"].head(top_k))
+            ]
+            nulls = counts.loc[counts[c['name']].map(lambda v: v in ("", b"")), "n"]
+            profiles[c['name']]["nulls"] = int(nulls.sum())
+
+    # Everything else is estimated from a sample of the scalar and text columns
+    sampled = [c for c in columns
+               if c['type'] in TEXT_TYPES or (not c['type'].endswith("s") and c['type'] != "general")]
+    if sampled and sample_size > 0:
+        # Fixed seed so that repeated profiles of an unchanged table agree
+        sample, _ = sample_rows(table, sample_size, np.random.default_rng(0), order_column,
+                                aggs={c['name']: c['name'] for c in sampled})
+        sampled_rows = len(sample)
+        for c in sampled:
+            name = c['name']
+            values = sample[name]
+            profile = profiles[name]
+            null_mask = _is_null(values)
+            if "nulls" not in profile:
+                profile["nullFraction"] = round(float(null_mask.mean()), 4) if len(values) else None
+            present = values[~null_mask]
+            if c['type'] in TEXT_TYPES:
+                present = present.map(_plain)
+                lengths = present.map(len)
+                if len(lengths):
+                    quantiles = lengths.quantile([0.0, 0.25, 0.5, 0.75, 0.95, 1.0])
+                    profile["textLength"] = dict(zip(["min", "p25", "p50", "p75", "p95", "max"],
+                                                     (int(q) for q in quantiles)))
+                profile["duplicateFraction"] = round(float(present.duplicated().mean()), 4) if len(present) else None
+            if "distinct" not in profile:
+                profile["distinctEstimate"] = estimate_distinct(present, row_count)
+                profile["topValues"] = [
+                    {"value": _plain(v), "sampleCount": int(n)}
+                    for v, n in present.value_counts().head(top_k).items()
+                ]
+
+    return {
+        "rowCount": row_count,
+        "sampleSize": sampled_rows,
+        "columns": profiles,
+    }
+
+
+async def kdbai_column_profile_impl(table_name: str,
+                                    database_name: Optional[str] = None,
+                                    columns: Optional[List[str]] = None,
+                                    top_k: int = 5,
+                                    sample_size: Optional[int] = None) -> Dict[str, Any]:
+    try:
+        if database_name is None:
+            database_name = db_config.database_name
+        if sample_size is None:
+            sample_size = db_config.profile_sample_size
+
+        table = await asyncio.to_thread(get_table, table_name, database_name)
+        version = await asyncio.to_thread(_table_version, table, table_name, database_name)
+
+        key = (database_name, table_name, tuple(columns or ()), top_k, sample_size)
+        with _profiles_lock:
+            cached = _profiles.get(key)
+        if cached is not None and cached[0] == version:
+            return {**cached[1], "cached": True}
+
+        schema = table.schema
+        # Embedding columns are not profiled
+        index_columns = {i['column'] for i in table.indexes}
+        order_column = pick_order_column(schema, index_columns)
+        if columns:
+            unknown = set(columns) - {c['name'] for c in schema}
+            if unknown:
+                raise ValueError(f"Columns not in table schema: {sorted(unknown)}")
+            schema = [c for c in schema if c['name'] in columns]
+        schema = [c for c in schema if c['name'] not in index_columns]
+
+        row_count = int(version) if version is not None else 0
+        profile = await asyncio.to_thread(_profile_table, table, row_count, schema, top_k, sample_size, order_column)
+        result = {
+            "status": "success",
+            "database": database_name,
+            "table": table_name,
+            **profile
+        }
+        with _profiles_lock:
+            _profiles[key] = (version, result)
+            _profiles.move_to_end(key)
+            while len(_profiles) > _PROFILE_CACHE_SIZE:
+                _profiles.popitem(last=False)
+        return result
+    except Exception as e:
+        logger.error(f"Error profiling table {table_name}: {e}")
+        return {
+            "status": "error",
+            "message": str(e),
+            "database": database_name,
+            "table": table_name
+        }
+
+
+def _resolve_order_column(schema: List[Dict[str, str]], index_columns: set, name: Optional[str]) -> Optional[Dict[str, str]]:
+    if name is None:
+        return pick_order_column(schema, index_columns)
+    column = next((c for c in schema if c['name'] == name), None)
+    if column is None or column['type'] not in ORDERABLE_TYPES:
+        raise ValueError(f"order_column '{name}' must be a numeric or temporal column of the table")
+    return column
+
+
+def _sample_table(table,
+                  sample_size: int,
+                  seed: int,
+                  stratify_by: Optional[str],
+                  allocation: str,
+                  filters: Optional[List[Any]],
+                  columns: Optional[List[str]],
+                  order_column: Optional[str]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    schema = table.schema
+    index_columns = {i['column'] for i in table.indexes}
+    names = [c['name'] for c in schema]
+    if columns:
+        unknown = set(columns) - set(names)
+        if unknown:
+            raise ValueError(f"Columns not in table schema: {sorted(unknown)}")
+    if stratify_by is not None and stratify_by not in names:
+        raise ValueError(f"stratify_by column '{stratify_by}' not in table schema")
+
+    order = _resolve_order_column(schema, index_columns, order_column)
+    selected = [c for c in (columns or names) if c not in index_columns]
+    aggs = {c: c for c in selected}
+    validate_filters(filters, schema, index_columns)
+    filters = parse_temporal_filters(filters, schema) or []
+
+    if stratify_by is None:
+        df, method = sample_rows(table, sample_size, np.random.default_rng(seed), order, filters, aggs)
+        return df, {"method": method}
+
+    # One row past the cap is enough to tell the column has too many strata
+    counts = kdbai_call(table.query, filter=filters or None, group_by=[stratify_by],
+                        aggs={"n": ["count", stratify_by]}, limit=MAX_STRATA + 1)
+    if len(counts) > MAX_STRATA:
+        raise ValueError(f"stratify_by column '{stratify_by}' has more than {MAX_STRATA} values, "
+                         f"filter it to fewer values or sample without stratify_by")
+    counts = counts.reset_index() if stratify_by not in counts.columns else counts
+    sizes = stratum_sizes(dict(zip(counts[stratify_by], counts["n"].astype(int))), sample_size, allocation)
+
+    # One independent generator per stratum, derived from the seed
+    generators = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(len(sizes))]
+    # The queries left after the grouped count are shared by the strata, each one sampled from gets at least one
+    max_queries = (MAX_QUERIES - 1) // max(1, sum(1 for size in sizes.values() if size > 0))
+    frames, strata = [], {}
+    for (value, size), rng in zip(sizes.items(), generators):
+        if size == 0:
+            continue
+        df, _ = sample_rows(table, size, rng, order, [*filters, ["=", stratify_by, value]], aggs, max_queries)
+        frames.append(df)
+        strata[str(_plain(value))] = len(df)
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=selected)
+    return df, {"method": "stratified", "strata": strata}
+
+
+async def kdbai_sample_impl(table_name: str,
+                            sample_size: int = 10,
+                            database_name: Optional[str] = None,
+                            seed: Optional[int] = None,
+                            stratify_by: Optional[str] = None,
+                            allocation: str = "proportional",
+                            filters: Optional[List[Any]] = None,
+                            columns: Optional[List[str]] = None,
+                            order_column: Optional[str] = None,
+                            max_text_chars: Optional[int] = None) -> Dict[str, Any]:
+    try:
+        if database_name is None:
+            database_name = db_config.database_name
+        if allocation not in ("proportional", "equal"):
+            raise ValueError("allocation must be 'proportional' or 'equal'")
+        if seed is None:
+            # Reported back so the sample can be drawn again
+            seed = int(np.random.SeedSequence().entropy % 2**32)
+
+        table = await asyncio.to_thread(get_table, table_name, database_name)
+        df, details = await asyncio.to_thread(_sample_table, table, sample_size, seed, stratify_by,
+                                              allocation, filters, columns, order_column)
+        records = await asyncio.to_thread(normalize_result, df, table, columns, max_text_chars)
+        return {
+            "status": "success",
+            "database": database_name,
+            "table": table_name,
+            "seed": seed,
+            **details,
+            "recordsCount": len(records),
+            "records": records
+        }
+    except InvalidFilter as e:
+        return invalid_filter_response(e, database=database_name, table=table_name)
+    except Exception as e:
+        logger.error(f"Error sampling table {table_name}: {e}")
+        return {
+            "status": "error",
+            "message": str(e),
+            "database": database_name,
+            "table": table_name
+        }
+
+
+def register_tools(mcp_server):
+    @mcp_server.tool()
+    async def kdbai_column_profile(table_name: str,
+                                   database_name: Optional[str] = None,
+                                   columns: Optional[List[str]] = None,
+                                   top_k: int = 5,
+                                   sample_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Profile the columns of a KDB.AI table on the server, without pulling raw rows.
+        Use it to assess completeness, cardinality and text lengths before querying.
+
+        Min, max and average are computed by KDB.AI over the whole table. Symbol columns get exact
+        distinct counts and top values from a grouped count. Null fractions, distinct estimates,
+        top values of other columns and text length quantiles come from a sample of rows.
+        Results are cached until the table's row count changes.
+
+        Args:
+            table_name: Name of the table to profile
+            database_name: Name of the database (optional: defaults to configured database)
+            columns: Columns to profile, e.g. '["category", "text"]' (optional: defaults to all non-embedding columns)
+            top_k: Number of most frequent values to report per column
+            sample_size: Number of rows sampled for estimated statistics (optional: defaults to configured sample size)
+
+        Returns:
+            Dictionary with rowCount, sampleSize and per column statistics:
+            type, min, max, avg, distinct or distinctEstimate, nulls or nullFraction, topValues,
+            and for text columns textLength quantiles and duplicateFraction.
+        """
+        return await kdbai_column_profile_impl(table_name, database_name, columns, top_k, sample_size)
+
+    @mcp_server.tool(structured_output=not fast_json_enabled())
+    async def kdbai_sample(table_name: str,
+                           sample_size: int = 10,
+                           database_name: Optional[str] = None,
+                           seed: Optional[int] = None,
+                           stratify_by: Optional[str] = None,
+                           allocation: str = "proportional",
+                           filters: Optional[List[Any]] = None,
+                           columns: Optional[List[str]] = None,
+                           order_column: Optional[str] = None,
+                           max_text_chars: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Draw a random sample of rows from a KDB.AI table, uniform or stratified by a column.
+        Use it instead of a plain query with a limit, which always returns the first rows.
+
+        Rows are counted and drawn in ranges of a numeric or temporal column, so only small ranges of
+        the table are transferred whatever its size. Each range contributes rows in proportion to how
+        many it holds, so the sample is uniform. The same seed on an unchanged table returns the same sample.
+
+        Args:
+            table_name: Name of the table to sample
+            sample_size: Number of rows to return
+            database_name: Name of the database (optional: defaults to configured database)
+            seed: Seed for a reproducible sample (optional: a random seed is used and returned)
+            stratify_by: Column whose values define the strata, e.g. "category", at most 63 values (optional)
+            allocation: 'proportional' to each stratum's row count, or 'equal' rows per stratum
+            filters: Filter conditions applied before sampling, same syntax as kdbai_query_data (optional)
+            columns: Columns to return, e.g. '["id", "title"]' (optional: defaults to all non-embedding columns)
+            order_column: Numeric or temporal column the ranges are counted and drawn on (optional: picked from the schema)
+            max_text_chars: Truncate text values longer than this many characters (optional)
+
+        Returns:
+            Dictionary with the seed, the sampling method, row counts per stratum when stratified, and the records.
+        """
+        results = await kdbai_sample_impl(table_name, sample_size, database_name, seed, stratify_by,
+                                          allocation, filters, columns, order_column, max_text_chars)
+        return to_tool_result(results)
+
+    return ["kdbai_column_profile", "kdbai_sample"]
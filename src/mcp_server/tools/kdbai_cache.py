@@ -0,0 +1,66 @@
+import logging
+from typing import Optional, Dict, Any
+from mcp_server.utils.semantic_cache import get_semantic_cache
+from mcp_server.utils.model_manager import get_model_manager
+from mcp_server.server import app_settings
+
+db_config = app_settings.db
+logger = logging.getLogger(__name__)
+
+
+async def kdbai_cache_stats_impl() -> Dict[str, Any]:
+    semantic_cache = get_semantic_cache()
+    return {
+        "status": "success",
+        "semanticCache": semantic_cache.stats() if semantic_cache is not None else {"enabled": False},
+        "embeddingModels": get_model_manager().stats(),
+    }
+
+
+async def kdbai_cache_invalidate_impl(table_name: str, database_name: Optional[str] = None) -> Dict[str, Any]:
+    if database_name is None:
+        database_name = db_config.database_name
+    semantic_cache = get_semantic_cache()
+    if semantic_cache is not None:
+        semantic_cache.invalidate_table(database_name, table_name)
+    return {
+        "status": "success",
+        "database": database_name,
+        "table": table_name,
+    }
+
+
+def register_tools(mcp_server):
+    @mcp_server.tool()
+    async def kdbai_cache_stats() -> Dict[str, Any]:
+        """
+        Get hit rate and staleness metrics of the server side result caches, and the loaded embedding models.
+
+        Returns:
+            A dictionary with following data:
+                status: 'success'
+                semanticCache: semantic search cache metrics (hits, misses, hitRate, staleMisses,
+                    avgHitSimilarity, invalidations, keys, entries), or enabled: False when it is turned off
+                embeddingModels: loaded local embedding models (maxBytes, residentBytes, evictions, and
+                    models with provider, model, options, bytes, loadSeconds, idleSeconds, most recently used first)
+        """
+        return await kdbai_cache_stats_impl()
+
+    @mcp_server.tool()
+    async def kdbai_cache_invalidate(table_name: str, database_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Drop cached search results of a table, e.g. after its data was changed outside this server.
+
+        Args:
+            table_name: Name of the table
+            database_name: Name of the database (optional: defaults to configured database)
+
+        Returns:
+            A dictionary with status, database and table.
+        """
+        return await kdbai_cache_invalidate_impl(table_name, database_name)
+
+    return [
+        "kdbai_cache_stats",
+        "kdbai_cache_invalidate",
+    ]
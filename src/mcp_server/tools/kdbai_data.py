@@ -1,9 +1,16 @@
+import asyncio
 import logging
 from typing import Optional, Dict, Any, List
-from mcp_server.utils.embeddings import get_provider
 from mcp_server.utils.embeddings_helpers import get_embedding_config
-from mcp_server.utils.kdbai import get_table
-from mcp_server.utils.filters import parse_temporal_filters
+from mcp_server.utils.query_handles import resolve_query, dense_query_vector, sparse_query_vector
+from mcp_server.utils.kdbai import get_table_async, kdbai_acall
+from mcp_server.utils.filters import parse_temporal_filters, validate_filters, InvalidFilter, invalid_filter_response
+from mcp_server.utils.deadlines import Deadline, DeadlineExceeded, timeout_response
+from mcp_server.utils.budgets import ResultBudget, ResultTooLarge, result_too_large_response
+from mcp_server.utils.catalog import get_catalog
+from mcp_server.utils.semantic_cache import get_semantic_cache, cache_key
+from mcp_server.utils.serialization import fast_json_enabled, frame_records, to_tool_result
+from mcp_server.utils.profiling import profiling, stage, note_cache
 from mcp_server.server import app_settings
 import numpy as np
 import pandas as pd
@@ -11,55 +18,164 @@ import pandas as pd
 db_config = app_settings.db
 logger = logging.getLogger(__name__)
 
-# Normalizes the result from query and search operations
-def normalize_result(df: Dict, table)-> Any:
+# Appended to text values cut short by max_text_chars
+TRUNCATION_MARKER = "...[truncated {count} chars]"
+
+
+def truncate_text(value: Any, max_chars: int) -> Any:
+    if isinstance(value, bytes):
+        if len(value) <= max_chars:
+            return value
+        value = value.decode("utf-8", errors="replace")
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars] + TRUNCATION_MARKER.format(count=len(value) - max_chars)
+    return value
+
+
+def project_columns(columns: Optional[List[str]],
+                    sort_columns: Optional[List[str]],
+                    group_by: Optional[List[str]],
+                    aggs: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Aggregations that make KDB.AI return only the requested columns.
+    Grouped or aggregated calls already choose their output columns, those are projected after the call.
+    """
+    if not columns or aggs is not None or group_by is not None:
+        return aggs
+    # Sorting happens on the projected result, so sort columns have to be part of it
+    selected = list(dict.fromkeys([*columns, *(sort_columns or [])]))
+    return {c: c for c in selected}
+
+
+def normalize_frame(df: pd.DataFrame, table,
+                    columns: Optional[List[str]] = None,
+                    max_text_chars: Optional[int] = None) -> pd.DataFrame:
     # Remove embedding columns if they exist
     if table.indexes:
         embedding_columns = {t['column'] for t in table.indexes}
         df = df.drop(columns=embedding_columns, errors='ignore')
-    # serialize numpy ndarray type (emedding columns)
-    df = df.map(lambda x: x.tolist() if isinstance(x, np.ndarray) else x)
+    # keep the requested columns, and the ones KDB.AI adds like __nn_distance
+    if columns:
+        df = df[[c for c in df.columns if c in columns or str(c).startswith("__")]]
+    if max_text_chars is not None:
+        for col_name in df.columns:
+            if df[col_name].dtype == object:
+                df[col_name] = df[col_name].map(lambda x: truncate_text(x, max_text_chars))
     # convert timespan type (KDB time type)
     for col_name, col_type in df.dtypes.items():
         timespan_type = str(col_type).lower().startswith("timedelta")
         duration_type = str(col_type).lower().startswith("duration")
         if timespan_type or duration_type:
             df[col_name] = (pd.Timestamp("1970-01-01") + df[col_name]).dt.time
-        # convert to dict
-    return df.to_dict('records') if hasattr(df, 'to_dict') else df
-    
+    return df
+
+
+# Normalizes the result from query and search operations
+def normalize_result(df: Dict, table,
+                     columns: Optional[List[str]] = None,
+                     max_text_chars: Optional[int] = None)-> Any:
+    if not hasattr(df, 'to_dict'):
+        return df
+    df = normalize_frame(df, table, columns, max_text_chars)
+    if fast_json_enabled():
+        # orjson serializes numpy values directly, skip converting every cell to Python objects
+        return frame_records(df)
+    # serialize numpy ndarray type (emedding columns)
+    df = df.map(lambda x: x.tolist() if isinstance(x, np.ndarray) else x)
+    # convert to dict
+    return df.to_dict('records')
+
+
+def handle_deadline_exceeded(e: DeadlineExceeded, table_name: str, database_name: Optional[str]) -> Dict[str, Any]:
+    # An abandoned qipc call ends at its socket timeout and retires its session if it was still waiting
+    logger.error(f"Deadline exceeded on table {table_name} during {e.stage}")
+    return timeout_response(e, database=database_name, table=table_name)
+
+
+def check_filters(filters: Optional[List[Any]], schema: List[Dict[str, Any]], indexes: List[Dict[str, Any]]) -> None:
+    validate_filters(filters, schema, {i['column'] for i in indexes or []})
+
+
+def new_budget() -> ResultBudget:
+    return ResultBudget(db_config.max_response_bytes, db_config.large_result_action)
+
+
+async def expected_rows(table, table_name: str, database_name: str,
+                        query_filter: Optional[List[Any]], limit: Optional[int], max_rows: int) -> Optional[int]:
+    """
+    Most rows a plain query can return: its limit, capped by the table's row count.
+    When that is over max_rows and filters apply, the matching rows are counted instead. None when unknown.
+    """
+    catalog = get_catalog()
+    if catalog is not None:
+        row_count = (await catalog.atable(table_name, database_name)).get("rowCount")
+    else:
+        row_count = (await kdbai_acall(table.info)).get("rowCount")
+    rows = limit if row_count is None else row_count if limit is None else min(int(limit), row_count)
+    if rows is not None and rows > max_rows and query_filter:
+        counted = await kdbai_acall(table.query, filter=query_filter, aggs={"n": ["count", table.schema[0]['name']]})
+        rows = min(rows, int(counted["n"].iloc[0]))
+    return rows
+
+
 async def kdbai_query_data_impl(table_name: str,
                                 database_name: Optional[str] = None,
                                 filters: Optional[List[tuple]] = None,
                                 sort_columns: Optional[List[str]] = None,
                                 group_by: Optional[List[str]] = None,
                                 aggs: Optional[Dict[str, Any]] = None,
-                                limit: Optional[int] = None) -> Dict[str, Any]:
+                                limit: Optional[int] = None,
+                                timeout: Optional[float] = None,
+                                columns: Optional[List[str]] = None,
+                                max_text_chars: Optional[int] = None) -> Dict[str, Any]:
+    deadline = Deadline(db_config.query_timeout if timeout is None else timeout)
+    budget = new_budget()
     try:
         if database_name is None:
             database_name = db_config.database_name
 
-        table = get_table(table_name, database_name)
+        table = await deadline.run("kdbai", get_table_async(table_name, database_name))
+
+        with stage("filters"):
+            check_filters(filters, table.schema, table.indexes)
+            query_filter = parse_temporal_filters(filters, table.schema)
+
+        # Grouped and aggregated results are small, others are sized before they are fetched
+        aggregated = group_by is not None or any(isinstance(v, list) for v in (aggs or {}).values())
+        if budget.enabled and not aggregated:
+            row_bytes = budget.row_bytes(table.schema, table.indexes, columns, max_text_chars)
+            rows = await deadline.run("kdbai", expected_rows(table, table_name, database_name, query_filter,
+                                                             limit, budget.max_rows(row_bytes)))
+            if rows is not None:
+                limit = budget.check_rows(rows, row_bytes) or limit
 
         # Build query parameters efficiently
         query_params = {k: v for k, v in {
-            'filter': parse_temporal_filters(filters,table.schema),
+            'filter': query_filter,
             'sort_columns': sort_columns,
             'group_by': group_by,
-            'aggs': aggs,
+            'aggs': project_columns(columns, sort_columns, group_by, aggs),
             'limit': limit
         }.items() if v is not None}
 
-        result = table.query(**query_params)
-        result = normalize_result(result, table)
+        result = await deadline.run("kdbai", kdbai_acall(table.query, **query_params))
+        result = budget.check_frame(result, table.indexes, columns)
+        result = await deadline.run_sync("normalize", normalize_result, result, table, columns, max_text_chars)
         return {
             "status": "success",
             "database": database_name,
             "table": table_name,
             "recordsCount": len(result),
-            "records": result
+            "records": result,
+            **budget.truncation(len(result))
         }
 
+    except DeadlineExceeded as e:
+        return handle_deadline_exceeded(e, table_name, database_name)
+    except ResultTooLarge as e:
+        return result_too_large_response(e, database=database_name, table=table_name)
+    except InvalidFilter as e:
+        return invalid_filter_response(e, database=database_name, table=table_name)
     except Exception as e:
         logger.error(f"Error executing query on table {table_name}: {e}")
         return {
@@ -71,49 +187,95 @@ async def kdbai_query_data_impl(table_name: str,
 
 
 async def kdbai_similarity_search_impl( table_name: str,
-                                        query: str,
                                         vector_index_name: str,
+                                        query: Optional[str] = None,
                                         database_name: Optional[str] = None,
                                         n: Optional[int] = None,
                                         filters: Optional[List[tuple]] = None,
                                         sort_columns: Optional[List[str]] = None,
                                         group_by: Optional[List[str]] = None,
-                                        aggs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-
+                                        aggs: Optional[Dict[str, Any]] = None,
+                                        timeout: Optional[float] = None,
+                                        columns: Optional[List[str]] = None,
+                                        max_text_chars: Optional[int] = None,
+                                        query_handle: Optional[str] = None) -> Dict[str, Any]:
+
+    deadline = Deadline(db_config.search_timeout if timeout is None else timeout)
+    budget = new_budget()
     try:
         if database_name is None:
             database_name = db_config.database_name
         if n is None:
             n = db_config.k
 
-        embeddings_provider, embeddings_model, _, _ = get_embedding_config(database_name, table_name)
-        
-        dense_provider = get_provider(embeddings_provider)
-        query_vector = await dense_provider.dense_embed(query, embeddings_model)
-        table = get_table(table_name, database_name)
+        with stage("config"):
+            embeddings_provider, embeddings_model, _, _ = get_embedding_config(database_name, table_name)
+
+        # Reject bad filters before embedding the query when the catalog knows the table
+        catalog = get_catalog()
+        if filters and catalog is not None:
+            with stage("filters"):
+                meta = await catalog.atable(table_name, database_name)
+                check_filters(filters, meta["schema"], meta["indexes"])
+
+        query, query_handle = resolve_query(query, query_handle)
+        query_vector = await deadline.run("embedding", dense_query_vector(query_handle, query, embeddings_provider, embeddings_model))
+
+        semantic_cache = get_semantic_cache()
+        if semantic_cache is not None:
+            key = cache_key(database_name, table_name, vector_index_name,
+                            provider=embeddings_provider, model=embeddings_model, n=int(n), filters=filters,
+                            sort_columns=sort_columns, group_by=group_by, aggs=aggs,
+                            columns=columns, max_text_chars=max_text_chars)
+            cached = semantic_cache.lookup(key, query_vector)
+            note_cache("semantic", cached is not None)
+            if cached is not None:
+                response, similarity, age = cached
+                return {**response, "queryHandle": query_handle,
+                        "cache": {"hit": True, "similarity": round(similarity, 4), "ageSeconds": round(age, 1)}}
+
+        table = await deadline.run("kdbai", get_table_async(table_name, database_name))
+
+        with stage("filters"):
+            check_filters(filters, table.schema, table.indexes)
+            query_filter = parse_temporal_filters(filters, table.schema)
+        fetch_n = budget.check_rows(int(n), budget.row_bytes(table.schema, table.indexes, columns, max_text_chars))
 
         # Build search parameters efficiently
         search_params = {
-            "vectors": {vector_index_name: [query_vector]},
-            "n": int(n),
+            # 2-D float32 batch of one query, the client serialises it to q or JSON as the transport needs
+            "vectors": {vector_index_name: query_vector[np.newaxis, :]},
+            "n": fetch_n or int(n),
             **{k: v for k, v in {
-                'filter': parse_temporal_filters(filters,table.schema),
+                'filter': query_filter,
                 'sort_columns': sort_columns,
                 'group_by': group_by,
-                'aggs': aggs
+                'aggs': project_columns(columns, sort_columns, group_by, aggs)
             }.items() if v is not None}
         }
 
-        result = table.search(**search_params)[0]
-        result = normalize_result(result, table)
+        result = (await deadline.run("kdbai", kdbai_acall(table.search, **search_params)))[0]
+        result = budget.check_frame(result, table.indexes, columns)
+        result = await deadline.run_sync("normalize", normalize_result, result, table, columns, max_text_chars)
 
-        return {
+        response = {
             "status": "success",
             "database": database_name,
             "table": table_name,
+            "queryHandle": query_handle,
             "recordsCount": len(result),
-            "records": result
+            "records": result,
+            **budget.truncation(len(result))
         }
+        if semantic_cache is not None:
+            semantic_cache.store(key, query_vector, response)
+        return response
+    except DeadlineExceeded as e:
+        return handle_deadline_exceeded(e, table_name, database_name)
+    except ResultTooLarge as e:
+        return result_too_large_response(e, database=database_name, table=table_name)
+    except InvalidFilter as e:
+        return invalid_filter_response(e, database=database_name, table=table_name)
     except Exception as e:
         logger.error(f"Error performing search on table {table_name}: {e}")
         return {
@@ -125,57 +287,79 @@ async def kdbai_similarity_search_impl( table_name: str,
 
 
 async def kdbai_hybrid_search_impl(table_name: str,
-                                    query: str,
                                     vector_index_name: str,
                                     sparse_index_name: str,
+                                    query: Optional[str] = None,
                                     database_name: Optional[str] = None,
                                     n: Optional[int] = None,
                                     filters: Optional[List[tuple]] = None,
                                     sort_columns: Optional[List[str]] = None,
                                     group_by: Optional[List[str]] = None,
-                                    aggs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                                    aggs: Optional[Dict[str, Any]] = None,
+                                    timeout: Optional[float] = None,
+                                    columns: Optional[List[str]] = None,
+                                    max_text_chars: Optional[int] = None,
+                                    query_handle: Optional[str] = None) -> Dict[str, Any]:
+    deadline = Deadline(db_config.search_timeout if timeout is None else timeout)
+    budget = new_budget()
     try:
         if database_name is None:
             database_name = db_config.database_name
         if n is None:
             n = db_config.k
 
-        table = get_table(table_name, database_name)
+        table = await deadline.run("kdbai", get_table_async(table_name, database_name))
+
+        with stage("config"):
+            embeddings_provider, embeddings_model, sparse_tokenizer_provider, sparse_tokenizer_model = get_embedding_config(database_name, table_name)
 
-        embeddings_provider, embeddings_model, sparse_tokenizer_provider, sparse_tokenizer_model = get_embedding_config(database_name, table_name)
+        with stage("filters"):
+            check_filters(filters, table.schema, table.indexes)
+            query_filter = parse_temporal_filters(filters, table.schema)
 
-        dense_provider = get_provider(embeddings_provider)
-        sparse_provider = dense_provider if embeddings_provider==sparse_tokenizer_provider else  get_provider(sparse_tokenizer_provider)
-        query_vector = await dense_provider.dense_embed(query, embeddings_model)
-        query_sparse = await sparse_provider.sparse_embed(query, sparse_tokenizer_model)
+        query, query_handle = resolve_query(query, query_handle)
+        query_vector, query_sparse = await deadline.run("embedding", asyncio.gather(
+            dense_query_vector(query_handle, query, embeddings_provider, embeddings_model),
+            sparse_query_vector(query_handle, query, sparse_tokenizer_provider, sparse_tokenizer_model),
+        ))
 
+        fetch_n = budget.check_rows(int(n), budget.row_bytes(table.schema, table.indexes, columns, max_text_chars))
         search_params = {
             "vectors": {
-                vector_index_name: [query_vector],
+                vector_index_name: query_vector[np.newaxis, :],
                 sparse_index_name: [query_sparse],
             },
-            "n": int(n),
+            "n": fetch_n or int(n),
             "index_params": {
                 vector_index_name: {"weight": db_config.vector_weight},
                 sparse_index_name: {"weight": db_config.sparse_weight},
             },
             **{k: v for k, v in {
-                'filter': parse_temporal_filters(filters,table.schema),
+                'filter': query_filter,
                 'sort_columns': sort_columns,
                 'group_by': group_by,
-                'aggs': aggs
+                'aggs': project_columns(columns, sort_columns, group_by, aggs)
             }.items() if v is not None}
         }
 
-        result = table.search(**search_params)[0]
-        result = normalize_result(result, table)
+        result = (await deadline.run("kdbai", kdbai_acall(table.search, **search_params)))[0]
+        result = budget.check_frame(result, table.indexes, columns)
+        result = await deadline.run_sync("normalize", normalize_result, result, table, columns, max_text_chars)
         return {
             "status": "success",
             "database": database_name,
             "table": table_name,
+            "queryHandle": query_handle,
             "recordsCount": len(result),
-            "records": result
+            "records": result,
+            **budget.truncation(len(result))
         }
+    except DeadlineExceeded as e:
+        return handle_deadline_exceeded(e, table_name, database_name)
+    except ResultTooLarge as e:
+        return result_too_large_response(e, database=database_name, table=table_name)
+    except InvalidFilter as e:
+        return invalid_filter_response(e, database=database_name, table=table_name)
     except Exception as e:
         logger.error(f"Error performing hybrid search on table {table_name}: {e}")
         return {
@@ -186,15 +370,124 @@ async def kdbai_hybrid_search_impl(table_name: str,
         }
 
 
+async def kdbai_multi_index_search_impl(table_name: str,
+                                        indexes: List[Dict[str, Any]],
+                                        query: Optional[str] = None,
+                                        database_name: Optional[str] = None,
+                                        n: Optional[int] = None,
+                                        filters: Optional[List[tuple]] = None,
+                                        sort_columns: Optional[List[str]] = None,
+                                        group_by: Optional[List[str]] = None,
+                                        aggs: Optional[Dict[str, Any]] = None,
+                                        timeout: Optional[float] = None,
+                                        columns: Optional[List[str]] = None,
+                                        max_text_chars: Optional[int] = None) -> Dict[str, Any]:
+    deadline = Deadline(db_config.search_timeout if timeout is None else timeout)
+    budget = new_budget()
+    try:
+        if database_name is None:
+            database_name = db_config.database_name
+        if n is None:
+            n = db_config.k
+        if not indexes:
+            raise ValueError("At least one index is required")
+
+        table = await deadline.run("kdbai", get_table_async(table_name, database_name))
+
+        with stage("config"):
+            dense_provider, dense_model, sparse_provider, sparse_model = get_embedding_config(database_name, table_name)
+            index_types = {i['name']: i['type'] for i in table.indexes}
+            plan = []
+            for entry in indexes:
+                name = entry.get("index")
+                if name not in index_types:
+                    raise ValueError(f"Index '{name}' not found on table '{table_name}', available: {sorted(index_types)}")
+                if any(name == p[0] for p in plan):
+                    raise ValueError(f"Index '{name}' is listed more than once")
+                kind = "sparse" if index_types[name] == "bm25" else "dense"
+                provider = entry.get("provider") or (sparse_provider if kind == "sparse" else dense_provider)
+                model = entry.get("model") or (sparse_model if kind == "sparse" else dense_model)
+                text, handle = resolve_query(entry.get("query") or query, entry.get("query_handle"))
+                plan.append((name, kind, provider, model, text, handle, float(entry.get("weight", 1.0))))
+
+        with stage("filters"):
+            check_filters(filters, table.schema, table.indexes)
+            query_filter = parse_temporal_filters(filters, table.schema)
+
+        # Each distinct (representation, query) is embedded once, all of them concurrently
+        representations = {}
+        for _, kind, provider, model, text, handle, _ in plan:
+            representations.setdefault((kind, provider, model, handle), text)
+        embedded = await deadline.run("embedding", asyncio.gather(*[
+            (sparse_query_vector if kind == "sparse" else dense_query_vector)(handle, text, provider, model)
+            for (kind, provider, model, handle), text in representations.items()
+        ]))
+        vectors_by_representation = dict(zip(representations, embedded))
+
+        total_weight = sum(p[6] for p in plan)
+        if total_weight <= 0:
+            raise ValueError("Index weights must add up to more than 0")
+        vectors, index_params = {}, {}
+        for name, kind, provider, model, _, handle, weight in plan:
+            vector = vectors_by_representation[(kind, provider, model, handle)]
+            vectors[name] = [vector] if kind == "sparse" else vector[np.newaxis, :]
+            index_params[name] = {"weight": weight / total_weight}
+
+        fetch_n = budget.check_rows(int(n), budget.row_bytes(table.schema, table.indexes, columns, max_text_chars))
+        search_params = {
+            "vectors": vectors,
+            "n": fetch_n or int(n),
+            "index_params": index_params,
+            **{k: v for k, v in {
+                'filter': query_filter,
+                'sort_columns': sort_columns,
+                'group_by': group_by,
+                'aggs': project_columns(columns, sort_columns, group_by, aggs)
+            }.items() if v is not None}
+        }
+
+        result = (await deadline.run("kdbai", kdbai_acall(table.search, **search_params)))[0]
+        result = budget.check_frame(result, table.indexes, columns)
+        result = await deadline.run_sync("normalize", normalize_result, result, table, columns, max_text_chars)
+        return {
+            "status": "success",
+            "database": database_name,
+            "table": table_name,
+            "queryHandles": {p[0]: p[5] for p in plan},
+            "weights": {name: params["weight"] for name, params in index_params.items()},
+            "recordsCount": len(result),
+            "records": result,
+            **budget.truncation(len(result))
+        }
+    except DeadlineExceeded as e:
+        return handle_deadline_exceeded(e, table_name, database_name)
+    except ResultTooLarge as e:
+        return result_too_large_response(e, database=database_name, table=table_name)
+    except InvalidFilter as e:
+        return invalid_filter_response(e, database=database_name, table=table_name)
+    except Exception as e:
+        logger.error(f"Error performing multi-index search on table {table_name}: {e}")
+        return {
+            "status": "error",
+            "message": str(e),
+            "database": database_name,
+            "table": table_name,
+        }
+
+
 def register_tools(mcp_server):
-    @mcp_server.tool()
+    @mcp_server.tool(structured_output=not fast_json_enabled())
     async def kdbai_query_data(table_name: str,
                                 database_name: Optional[str] = None,
                                 filters: Optional[List[tuple]] = None,
                                 sort_columns: Optional[List[str]] = None,
                                 group_by: Optional[List[str]] = None,
                                 aggs: Optional[Dict[str, Any]] = None,
-                                limit: Optional[int] = None) -> Dict[str, Any]:
+                                limit: Optional[int] = None,
+                                timeout: Optional[float] = None,
+                                columns: Optional[List[str]] = None,
+                                max_text_chars: Optional[int] = None,
+                                profile: bool = False) -> Dict[str, Any]:
         """
         Query data from a KDBAI table with support for filtering, sorting, grouping,limit and aggregation.
         It removes the embedding columns from the output.
@@ -212,40 +505,58 @@ def register_tools(mcp_server):
             group_by: List of column names to group by, e.g. '["category"]'
             aggs: Dictionary of aggregation rules, e.g. '{"total": ["sum", "amount"]}'. It can use any KDB+ supported aggregation function like avg, max, sum etc.
             limit: String representation of maximum number of rows to return, e.g. "10"
+            timeout: Deadline in seconds for the whole call (optional: defaults to configured query timeout)
+            columns: Columns to return, e.g. '["id", "title"]' (optional: defaults to all non-embedding columns)
+            max_text_chars: Truncate text values longer than this many characters, e.g. 200, to skim many rows cheaply (optional)
+            profile: Add a 'profile' entry with milliseconds per stage (config, embedding, filters, kdbai, normalize, serialization), rows, response bytes and cache hits (optional)
 
         Returns:
-            Dictionary containing query results or error message
+            Dictionary containing query results or error message.
+            On deadline expiry the error has 'error': 'timeout' and the 'stage' that ran out of time.
+            A result too large for the server's byte budget fails with 'error': 'result_too_large' and a 'suggestedLimit',
+            or is cut to the rows that fit and flagged with a 'truncated' entry.
+            Filters that do not fit the table schema fail before reaching KDB.AI with 'error': 'invalid_filter'
+            and the 'path' of the offending part, e.g. filters[0][2].
 
         """
-        results = await kdbai_query_data_impl(
-            table_name, 
-            database_name, 
-            filters, 
-            sort_columns, 
-            group_by, 
-            aggs, 
-            limit
-        )
-        return results
-
-    @mcp_server.tool()
+        with profiling(profile) as query_profile:
+            results = await kdbai_query_data_impl(
+                table_name, 
+                database_name, 
+                filters, 
+                sort_columns, 
+                group_by, 
+                aggs, 
+                limit,
+                timeout,
+                columns,
+                max_text_chars
+            )
+        return to_tool_result(results, query_profile)
+
+    @mcp_server.tool(structured_output=not fast_json_enabled())
     async def kdbai_similarity_search(table_name: str,
-                            query: str,
                             vector_index_name: str,
+                            query: Optional[str] = None,
                             database_name: Optional[str] = None,
                             n: Optional[int] = None,
                             filters: Optional[List[tuple]] = None,
                             sort_columns: Optional[List[str]] = None,
                             group_by: Optional[List[str]] = None,
-                            aggs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                            aggs: Optional[Dict[str, Any]] = None,
+                            timeout: Optional[float] = None,
+                            columns: Optional[List[str]] = None,
+                            max_text_chars: Optional[int] = None,
+                            profile: bool = False,
+                            query_handle: Optional[str] = None) -> Dict[str, Any]:
         """
         Perform vector similarity search on a KDB.AI table.
         For search syntax and examples, see: file://kdbai_operations_guidance
 
         Args:
             table_name: Name of the table to search
-            query: Text query to convert to vector and search
             vector_index_name: Name of the vector index to search against
+            query: Text query to convert to vector and search (optional when query_handle is given, one of the two is required)
             embeddings_provider: Embedding provider ('sentence_transformers', 'openai', etc.)
             embeddings_model: Specific embedding model to use
             database (Optional[str], optional): Name of the database
@@ -258,43 +569,64 @@ def register_tools(mcp_server):
             group_by: List of column names to group by, e.g. '["category"]'
             aggs: Dictionary of aggregation rules, e.g. '{"total": ["sum", "amount"]}'. It can use any KDB+ supported aggregation function like avg, max, sum etc.
             limit: String representation of maximum number of rows to return, e.g. "10"
+            timeout: Deadline in seconds for the whole call including embedding (optional: defaults to configured search timeout)
+            columns: Columns to return, e.g. '["id", "title"]' (optional: defaults to all non-embedding columns)
+            max_text_chars: Truncate text values longer than this many characters, e.g. 200, to skim many rows cheaply (optional)
+            profile: Add a 'profile' entry with milliseconds per stage (config, embedding, filters, kdbai, normalize, serialization), rows, response bytes and cache hits (optional)
+            query_handle: The queryHandle returned by an earlier search, reuses its query and embeddings instead of embedding again (optional)
 
         Returns:
-            Dictionary containing search result.
+            Dictionary containing search result and a queryHandle for refining the search without embedding the query again.
+            When served from the semantic cache it has a 'cache' entry with the query similarity and result age.
+            On deadline expiry the error has 'error': 'timeout' and the 'stage' that ran out of time.
+            A result too large for the server's byte budget fails with 'error': 'result_too_large' and a 'suggestedLimit',
+            or is cut to the rows that fit and flagged with a 'truncated' entry.
+            Filters that do not fit the table schema fail before reaching KDB.AI with 'error': 'invalid_filter'
+            and the 'path' of the offending part, e.g. filters[0][2].
         """
-        results = await kdbai_similarity_search_impl(
-            table_name,
-            query, 
-            vector_index_name, 
-            database_name, 
-            n, 
-            filters, 
-            sort_columns, 
-            group_by, 
-            aggs
-        )
-        return results
-
-    @mcp_server.tool()
+        with profiling(profile) as query_profile:
+            results = await kdbai_similarity_search_impl(
+                table_name,
+                vector_index_name, 
+                query, 
+                database_name, 
+                n, 
+                filters, 
+                sort_columns, 
+                group_by, 
+                aggs,
+                timeout,
+                columns,
+                max_text_chars,
+                query_handle
+            )
+        return to_tool_result(results, query_profile)
+
+    @mcp_server.tool(structured_output=not fast_json_enabled())
     async def kdbai_hybrid_search(table_name: str,
-                                    query: str,
                                     vector_index_name: str,
                                     sparse_index_name: str,
+                                    query: Optional[str] = None,
                                     database_name: Optional[str] = None,
                                     n: Optional[int] = None,
                                     filters: Optional[List[tuple]] = None,
                                     sort_columns: Optional[List[str]] = None,
                                     group_by: Optional[List[str]] = None,
-                                    aggs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                                    aggs: Optional[Dict[str, Any]] = None,
+                                    timeout: Optional[float] = None,
+                                    columns: Optional[List[str]] = None,
+                                    max_text_chars: Optional[int] = None,
+                                    profile: bool = False,
+                                    query_handle: Optional[str] = None) -> Dict[str, Any]:
         """
         Performs hybrid search on a KDB.AI table by combining vector and text(sparse) search on a KDB.AI table.
         For search syntax and examples, see: file://kdbai_operations_guidance
 
         Args:
             table_name: Name of the table to search
-            query: Text query for both vector and text or sparse search
             vector_index_name: Name of the vector index for similarity search
             sparse_index_name: Name of the sparse index for text search
+            query: Text query for both vector and text or sparse search (optional when query_handle is given, one of the two is required)
             embeddings_provider: Embedding provider ('sentence_transformers', 'openai', etc.)
             embeddings_model: Specific embedding model to use
             sparse_tokenizer_provider: Tokenizer provider ('sentence_transformers', 'openai', etc.)
@@ -308,22 +640,101 @@ def register_tools(mcp_server):
             sort_columns: List of column names to sort by, e.g. '["price", "date"]'
             group_by: List of column names to group by, e.g. '["category"]'
             aggs: Dictionary of aggregation rules, e.g. '{"total": ["sum", "amount"]}'. It can use any KDB+ supported aggregation function like avg, max, sum etc.
+            timeout: Deadline in seconds for the whole call including embedding (optional: defaults to configured search timeout)
+            columns: Columns to return, e.g. '["id", "title"]' (optional: defaults to all non-embedding columns)
+            max_text_chars: Truncate text values longer than this many characters, e.g. 200, to skim many rows cheaply (optional)
+            profile: Add a 'profile' entry with milliseconds per stage (config, embedding, filters, kdbai, normalize, serialization), rows, response bytes and cache hits (optional)
+            query_handle: The queryHandle returned by an earlier search, reuses its query and embeddings instead of embedding again (optional)
+
+        Returns:
+            Dictionary containing hybrid search result and a queryHandle for refining the search without embedding the query again.
+            On deadline expiry the error has 'error': 'timeout' and the 'stage' that ran out of time.
+            A result too large for the server's byte budget fails with 'error': 'result_too_large' and a 'suggestedLimit',
+            or is cut to the rows that fit and flagged with a 'truncated' entry.
+            Filters that do not fit the table schema fail before reaching KDB.AI with 'error': 'invalid_filter'
+            and the 'path' of the offending part, e.g. filters[0][2].
+        """
+        with profiling(profile) as query_profile:
+            results = await kdbai_hybrid_search_impl(
+                table_name,
+                vector_index_name,
+                sparse_index_name,
+                query,
+                database_name,
+                n,
+                filters,
+                sort_columns,
+                group_by,
+                aggs,
+                timeout,
+                columns,
+                max_text_chars,
+                query_handle
+            )
+        return to_tool_result(results, query_profile)
+
+    @mcp_server.tool(structured_output=not fast_json_enabled())
+    async def kdbai_multi_index_search(table_name: str,
+                                       indexes: List[Dict[str, Any]],
+                                       query: Optional[str] = None,
+                                       database_name: Optional[str] = None,
+                                       n: Optional[int] = None,
+                                       filters: Optional[List[tuple]] = None,
+                                       sort_columns: Optional[List[str]] = None,
+                                       group_by: Optional[List[str]] = None,
+                                       aggs: Optional[Dict[str, Any]] = None,
+                                       timeout: Optional[float] = None,
+                                       columns: Optional[List[str]] = None,
+                                       max_text_chars: Optional[int] = None,
+                                       profile: bool = False) -> Dict[str, Any]:
+        """
+        Search any number of dense and sparse indexes of a KDB.AI table at once and merge the results by weight.
+        Use it on tables with several vector indexes, e.g. title and body embeddings, or embeddings from different models.
+        For search syntax and examples, see: file://kdbai_operations_guidance
+
+        Args:
+            table_name: Name of the table to search
+            indexes: One entry per index, e.g. '[{"index": "title_idx", "weight": 0.3}, {"index": "body_idx", "weight": 0.5, "query": "..."}, {"index": "sparse_idx", "weight": 0.2}]'
+                - index: Name of the index (required)
+                - weight: Relative weight of the index, weights are scaled to add up to 1 (optional: defaults to 1)
+                - query: Text to search this index with (optional: defaults to the query argument)
+                - query_handle: queryHandle from an earlier search, reuses its embeddings (optional)
+                - provider, model: Embedding provider and model for this index (optional: defaults to the table's configuration)
+            query: Text query used for every index that has no query of its own
+            database_name: Name of the database (optional: defaults to configured database)
+            n: Number of results to return
+            filters: List of filter conditions as q/kdb+ parse tree (operator, filter column name, value)
+            sort_columns: List of column names to sort by, e.g. '["price", "date"]'
+            group_by: List of column names to group by, e.g. '["category"]'
+            aggs: Dictionary of aggregation rules, e.g. '{"total": ["sum", "amount"]}'
+            timeout: Deadline in seconds for the whole call including embedding (optional: defaults to configured search timeout)
+            columns: Columns to return, e.g. '["id", "title"]' (optional: defaults to all non-embedding columns)
+            max_text_chars: Truncate text values longer than this many characters, e.g. 200, to skim many rows cheaply (optional)
+            profile: Add a 'profile' entry with milliseconds per stage (config, embedding, filters, kdbai, normalize, serialization), rows, response bytes and cache hits (optional)
 
         Returns:
-            Dictionary containing hybrid search result.
+            Dictionary containing the search result, the weight applied to each index and a queryHandle per index.
+            On deadline expiry the error has 'error': 'timeout' and the 'stage' that ran out of time.
+            A result too large for the server's byte budget fails with 'error': 'result_too_large' and a 'suggestedLimit',
+            or is cut to the rows that fit and flagged with a 'truncated' entry.
+            Filters that do not fit the table schema fail before reaching KDB.AI with 'error': 'invalid_filter'
+            and the 'path' of the offending part, e.g. filters[0][2].
         """
-        results = await kdbai_hybrid_search_impl(
-            table_name,
-            query,
-            vector_index_name,
-            sparse_index_name,
-            database_name,
-            n,
-            filters,
-            sort_columns,
-            group_by,
-            aggs
-        )
-        return results
-
-    return ["kdbai_query_data", "kdbai_similarity_search", "kdbai_hybrid_search"]
+        with profiling(profile) as query_profile:
+            results = await kdbai_multi_index_search_impl(
+                table_name,
+                indexes,
+                query,
+                database_name,
+                n,
+                filters,
+                sort_columns,
+                group_by,
+                aggs,
+                timeout,
+                columns,
+                max_text_chars
+            )
+        return to_tool_result(results, query_profile)
+
+    return ["kdbai_query_data", "kdbai_similarity_search", "kdbai_hybrid_search", "kdbai_multi_index_search"]
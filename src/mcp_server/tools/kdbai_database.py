@@ -1,6 +1,10 @@
+import asyncio
 import logging
 from typing import Optional, Dict, Any
-from mcp_server.utils.kdbai import get_kdbai_client
+from mcp_server.utils.kdbai import get_kdbai_client, kdbai_acall, use_async_rest
+from mcp_server.utils.kdbai_async import get_async_kdbai_client
+from mcp_server.utils.semantic_cache import get_semantic_cache
+from mcp_server.utils.catalog import get_catalog
 from mcp_server.server import app_settings
 
 db_config = app_settings.db
@@ -8,10 +12,20 @@ logger = logging.getLogger(__name__)
 
 async def kdbai_list_databases_impl() -> Dict[str, Any]:
     try:
-        client = get_kdbai_client()
+        catalog = get_catalog()
+        if catalog is not None:
+            return {
+                "status": "success",
+                "databases": (await catalog.asnapshot()).databases
+            }
+        if use_async_rest():
+            databases = await kdbai_acall(get_async_kdbai_client().database_names)
+        else:
+            client = await asyncio.to_thread(get_kdbai_client)
+            databases = [db.name for db in await kdbai_acall(client.databases)]
         return {
             "status": "success",
-            "databases": [db.name for db in client.databases()]
+            "databases": databases
         }
     except Exception as e:
         logger.error(f"Error listing databases: {e}")
@@ -22,11 +36,34 @@ async def kdbai_list_databases_impl() -> Dict[str, Any]:
 
 async def kdbai_databases_info_impl(database: Optional[str] = None) -> Dict[str, Any]:
     try:
-        client = get_kdbai_client()
-        if database is None: # all database info
-            info = client.databases_info()
-        else:  # specific database info
-            info = client.database(database).info()
+        catalog = get_catalog()
+        if catalog is not None:
+            if database is None:
+                info = (await catalog.asnapshot()).all_databases_info
+            else:
+                info = (await catalog.adatabase(database)).databases_info[database]
+            return {
+                "status": "success",
+                "info": info
+            }
+        if use_async_rest():
+            client = get_async_kdbai_client()
+            if database is None:
+                info = await kdbai_acall(client.databases_info)
+            else:
+                info = await kdbai_acall(client.database_info, database)
+        else:
+            client = await asyncio.to_thread(get_kdbai_client)
+            if database is None: # all database info
+                info = await kdbai_acall(client.databases_info)
+            else:  # specific database info
+                info = await kdbai_acall(lambda: client.database(database).info())
+        if database is not None:
+            semantic_cache = get_semantic_cache()
+            if semantic_cache is not None:
+                for table in info.get('tables', []):
+                    if 'rowCount' in table:
+                        semantic_cache.observe_row_count(database, table['name'], table['rowCount'])
         return {
             "status": "success",
             "info": info
@@ -0,0 +1,230 @@
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional, Dict, Any, List
+import numpy as np
+import pandas as pd
+from mcp_server.utils.kdbai import get_table_async, kdbai_acall
+from mcp_server.utils.filters import parse_temporal_filters, cast_temporal_value, InvalidFilter, invalid_filter_response
+from mcp_server.utils.deadlines import Deadline, DeadlineExceeded
+from mcp_server.utils.budgets import ResultTooLarge, result_too_large_response
+from mcp_server.utils.sampling import NUMERIC_TYPES, ORDERABLE_TYPES
+from mcp_server.utils.watermarks import get_watermarks
+from mcp_server.utils.serialization import fast_json_enabled, to_tool_result
+from mcp_server.utils.profiling import profiling, stage
+from mcp_server.tools.kdbai_data import (check_filters, expected_rows, handle_deadline_exceeded, new_budget,
+                                         normalize_result, project_columns)
+from mcp_server.server import app_settings
+
+db_config = app_settings.db
+logger = logging.getLogger(__name__)
+
+
+def to_watermark(value: Any) -> Any:
+    """Python value of a time column cell or a `since` argument, comparable across polls."""
+    if isinstance(value, np.generic):
+        value = pd.Timestamp(value) if isinstance(value, np.datetime64) else \
+            pd.Timedelta(value) if isinstance(value, np.timedelta64) else value.item()
+    if isinstance(value, pd.Timestamp):
+        value = value.to_pydatetime(warn=False)
+    elif isinstance(value, pd.Timedelta):
+        value = value.to_pytimedelta()
+    # Compare in naive UTC, the way KDB.AI stores timestamps
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def watermark_json(value: Any) -> Any:
+    if isinstance(value, timedelta):
+        return (datetime.min + value).time().isoformat()
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def parse_since(since: Any, column: Dict[str, str], schema: List[Dict[str, str]]) -> Any:
+    if not isinstance(since, str):
+        return to_watermark(since)
+    col_type = column["type"]
+    try:
+        if col_type in NUMERIC_TYPES:
+            return float(since) if col_type.startswith("float") else int(since)
+        if col_type.startswith("timedelta64"):
+            parsed = time.fromisoformat(since.split("T")[-1])
+            return datetime.combine(date.min, parsed) - datetime.min
+        value = cast_temporal_value(column["name"], since, schema)
+        if isinstance(value, str):
+            value = datetime.fromisoformat(since.replace("Z", "+00:00"))
+        return to_watermark(value)
+    except ValueError:
+        raise ValueError(f"since '{since}' does not fit {col_type} column '{column['name']}', pass the watermark returned by the previous call")
+
+
+async def kdbai_query_since_impl(table_name: str,
+                                 time_column: str,
+                                 cursor: Optional[str] = None,
+                                 since: Optional[Any] = None,
+                                 database_name: Optional[str] = None,
+                                 filters: Optional[List[Any]] = None,
+                                 columns: Optional[List[str]] = None,
+                                 limit: Optional[int] = None,
+                                 timeout: Optional[float] = None,
+                                 max_text_chars: Optional[int] = None) -> Dict[str, Any]:
+    deadline = Deadline(db_config.query_timeout if timeout is None else timeout)
+    budget = new_budget()
+    try:
+        if database_name is None:
+            database_name = db_config.database_name
+        if limit is not None:
+            limit = int(limit)
+        target = (database_name, table_name, time_column)
+        store = get_watermarks()
+
+        known = store.get(cursor) if cursor else None
+        if known is not None and known[0] != target:
+            raise ValueError(f"cursor '{cursor}' polls {'.'.join(known[0][:2])} on column '{known[0][2]}', not "
+                             f"{database_name}.{table_name} on column '{time_column}'")
+        if cursor and known is None and since is None:
+            raise ValueError(f"cursor '{cursor}' is unknown or expired, pass the last watermark as since")
+
+        table = await deadline.run("kdbai", get_table_async(table_name, database_name))
+        column = next((c for c in table.schema if c['name'] == time_column), None)
+        if column is None:
+            raise ValueError(f"time_column '{time_column}' not in table schema")
+        if column['type'] not in ORDERABLE_TYPES:
+            raise ValueError(f"time_column '{time_column}' is {column['type']}, a temporal or numeric column is required")
+        watermark = known[1] if known is not None else parse_since(since, column, table.schema)
+
+        with stage("filters"):
+            check_filters(filters, table.schema, table.indexes)
+            query_filter = list(parse_temporal_filters(filters, table.schema) or [])
+            if watermark is not None:
+                query_filter.append([">", time_column, watermark])
+        if columns and time_column not in columns:
+            columns = [*columns, time_column]
+
+        if budget.enabled:
+            row_bytes = budget.row_bytes(table.schema, table.indexes, columns, max_text_chars)
+            rows = await deadline.run("kdbai", expected_rows(table, table_name, database_name, query_filter or None,
+                                                             limit, budget.max_rows(row_bytes)))
+            if rows is not None:
+                limit = budget.check_rows(rows, row_bytes) or limit
+
+        query_params = {k: v for k, v in {
+            'filter': query_filter or None,
+            'sort_columns': [time_column],
+            'aggs': project_columns(columns, [time_column], None, None),
+            # One row past the limit shows whether the last rows share their time with rows left out
+            'limit': None if limit is None else limit + 1
+        }.items() if v is not None}
+
+        result = await deadline.run("kdbai", kdbai_acall(table.query, **query_params))
+        result = budget.check_frame(result, table.indexes, columns)
+
+        # A cut result may end inside a run of equal times, leave that run to the next call so no row is skipped
+        boundary = None
+        if limit is not None and len(result) > limit:
+            boundary = result[time_column].iloc[limit]
+            result = result.iloc[:limit]
+        elif budget.truncation(len(result)) and len(result) > 0:
+            boundary = result[time_column].iloc[-1]
+        if boundary is not None:
+            earlier = result[time_column] < boundary
+            if earlier.any():
+                result = result[earlier.to_numpy()]
+            else:
+                logger.warning(f"More than {len(result)} rows of {table_name} share {time_column} {boundary}, "
+                               f"rows after the cut at that time are skipped")
+        if len(result) > 0:
+            watermark = to_watermark(result[time_column].iloc[-1])
+
+        records = await deadline.run_sync("normalize", normalize_result, result, table, columns, max_text_chars)
+
+        # Only a call that returns its rows moves the cursor
+        if known is not None:
+            watermark = store.advance(cursor, watermark)
+        else:
+            cursor = store.create(target, watermark)
+        return {
+            "status": "success",
+            "database": database_name,
+            "table": table_name,
+            "timeColumn": time_column,
+            "cursor": cursor,
+            "watermark": watermark_json(watermark),
+            "hasMore": boundary is not None,
+            "recordsCount": len(records),
+            "records": records,
+            **budget.truncation(len(records))
+        }
+
+    except DeadlineExceeded as e:
+        return handle_deadline_exceeded(e, table_name, database_name)
+    except ResultTooLarge as e:
+        return result_too_large_response(e, database=database_name, table=table_name)
+    except InvalidFilter as e:
+        return invalid_filter_response(e, database=database_name, table=table_name)
+    except Exception as e:
+        logger.error(f"Error polling table {table_name}: {e}")
+        return {
+            "status": "error",
+            "message": str(e),
+            "database": database_name,
+            "table": table_name
+        }
+
+
+def register_tools(mcp_server):
+    @mcp_server.tool(structured_output=not fast_json_enabled())
+    async def kdbai_query_since(table_name: str,
+                                time_column: str,
+                                cursor: Optional[str] = None,
+                                since: Optional[Any] = None,
+                                database_name: Optional[str] = None,
+                                filters: Optional[List[Any]] = None,
+                                columns: Optional[List[str]] = None,
+                                limit: Optional[int] = None,
+                                timeout: Optional[float] = None,
+                                max_text_chars: Optional[int] = None,
+                                profile: bool = False) -> Dict[str, Any]:
+        """
+        Poll an append-only table for the rows added since the last call, oldest first.
+        Use it instead of kdbai_query_data when repeatedly reading recent rows, so each call only returns new data.
+
+        The first call returns a cursor. Pass it back on every following call and the server adds
+        a time_column > watermark filter, where the watermark is the latest time returned so far.
+
+        Args:
+            table_name: Name of the table to poll
+            time_column: Timestamp (or increasing numeric) column the table is appended in order of, e.g. "timestamp"
+            cursor: Cursor returned by the previous call (optional: omit on the first call)
+            since: Only return rows after this time, e.g. "2025-01-31T12:00:00", for a first call or when the cursor expired (optional)
+            database_name: Name of the database (optional: defaults to configured database)
+            filters: Additional filter conditions, same syntax as kdbai_query_data (optional)
+            columns: Columns to return, the time column is always included (optional)
+            limit: Maximum number of rows per call, e.g. 1000, larger than the rows sharing one time (optional)
+            timeout: Deadline in seconds for the whole call (optional: defaults to configured query timeout)
+            max_text_chars: Truncate text values longer than this many characters (optional)
+            profile: Add a 'profile' entry with milliseconds per stage, rows, response bytes and cache hits (optional)
+
+        Returns:
+            Dictionary with the new records, the cursor and watermark for the next call, and hasMore
+            when rows were left for the next call by the limit or the server's byte budget.
+            Errors have the same form as kdbai_query_data.
+        """
+        with profiling(profile) as query_profile:
+            results = await kdbai_query_since_impl(
+                table_name,
+                time_column,
+                cursor,
+                since,
+                database_name,
+                filters,
+                columns,
+                limit,
+                timeout,
+                max_text_chars
+            )
+        return to_tool_result(results, query_profile)
+
+    return ["kdbai_query_since"]
@@ -1,14 +1,15 @@
+import asyncio
 import logging
 from typing import Dict, Any
-from mcp_server.utils.kdbai import get_kdbai_client
+from mcp_server.utils.kdbai import get_kdbai_client, kdbai_acall
 
 logger = logging.getLogger(__name__)
 
 
 async def kdbai_session_info_impl() -> Dict[str, Any]:
     try:
-        client = get_kdbai_client()
-        info = client.session_info()
+        client = await asyncio.to_thread(get_kdbai_client)
+        info = await kdbai_acall(client.session_info)
         return info
     except Exception as e:
         logger.error(f"Error getting session info: {e}")
@@ -17,8 +18,8 @@ async def kdbai_session_info_impl() -> Dict[str, Any]:
 
 async def kdbai_system_info_impl() -> Dict[str, Any]:
     try:
-        client = get_kdbai_client()
-        info = client.system_info()
+        client = await asyncio.to_thread(get_kdbai_client)
+        info = await kdbai_acall(client.system_info)
         return info
     except Exception as e:
         logger.error(f"Error getting system info: {e}")
@@ -27,8 +28,8 @@ async def kdbai_system_info_impl() -> Dict[str, Any]:
 
 async def kdbai_process_info_impl() -> Dict[str, Any]:
     try:
-        client = get_kdbai_client()
-        info = client.process_info()
+        client = await asyncio.to_thread(get_kdbai_client)
+        info = await kdbai_acall(client.process_info)
         return info
     except Exception as e:
         logger.error(f"Error getting process info: {e}")
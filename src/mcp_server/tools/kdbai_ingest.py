@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List
+from mcp.server.fastmcp import Context
+from mcp_server.utils.kdbai import get_table
+from mcp_server.utils.ingest import IngestError, ingest_chunks, iter_file_chunks, iter_row_chunks, resolve_ingest_path
+from mcp_server.utils.semantic_cache import get_semantic_cache
+from mcp_server.utils.catalog import get_catalog
+from mcp_server.server import app_settings
+
+db_config = app_settings.db
+logger = logging.getLogger(__name__)
+
+
+def invalidate_table_caches(database_name: str, table_name: str) -> None:
+    semantic_cache = get_semantic_cache()
+    if semantic_cache is not None:
+        semantic_cache.invalidate_table(database_name, table_name)
+    catalog = get_catalog()
+    if catalog is not None:
+        catalog.request_refresh()
+
+
+async def kdbai_insert_impl(table_name: str,
+                            rows: Optional[List[Dict[str, Any]]] = None,
+                            file_path: Optional[str] = None,
+                            text_column: Optional[str] = None,
+                            database_name: Optional[str] = None,
+                            chunk_size: Optional[int] = None,
+                            ctx: Optional[Context] = None) -> Dict[str, Any]:
+    if database_name is None:
+        database_name = db_config.database_name
+    if chunk_size is None:
+        chunk_size = db_config.ingest_chunk_size
+    rows_inserted = 0
+    try:
+        if (rows is None) == (file_path is None):
+            raise ValueError("Provide exactly one of rows or file_path")
+        if file_path is not None:
+            file_path = str(resolve_ingest_path(file_path, db_config.ingest_allowed_dir))
+
+        # Inserts go through kdbai_client even with --db.rest-async, fetched off the event loop
+        table = await asyncio.to_thread(get_table, table_name, database_name)
+        if rows is not None:
+            chunks, total = iter_row_chunks(rows, chunk_size), len(rows)
+        else:
+            chunks, total = iter_file_chunks(file_path, table.schema, chunk_size), None
+
+        progress = ctx.report_progress if ctx is not None else None
+        try:
+            result = await ingest_chunks(table, database_name, table_name, chunks, text_column, total, progress)
+        except IngestError as e:
+            rows_inserted = e.rows_inserted
+            raise
+        finally:
+            invalidate_table_caches(database_name, table_name)
+
+        return {
+            "status": "success",
+            "database": database_name,
+            "table": table_name,
+            **result
+        }
+    except Exception as e:
+        logger.error(f"Error inserting into table {table_name}: {e}")
+        return {
+            "status": "error",
+            "message": str(e),
+            "database": database_name,
+            "table": table_name,
+            "rowsInserted": rows_inserted
+        }
+
+
+def register_tools(mcp_server):
+    @mcp_server.tool()
+    async def kdbai_insert(table_name: str,
+                           rows: Optional[List[Dict[str, Any]]] = None,
+                           file_path: Optional[str] = None,
+                           text_column: Optional[str] = None,
+                           database_name: Optional[str] = None,
+                           chunk_size: Optional[int] = None,
+                           ctx: Context = None) -> Dict[str, Any]:
+        """
+        Insert rows into a KDB.AI table, computing the embeddings of its indexes with the configured providers.
+        Input is split into chunks, the next chunk is embedded while the previous one is being inserted.
+        Progress is reported as rows inserted.
+
+        Args:
+            table_name: Name of the table to insert into
+            rows: List of rows, each a dictionary of column name to value. Give either rows or file_path.
+            file_path: Path to a .csv, .jsonl, .ndjson, .json, .parquet or .arrow/.feather file in the server's
+                ingest directory, relative to it or absolute. Give either rows or file_path. Only available when the
+                server sets an ingest directory. Parquet and Arrow files are streamed with constant memory.
+            text_column: Column whose text is embedded for index columns missing from the input,
+                e.g. "text". Required only when the input does not already contain the index columns.
+            database_name: Name of the database (optional: defaults to configured database)
+            chunk_size: Number of rows per embedding and insert batch (optional: defaults to configured chunk size)
+
+        Returns:
+            Dictionary with status, rowsInserted and chunks, or error message.
+            On error rowsInserted is the number of rows inserted before the failure.
+        """
+        return await kdbai_insert_impl(
+            table_name,
+            rows,
+            file_path,
+            text_column,
+            database_name,
+            chunk_size,
+            ctx
+        )
+
+    return ["kdbai_insert"]
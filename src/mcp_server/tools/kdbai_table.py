@@ -1,6 +1,10 @@
+import asyncio
 import logging
 from typing import Optional, Dict, Any, List
-from mcp_server.utils.kdbai import get_kdbai_client, get_table
+from mcp_server.utils.kdbai import get_kdbai_client, get_table_async, kdbai_acall, use_async_rest
+from mcp_server.utils.kdbai_async import get_async_kdbai_client
+from mcp_server.utils.semantic_cache import get_semantic_cache
+from mcp_server.utils.catalog import get_catalog
 from mcp_server.server import app_settings
 
 db_config = app_settings.db
@@ -11,9 +15,14 @@ async def list_tables_impl(database_name: Optional[str] = None) -> List[str]:
     try:
         if database_name is None:
             database_name = db_config.database_name
-        client = get_kdbai_client()
-        db = client.database(database_name)
-        tables = [table.name for table in db.tables]
+        catalog = get_catalog()
+        if catalog is not None:
+            return {'database': database_name, 'tables': list((await catalog.adatabase(database_name)).tables[database_name])}
+        if use_async_rest():
+            tables = await kdbai_acall(get_async_kdbai_client().table_names, database_name)
+        else:
+            client = await asyncio.to_thread(get_kdbai_client)
+            tables = await kdbai_acall(lambda: [table.name for table in client.database(database_name).tables])
         return {'database': database_name, 'tables': tables}
     except Exception as e:
         logger.error(f"Error listing tables in database {database_name}: {e}")
@@ -33,9 +42,11 @@ async def kdbai_table_info_impl(table_name: str, database_name: Optional[str] =
         if database_name is None:
             database_name = db_config.database_name
 
-        client = get_kdbai_client()
-        table = client.database(database_name).table(table_name)
-        data = table.info()
+        table = await get_table_async(table_name, database_name)
+        data = await kdbai_acall(table.info)
+        semantic_cache = get_semantic_cache()
+        if semantic_cache is not None and 'rowCount' in data:
+            semantic_cache.observe_row_count(database_name, table_name, data['rowCount'])
         data['schema'] = table.schema
         if len(table.indexes) > 0:
             data['indexes'] = table.indexes
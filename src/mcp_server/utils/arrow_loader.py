@@ -0,0 +1,118 @@
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+ARROW_SUFFIXES = {".arrow", ".feather", ".ipc"}
+
+# KDB.AI vector column types and the numpy dtype of their elements
+_VECTOR_TYPES = {"float32s": np.float32, "float64s": np.float64}
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("pyarrow not installed. Add it in the pyproject.toml")
+    return pyarrow
+
+
+def _vector_column(name: str, column, dtype) -> List[np.ndarray]:
+    """
+    Convert an Arrow list column into one numpy vector per row.
+    When the values are already of the right dtype and every row has the same length the rows
+    are views into the Arrow buffer, which is the memory-mapped file itself.
+    """
+    pa = _import_pyarrow()
+    if column.null_count:
+        raise ValueError(f"Vector column '{name}' contains nulls")
+    if isinstance(column.type, pa.FixedSizeListType):
+        width = column.type.list_size
+        values = column.flatten()
+    else:
+        offsets = column.offsets.to_numpy()
+        lengths = np.diff(offsets)
+        values = column.flatten()
+        if len(lengths) and (lengths != lengths[0]).any():
+            flat = np.asarray(values.to_numpy(zero_copy_only=False), dtype=dtype)
+            return [np.ascontiguousarray(v) for v in np.split(flat, offsets[1:-1] - offsets[0])]
+        width = int(lengths[0]) if len(lengths) else 0
+
+    if values.null_count == 0 and values.type == pa.from_numpy_dtype(dtype):
+        flat = values.to_numpy(zero_copy_only=True)
+    else:
+        flat = np.asarray(values.to_numpy(zero_copy_only=False), dtype=dtype)
+    return list(flat.reshape(len(column), width))
+
+
+def record_batch_to_frame(batch, schema: List[Dict[str, str]]) -> pd.DataFrame:
+    """Convert a record batch to a DataFrame, vector columns become float arrays without copying where possible."""
+    column_types = {c['name']: c['type'] for c in schema}
+    data: Dict[str, Any] = {}
+    for name, column in zip(batch.schema.names, batch.columns):
+        dtype = _VECTOR_TYPES.get(column_types.get(name))
+        if dtype is not None:
+            data[name] = _vector_column(name, column, dtype)
+        else:
+            data[name] = column.to_pandas()
+    return pd.DataFrame(data)
+
+
+def _slices(batch, chunk_size: int):
+    # Record batch slices are zero-copy views
+    for start in range(0, batch.num_rows, chunk_size):
+        yield batch.slice(start, chunk_size)
+
+
+def iter_arrow_chunks(file_path: str, schema: List[Dict[str, str]], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Stream a Parquet or Arrow IPC file as DataFrames of at most chunk_size rows.
+
+    The file is memory-mapped and read one record batch at a time, so memory use does not grow with
+    the file size. Only columns of the table schema are read, others are skipped with a warning.
+    """
+    pa = _import_pyarrow()
+    path = Path(file_path).expanduser()
+    if not path.is_file():
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    wanted = {c['name'] for c in schema}
+    suffix = path.suffix.lower()
+
+    if suffix in PARQUET_SUFFIXES:
+        parquet_file = pa.parquet.ParquetFile(path, memory_map=True)
+        names = parquet_file.schema_arrow.names
+        columns = [n for n in names if n in wanted]
+        skipped = [n for n in names if n not in wanted]
+        if skipped:
+            logger.warning(f"Skipping columns not in table schema: {skipped}")
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield record_batch_to_frame(batch, schema)
+
+    elif suffix in ARROW_SUFFIXES:
+        with pa.memory_map(str(path), "r") as source:
+            try:
+                reader = pa.ipc.open_file(source)
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            except pa.ArrowInvalid:
+                source.seek(0)
+                reader = pa.ipc.open_stream(source)
+                batches = iter(reader)
+            names = reader.schema.names
+            skipped = [n for n in names if n not in wanted]
+            if skipped:
+                logger.warning(f"Skipping columns not in table schema: {skipped}")
+            for batch in batches:
+                batch = batch.select([n for n in names if n in wanted])
+                for chunk in _slices(batch, chunk_size):
+                    yield record_batch_to_frame(chunk, schema)
+
+    else:
+        raise ValueError(f"Unsupported file type '{suffix}'")
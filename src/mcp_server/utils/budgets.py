@@ -0,0 +1,150 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Estimated bytes of one value in the response, per column type, including its JSON key and punctuation
+_VALUE_BYTES = {
+    "bool": 8, "uint8": 8, "int16": 10, "int32": 14, "int64": 22,
+    "float32": 18, "float64": 26, "char": 8, "guid": 42, "str": 28,
+    "datetime64[ns]": 34, "datetime64[M]": 12, "datetime64[D]": 14,
+    "timedelta64[ns]": 22, "timedelta64[m]": 12, "timedelta64[s]": 12, "timedelta64[ms]": 16,
+}
+# Text and general values have no fixed width, these are assumed when nothing bounds them
+_TEXT_BYTES = 1024
+_GENERAL_BYTES = 256
+_LIST_VALUES = 64
+_VECTOR_DIMS = 1536
+# Rows measured to size a fetched result
+_MEASURED_ROWS = 1000
+
+
+def _index_column_bytes(indexes: List[Dict[str, Any]]) -> Dict[str, int]:
+    """In-memory bytes per row of the indexed columns: float32 vectors, or sparse token counts."""
+    return {i['column']: _GENERAL_BYTES if i.get('type') == 'bm25' else 4 * ((i.get('params') or {}).get('dims') or _VECTOR_DIMS)
+            for i in indexes or []}
+
+
+class ResultTooLarge(Exception):
+    """Raised when the result of a tool call would exceed its byte budget."""
+
+    def __init__(self, stage: str, estimated_bytes: int, estimated_rows: int, max_bytes: int, max_rows: int):
+        super().__init__(
+            f"Result of about {estimated_bytes} bytes ({estimated_rows} rows) exceeds the budget of {max_bytes} bytes"
+            f" per request, estimated {'from the row count and schema' if stage == 'estimate' else 'on the fetched rows'}."
+            f" Request at most {max_rows} rows, fewer columns, a smaller max_text_chars or narrower filters"
+        )
+        self.stage = stage
+        self.estimated_bytes = estimated_bytes
+        self.estimated_rows = estimated_rows
+        self.max_bytes = max_bytes
+        self.max_rows = max_rows
+
+
+class ResultBudget:
+    """
+    Byte budget for the result of a single tool call.
+
+    The result is checked twice: before the KDB.AI call, from the expected row count and the
+    schema, and on the fetched DataFrame before normalization copies it into records and JSON.
+    Over budget, the call either fails with ResultTooLarge or, with action 'truncate', returns
+    as many rows as fit and reports the cut in truncation(). A budget <= 0 disables both checks.
+    """
+
+    def __init__(self, max_bytes: int, action: str = "error"):
+        self.max_bytes = max_bytes if max_bytes and max_bytes > 0 else None
+        self.action = action
+        self._truncated: Optional[Dict[str, Any]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes is not None
+
+    @staticmethod
+    def row_bytes(schema: List[Dict[str, Any]], indexes: List[Dict[str, Any]],
+                  columns: Optional[List[str]] = None, max_text_chars: Optional[int] = None) -> int:
+        """
+        Estimated bytes per row of a query or search result. Indexed columns are not returned but
+        are fetched unless columns are selected, they count with their in-memory size.
+        """
+        index_bytes = _index_column_bytes(indexes)
+        text_bytes = _TEXT_BYTES if max_text_chars is None else min(_TEXT_BYTES, max_text_chars + 32)
+        total = 0
+        for column in schema:
+            name, col_type = column['name'], column['type']
+            if columns and name not in columns:
+                continue
+            elif name in index_bytes:
+                total += index_bytes[name]
+            elif col_type in ("bytes", "strs"):
+                total += text_bytes
+            elif col_type in _VALUE_BYTES:
+                total += _VALUE_BYTES[col_type]
+            elif col_type.endswith("s") and col_type[:-1] in _VALUE_BYTES:
+                total += _LIST_VALUES * _VALUE_BYTES[col_type[:-1]]
+            else:
+                total += _GENERAL_BYTES
+        # Search results carry a distance
+        return max(1, total + _VALUE_BYTES["float32"])
+
+    def max_rows(self, row_bytes: int) -> int:
+        return max(1, self.max_bytes // max(1, row_bytes))
+
+    def check_rows(self, rows: int, row_bytes: int) -> Optional[int]:
+        """
+        Check the estimated size of `rows` rows before fetching them.
+        Returns the row limit to fetch instead when the result is truncated, otherwise None.
+        """
+        if not self.enabled or rows * row_bytes <= self.max_bytes:
+            return None
+        max_rows = self.max_rows(row_bytes)
+        if self.action != "truncate":
+            raise ResultTooLarge("estimate", rows * row_bytes, rows, self.max_bytes, max_rows)
+        logger.warning(f"Estimated result of {rows * row_bytes} bytes exceeds {self.max_bytes}, fetching {max_rows} of {rows} rows")
+        self._truncated = {"estimatedRows": rows, "estimatedBytes": rows * row_bytes}
+        return max_rows
+
+    def check_frame(self, df: Any, indexes: List[Dict[str, Any]], columns: Optional[List[str]] = None) -> Any:
+        """
+        Measure a fetched result on the columns normalization keeps and its indexed columns, and cut it to the budget or fail.
+        Results that are not DataFrames pass unchanged.
+        """
+        if not self.enabled or not isinstance(df, pd.DataFrame) or df.empty:
+            return df
+        index_bytes = _index_column_bytes(indexes)
+        kept = [c for c in df.columns if c not in index_bytes and (not columns or c in columns or str(c).startswith("__"))]
+        # Memory of evenly spaced rows, deep so text and nested values count, plus the fetched vectors
+        measured = df[kept].iloc[::max(1, len(df) // _MEASURED_ROWS)]
+        row_bytes = int(measured.memory_usage(deep=True, index=False).sum() / len(measured))
+        row_bytes = max(1, row_bytes + sum(b for c, b in index_bytes.items() if c in df.columns))
+        size = row_bytes * len(df)
+        if size <= self.max_bytes:
+            return df
+        max_rows = self.max_rows(row_bytes)
+        if self.action != "truncate":
+            raise ResultTooLarge("fetched", size, len(df), self.max_bytes, max_rows)
+        logger.warning(f"Fetched result of about {size} bytes exceeds {self.max_bytes}, returning {max_rows} of {len(df)} rows")
+        estimated_rows = max(len(df), (self._truncated or {}).get("estimatedRows", 0))
+        self._truncated = {"estimatedRows": estimated_rows, "estimatedBytes": row_bytes * estimated_rows}
+        return df.iloc[:max_rows]
+
+    def truncation(self, returned_rows: int) -> Dict[str, Any]:
+        """Response entry describing a truncated result, empty when nothing was cut."""
+        if self._truncated is None:
+            return {}
+        return {"truncated": {**self._truncated, "returnedRows": returned_rows, "maxResponseBytes": self.max_bytes}}
+
+
+def result_too_large_response(e: ResultTooLarge, **context: Any) -> Dict[str, Any]:
+    return {
+        "status": "error",
+        "error": "result_too_large",
+        "estimatedBytes": e.estimated_bytes,
+        "estimatedRows": e.estimated_rows,
+        "maxResponseBytes": e.max_bytes,
+        "suggestedLimit": e.max_rows,
+        "message": str(e),
+        **context,
+    }
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from mcp_server.server import app_settings
+from mcp_server.utils.kdbai import get_kdbai_client, kdbai_call
+from mcp_server.utils.semantic_cache import get_semantic_cache
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogSnapshot:
+    """Immutable view of the KDB.AI catalog as fetched by one refresh."""
+
+    def __init__(self, all_databases_info: Dict[str, Any], databases_info: Dict[str, Dict[str, Any]],
+                 tables: Dict[str, Dict[str, Dict[str, Any]]], started_at: float):
+        self.all_databases_info = all_databases_info
+        self.databases_info = databases_info
+        # database -> table -> {"schema", "indexes", "rowCount"}
+        self.tables = tables
+        self.started_at = started_at
+        self.refreshed_at = time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.refreshed_at
+
+    @property
+    def databases(self) -> List[str]:
+        return list(self.tables)
+
+
+class Catalog:
+    """
+    In-memory copy of databases, tables, schemas, indexes and row counts.
+
+    A daemon thread refreshes it every `refresh_interval` seconds. Reads never see a snapshot
+    older than `stale_after` seconds: if the background refresh has fallen behind, the read
+    refreshes synchronously and raises if KDB.AI cannot be reached. `request_refresh()` wakes
+    the background thread, it is called after errors that suggest the catalog is out of date,
+    and reads keep being served from the current snapshot until the new one is in.
+
+    Coroutines use `asnapshot()`, `adatabase()` and `atable()`, which answer from a fresh
+    snapshot without leaving the event loop and only fetch from KDB.AI in a worker thread.
+    """
+
+    def __init__(self, refresh_interval: float, stale_after: float):
+        self.refresh_interval = refresh_interval
+        self.stale_after = max(stale_after, refresh_interval)
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._refresh_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def _ensure_thread(self) -> None:
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                # Threads do not survive fork and a lock held by one at fork time never gets released,
+                # every worker process starts its own refresher
+                self._refresh_lock = threading.Lock()
+                self._wake = threading.Event()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._refresh_loop, name="kdbai-catalog", daemon=True)
+            self._thread.start()
+
+    def _refresh_loop(self) -> None:
+        while True:
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Catalog background refresh failed: {e}")
+
+    def _fetch(self, started_at: float) -> CatalogSnapshot:
+        client = get_kdbai_client()
+        all_databases_info = kdbai_call(client.databases_info)
+        databases_info = {}
+        tables = {}
+        for database in kdbai_call(client.databases, include_tables=True):
+            info = kdbai_call(database.info)
+            row_counts = {t.get('name'): t.get('rowCount') for t in info.get('tables', [])}
+            databases_info[database.name] = info
+            tables[database.name] = {
+                table.name: {
+                    "schema": table.schema,
+                    "indexes": table.indexes,
+                    "rowCount": row_counts.get(table.name),
+                }
+                for table in database.tables
+            }
+        return CatalogSnapshot(all_databases_info, databases_info, tables, started_at)
+
+    def refresh(self) -> CatalogSnapshot:
+        requested_at = time.monotonic()
+        with self._refresh_lock:
+            # A refresh that started after this one was requested has just finished, use it
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.started_at >= requested_at:
+                return snapshot
+            snapshot = self._fetch(time.monotonic())
+            self._snapshot = snapshot
+
+        semantic_cache = get_semantic_cache()
+        if semantic_cache is not None:
+            for database, tables in snapshot.tables.items():
+                for table, meta in tables.items():
+                    if meta["rowCount"] is not None:
+                        semantic_cache.observe_row_count(database, table, meta["rowCount"])
+        logger.debug(f"Catalog refreshed: {sum(len(t) for t in snapshot.tables.values())} tables")
+        return snapshot
+
+    def request_refresh(self) -> None:
+        self._ensure_thread()
+        self._wake.set()
+
+    def _fresh(self) -> Optional[CatalogSnapshot]:
+        self._ensure_thread()
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.age > self.stale_after:
+            return None
+        return snapshot
+
+    def snapshot(self) -> CatalogSnapshot:
+        snapshot = self._fresh()
+        if snapshot is None:
+            snapshot = self.refresh()
+        return snapshot
+
+    def database(self, database_name: str) -> CatalogSnapshot:
+        """Snapshot containing database_name, refreshed once if it is not known yet."""
+        snapshot = self.snapshot()
+        if database_name not in snapshot.tables:
+            snapshot = self.refresh()
+            if database_name not in snapshot.tables:
+                raise LookupError(f"Database '{database_name}' not found")
+        return snapshot
+
+    def table(self, table_name: str, database_name: str) -> Dict[str, Any]:
+        """Schema, indexes and row count of a table, refreshed once if it is not known yet."""
+        tables = self.database(database_name).tables[database_name]
+        if table_name not in tables:
+            tables = self.refresh().tables.get(database_name, {})
+            if table_name not in tables:
+                raise LookupError(f"Table '{table_name}' not found in database '{database_name}'")
+        return tables[table_name]
+
+    async def asnapshot(self) -> CatalogSnapshot:
+        snapshot = self._fresh()
+        if snapshot is None:
+            snapshot = await asyncio.to_thread(self.snapshot)
+        return snapshot
+
+    async def adatabase(self, database_name: str) -> CatalogSnapshot:
+        snapshot = self._fresh()
+        if snapshot is None or database_name not in snapshot.tables:
+            snapshot = await asyncio.to_thread(self.database, database_name)
+        return snapshot
+
+    async def atable(self, table_name: str, database_name: str) -> Dict[str, Any]:
+        snapshot = self._fresh()
+        if snapshot is not None and table_name in snapshot.tables.get(database_name, {}):
+            return snapshot.tables[database_name][table_name]
+        return await asyncio.to_thread(self.table, table_name, database_name)
+
+
+@lru_cache()
+def get_catalog() -> Optional[Catalog]:
+    """Return the catalog, or None when catalog caching is disabled."""
+    db_config = app_settings.db
+    if db_config.catalog_refresh_interval <= 0:
+        return None
+    return Catalog(db_config.catalog_refresh_interval, db_config.catalog_stale_after)
@@ -0,0 +1,73 @@
+import random
+import threading
+import time
+from typing import Iterator, Optional
+
+
+def backoff_delays(base: float, cap: float, attempts: Optional[int] = None) -> Iterator[float]:
+    """
+    Exponential backoff with full jitter.
+
+    Yields `attempts` delays (forever if None), each drawn uniformly from
+    [0, min(cap, base * 2**n)] so that many clients recovering at once spread out.
+    """
+    n = 0
+    while attempts is None or n < attempts:
+        yield random.uniform(0, min(cap, base * (2 ** n)))
+        n += 1
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker.
+
+    closed:    requests flow, consecutive failures are counted
+    open:      requests fail fast until reset_timeout has elapsed
+    half_open: a single probe request is let through, its outcome closes or re-opens the circuit
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            # Also covers a half_open probe that never reported back
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+from mcp_server.utils.profiling import record_stage
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Deadline of the stage running in this context, asyncio.to_thread carries it into worker threads
+_current: ContextVar[Optional["Deadline"]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a tool call runs past its deadline."""
+
+    def __init__(self, stage: str, timeout: float):
+        super().__init__(f"Deadline of {timeout}s exceeded during {stage}")
+        self.stage = stage
+        self.timeout = timeout
+
+
+class Deadline:
+    """
+    Wall-clock budget for a single tool call.
+
+    One Deadline is created per tool call and every stage of the call (embedding,
+    KDB.AI round trip, normalization) runs against the time that is left on it.
+    A timeout of None or <= 0 disables the deadline.
+    """
+
+    def __init__(self, timeout: Optional[float]):
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self._expires_at = None if self.timeout is None else time.monotonic() + self.timeout
+
+    def remaining(self) -> Optional[float]:
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - time.monotonic())
+
+    async def run(self, stage: str, awaitable: Awaitable[T]) -> T:
+        """Await `awaitable`, cancelling it if the deadline passes first."""
+        start = time.perf_counter()
+        token = _current.set(self)
+        try:
+            return await self._run(stage, awaitable)
+        finally:
+            _current.reset(token)
+            record_stage(stage, time.perf_counter() - start)
+
+    async def _run(self, stage: str, awaitable: Awaitable[T]) -> T:
+        remaining = self.remaining()
+        if remaining is None:
+            return await awaitable
+        if remaining <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise DeadlineExceeded(stage, self.timeout)
+        try:
+            return await asyncio.wait_for(awaitable, remaining)
+        except asyncio.TimeoutError:
+            logger.warning(f"Deadline of {self.timeout}s exceeded during {stage}")
+            raise DeadlineExceeded(stage, self.timeout) from None
+
+    async def run_sync(self, stage: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking function in a worker thread under the deadline."""
+        return await self.run(stage, asyncio.to_thread(func, *args, **kwargs))
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the tool call stage the caller runs for, None outside of one."""
+    return _current.get()
+
+
+def timeout_response(e: DeadlineExceeded, **context: Any) -> Dict[str, Any]:
+    return {
+        "status": "error",
+        "error": "timeout",
+        "stage": e.stage,
+        "timeout": e.timeout,
+        "message": str(e),
+        **context,
+    }
@@ -0,0 +1,169 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    text_hash BLOB NOT NULL,
+    vector BLOB NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (provider, model, text_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings (last_access);
+"""
+
+# Number of in-memory hits whose access time is batched before being written back
+_TOUCH_FLUSH_SIZE = 256
+
+CacheKey = Tuple[str, str, bytes]
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    """
+    Persistent store of query embeddings keyed by (provider, model, text hash).
+
+    Vectors are stored as packed little-endian float32 blobs in a SQLite database in WAL mode,
+    so any number of worker processes on the same host can read it while one writes.
+    A bounded in-memory LRU in front of it is warm-loaded with the most recently used
+    entries on startup. The database is trimmed to max_bytes by evicting the least
+    recently used vectors.
+    """
+
+    def __init__(self, path: str, max_bytes: int, memory_entries: int, read_only: bool = False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.read_only = read_only
+        self._memory: "OrderedDict[CacheKey, np.ndarray]" = OrderedDict()
+        self._touched: dict = {}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._stored_bytes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared with forked worker processes
+        if self._conn is None or self._pid != os.getpid():
+            if self.read_only:
+                conn = sqlite3.connect(f"{Path(self.path).as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            else:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.executescript(_SCHEMA)
+                self._stored_bytes = conn.execute(
+                    "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+                ).fetchone()[0]
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _remember(self, key: CacheKey, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def warm_load(self) -> int:
+        """Load the most recently used vectors into memory, returns the number loaded."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT provider, model, text_hash, vector FROM embeddings ORDER BY last_access DESC LIMIT ?",
+                (self.memory_entries,),
+            ).fetchall()
+            for provider, model, digest, blob in reversed(rows):
+                self._remember((provider, model, bytes(digest)), np.frombuffer(blob, dtype="<f4"))
+        logger.info(f"Embedding cache warm-loaded {len(rows)} vectors from {self.path}")
+        return len(rows)
+
+    def get(self, provider: str, model: str, text: str) -> Optional[np.ndarray]:
+        key = (provider, model, text_hash(text))
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self._touch(key)
+                return vector
+            row = self._connection().execute(
+                "SELECT vector FROM embeddings WHERE provider = ? AND model = ? AND text_hash = ?", key
+            ).fetchone()
+            if row is None:
+                return None
+            vector = np.frombuffer(row[0], dtype="<f4")
+            self._remember(key, vector)
+            self._touch(key)
+            return vector
+
+    def put(self, provider: str, model: str, text: str, vector: np.ndarray) -> None:
+        key = (provider, model, text_hash(text))
+        blob = np.ascontiguousarray(vector, dtype="<f4").tobytes()
+        with self._lock:
+            self._remember(key, np.frombuffer(blob, dtype="<f4"))
+            if self.read_only:
+                return
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO embeddings (provider, model, text_hash, vector, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (*key, blob, time.time()),
+                )
+            self._stored_bytes += len(blob)
+            if self._stored_bytes > self.max_bytes:
+                self._evict(conn)
+
+    def _touch(self, key: CacheKey) -> None:
+        if self.read_only:
+            return
+        self._touched[key] = time.time()
+        if len(self._touched) >= _TOUCH_FLUSH_SIZE:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE provider = ? AND model = ? AND text_hash = ?",
+                    [(ts, *k) for k, ts in self._touched.items()],
+                )
+            self._touched.clear()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # Other processes may have written too, so recount before trimming to 90% of the budget
+        self._stored_bytes = conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        if self._stored_bytes <= self.max_bytes:
+            return
+        evicted = 0
+        while self._stored_bytes > target:
+            rows = conn.execute(
+                "SELECT provider, model, text_hash, LENGTH(vector) FROM embeddings ORDER BY last_access LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for provider, model, digest, size in rows:
+                if self._stored_bytes <= target:
+                    break
+                victims.append((provider, model, digest))
+                self._stored_bytes -= size
+            with conn:
+                conn.executemany(
+                    "DELETE FROM embeddings WHERE provider = ? AND model = ? AND text_hash = ?", victims
+                )
+            evicted += len(victims)
+        logger.info(f"Embedding cache evicted {evicted} vectors, {self._stored_bytes} bytes stored")
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from mcp_server.server import app_settings
+
+logger = logging.getLogger(__name__)
+
+# Set in a worker process: its event loop running the provider coroutines, and its thread count
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_threads: Optional[int] = None
+
+
+def _init_worker(threads: int) -> None:
+    """Pin the thread count of the numeric libraries before any model loads."""
+    global _worker_loop, _worker_threads
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    _worker_threads = threads
+    _worker_loop = asyncio.new_event_loop()
+
+
+def worker_threads() -> Optional[int]:
+    """Thread count of this embedding worker process, None in the server process."""
+    return _worker_threads
+
+
+def _dense_embed_batch(provider_name: str, model_name: str, texts: List[str]) -> Tuple[str, Tuple[int, ...]]:
+    """Embed in a worker and write the vectors to a new shared memory block, returned by name and shape."""
+    from mcp_server.utils.embeddings import get_provider
+    vectors = _worker_loop.run_until_complete(get_provider(provider_name).dense_embed_batch(texts, model_name))
+    block = shared_memory.SharedMemory(create=True, size=max(1, vectors.nbytes))
+    try:
+        np.ndarray(vectors.shape, dtype=np.float32, buffer=block.buf)[...] = vectors
+    finally:
+        block.close()
+    return block.name, vectors.shape
+
+
+def _sparse_embed(provider_name: str, model_name: str, text: str) -> Dict[str, int]:
+    from mcp_server.utils.embeddings import get_provider
+    return _worker_loop.run_until_complete(get_provider(provider_name).sparse_embed(text, model_name))
+
+
+def _read_vectors(name: str, shape: Tuple[int, ...]) -> np.ndarray:
+    """Copy the vectors out of a worker's shared memory block and free the block."""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray(shape, dtype=np.float32, buffer=block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _discard_vectors(future: Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        block = shared_memory.SharedMemory(name=future.result()[0])
+        block.close()
+        block.unlink()
+
+
+class EmbeddingPool:
+    """
+    Worker processes running local embedding models outside the server process.
+
+    Each worker loads the models it is asked for, with its numeric libraries pinned to `threads`
+    threads, so tokenization and inference do not hold the server's GIL. Dense vectors come back
+    through shared memory instead of the result pipe. Workers are spawned, not forked, on first use,
+    and a pool whose worker died is replaced for the next call.
+    """
+
+    def __init__(self, workers: int, threads: int):
+        self.workers = workers
+        self.threads = max(1, threads)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                logger.info(f"Starting {self.workers} embedding workers with {self.threads} threads each")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.threads,),
+                )
+            return self._executor
+
+    async def _run(self, fn, *args: Any, on_abandoned=None) -> Any:
+        executor = self._pool()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # The call may still complete in the worker, after the caller has gone
+            if on_abandoned is not None:
+                future.add_done_callback(on_abandoned)
+            raise
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise
+
+    def _restart(self, executor: ProcessPoolExecutor) -> None:
+        logger.error("An embedding worker died, restarting the embedding workers")
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def dense_embed_batch(self, provider_name: str, model_name: str, texts: List[str]) -> np.ndarray:
+        name, shape = await self._run(_dense_embed_batch, provider_name, model_name, texts, on_abandoned=_discard_vectors)
+        return _read_vectors(name, shape)
+
+    async def sparse_embed(self, provider_name: str, model_name: str, text: str) -> Dict[str, int]:
+        return await self._run(_sparse_embed, provider_name, model_name, text)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+@lru_cache()
+def get_embedding_pool() -> Optional[EmbeddingPool]:
+    db_config = app_settings.db
+    # Workers embed in process
+    if db_config.embedding_workers <= 0 or _worker_threads is not None:
+        return None
+    return EmbeddingPool(db_config.embedding_workers, db_config.embedding_worker_threads)
@@ -1,18 +1,35 @@
 # This file implements Embeddings Provider classes
 
 import asyncio
+import base64
+import hashlib
+import json
 import logging
-from typing import Dict, Type
+import re
+from pathlib import Path
+from typing import Dict, List, Type
 from collections import Counter
 from functools import lru_cache
 from abc import ABC, abstractmethod
+import numpy as np
+from mcp_server.server import app_settings
+from mcp_server.utils.model_manager import get_model_manager, torch_model_bytes
+from mcp_server.utils.embedding_pool import get_embedding_pool, worker_threads
 
 logger = logging.getLogger(__name__)
 
+def as_float32(embedding) -> np.ndarray:
+    """Return embedding as a C-contiguous float32 array, without copying when it already is one."""
+    return np.ascontiguousarray(embedding, dtype=np.float32)
+
+
 # ---- Base Embedding Provider Interface ----
 class EmbeddingProvider(ABC):
+    # Whether the provider runs in the embedding worker processes when they are enabled
+    process_pool = False
+
     @abstractmethod
-    async def dense_embed(self, text: str, model_name: str) -> list[float]:
+    async def dense_embed(self, text: str, model_name: str) -> np.ndarray:
         """
         Encode text using the specified model.
 
@@ -21,11 +38,26 @@ class EmbeddingProvider(ABC):
             model_name: Specific model to use
 
         Returns:
-           List[float]: Text embedding as a list of floats
+           np.ndarray: Text embedding as a 1-D contiguous float32 array
         """
 
         pass
 
+    async def dense_embed_batch(self, texts: List[str], model_name: str) -> np.ndarray:
+        """
+        Encode several texts using the specified model.
+        Override if the concrete provider can encode a batch in one call.
+
+        Args:
+            texts: Texts to encode
+            model_name: Specific model to use
+
+        Returns:
+           np.ndarray: 2-D contiguous float32 array with one row per input text, in order
+        """
+        embeddings = await asyncio.gather(*(self.dense_embed(text, model_name) for text in texts))
+        return as_float32(np.stack(embeddings))
+
     @abstractmethod
     async def sparse_embed(self, text: str, model_name: str) -> Dict[str, int]:
         """
@@ -46,6 +78,8 @@ class EmbeddingProvider(ABC):
 
 # ---- Registry ----
 PROVIDER_REGISTRY: Dict[str, Type[EmbeddingProvider]] = {}
+# One instance per provider, so per-instance clients and caches are kept across calls
+_PROVIDERS: Dict[str, EmbeddingProvider] = {}
 
 def register_provider(name: str):
     def wrapper(cls):
@@ -55,11 +89,36 @@ def register_provider(name: str):
 
 # ---- Provider Factory ----
 def get_provider(name: str) -> EmbeddingProvider:
-    cls = PROVIDER_REGISTRY.get(name)
-    if not cls:
-        raise ValueError(f"Unknown provider: {name}")
-    return cls()
+    provider = _PROVIDERS.get(name)
+    if provider is None:
+        cls = PROVIDER_REGISTRY.get(name)
+        if not cls:
+            raise ValueError(f"Unknown provider: {name}")
+        pool = get_embedding_pool() if cls.process_pool else None
+        provider = _PROVIDERS.setdefault(name, cls() if pool is None else PooledProvider(name, pool))
+    return provider
+
+
 
+class PooledProvider(EmbeddingProvider):
+    """Provider forwarding to the same provider in the embedding worker processes."""
+
+    def __init__(self, name: str, pool):
+        self.name = name
+        self.pool = pool
+
+    async def dense_embed(self, text: str, model_name: str) -> np.ndarray:
+        return (await self.dense_embed_batch([text], model_name))[0]
+
+    async def dense_embed_batch(self, texts: List[str], model_name: str) -> np.ndarray:
+        return await self.pool.dense_embed_batch(self.name, model_name, texts)
+
+    async def sparse_embed(self, text: str, model_name: str) -> Dict[str, int]:
+        return await self.pool.sparse_embed(self.name, model_name, text)
+
+    # restart the workers, which unloads their models
+    def cleanup_embedding_model(self):
+        self.pool.shutdown()
 
 
 #----------------------------------------------------------------------#
@@ -67,6 +126,9 @@ def get_provider(name: str) -> EmbeddingProvider:
 #----------------------------------------------------------------------#
 @register_provider("openai")
 class OpenAIProvider(EmbeddingProvider):
+    # Most inputs the embeddings endpoint accepts in one request
+    MAX_INPUTS = 2048
+
     @lru_cache()
     def get_model(self):
         try:
@@ -78,14 +140,24 @@ class OpenAIProvider(EmbeddingProvider):
         return AsyncOpenAI()  # User should configure API key via environment
 
     # dense_embed implementation
-    async def dense_embed(self, text: str, model_name: str) -> list[float]:
-        model = self.get_model()
-        embedding = (await model.embeddings.create(
-                model=model_name,
-                input=text
-            )).data[0].embedding
+    async def dense_embed(self, text: str, model_name: str) -> np.ndarray:
+        return (await self.dense_embed_batch([text], model_name))[0]
 
-        return embedding
+    # batched dense_embed implementation
+    async def dense_embed_batch(self, texts: List[str], model_name: str) -> np.ndarray:
+        model = self.get_model()
+        rows = []
+        # The embeddings endpoint rejects requests with more than MAX_INPUTS inputs
+        for start in range(0, len(texts), self.MAX_INPUTS):
+            # base64 is the packed little-endian float32 vector, decode it straight into an array
+            data = (await model.embeddings.create(
+                    model=model_name,
+                    input=texts[start:start + self.MAX_INPUTS],
+                    encoding_format="base64"
+                )).data
+            data = sorted(data, key=lambda d: d.index)
+            rows.extend(np.frombuffer(base64.b64decode(d.embedding), dtype="<f4") for d in data)
+        return np.stack(rows)
 
     # sparse_embed implementation
     async def sparse_embed(self, text: str, model_name: str) -> Dict[str, int]:
@@ -110,28 +182,52 @@ class OpenAIProvider(EmbeddingProvider):
 
     # override cleanup function for lru_cache usage
     def cleanup_embedding_model(self):
-        return self.get_model().cache_clear()
+        type(self).get_model.cache_clear()
 
 
 @register_provider("sentence_transformers")
 class SentenceTransformerProvider(EmbeddingProvider):
-    @lru_cache()
+    process_pool = True
+
     def get_model(self, model_name: str):
+        precision = app_settings.db.embedding_precision
+        return get_model_manager().get("sentence_transformers", model_name, precision,
+                                       lambda: self._load_model(model_name, precision))
+
+    @staticmethod
+    def _load_model(model_name: str, precision: str):
         try:
             from sentence_transformers import SentenceTransformer
         except ImportError:
             raise ImportError("sentence_transformers not installed. Add it in the pyproject.toml")
 
-        logger.info(f"Loading SentenceTransformer model: {model_name}")
+        logger.info(f"Loading SentenceTransformer model: {model_name} ({precision})")
 
         kwargs = {}
-        return SentenceTransformer(model_name, **kwargs)
+        if precision == "int8":
+            # Dynamic quantization runs on CPU only
+            kwargs["device"] = "cpu"
+        model = SentenceTransformer(model_name, **kwargs)
+
+        if precision in ("float16", "bfloat16"):
+            import torch
+            model = model.to(getattr(torch, precision))
+        elif precision == "int8":
+            import torch
+            torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        return model, torch_model_bytes(model)
 
     # dense_embed implementation
-    async def dense_embed(self, text: str, model_name: str) -> list[float]:
+    async def dense_embed(self, text: str, model_name: str) -> np.ndarray:
+        model = self.get_model(model_name)
+        embedding = await asyncio.to_thread(model.encode, text, convert_to_numpy=True)
+        return as_float32(embedding)
+
+    # batched dense_embed implementation
+    async def dense_embed_batch(self, texts: List[str], model_name: str) -> np.ndarray:
         model = self.get_model(model_name)
-        embedding = await asyncio.to_thread(model.encode, text)
-        return embedding.tolist()
+        embeddings = await asyncio.to_thread(model.encode, texts, convert_to_numpy=True)
+        return as_float32(embeddings)
 
     # sparse_embed implementation
     async def sparse_embed(self, text: str, model_name: str) -> Dict[str, int]:
@@ -144,7 +240,169 @@ class SentenceTransformerProvider(EmbeddingProvider):
         token_counts = await asyncio.to_thread(tokenize_and_count)
         return token_counts
 
-    # override cleanup function for lru_cache usage
+    # unload this provider's models from the model manager
+    def cleanup_embedding_model(self):
+        get_model_manager().unload("sentence_transformers")
+
+
+# Returns the loaded model and its size, for the model manager
+def _load_onnx_model(model_name: str, intra_op_threads: int, quantize: bool):
+    try:
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+    except ImportError:
+        raise ImportError("onnxruntime and tokenizers not installed. Add them in the pyproject.toml")
+
+    model_dir = Path(model_name)
+    if not model_dir.is_dir():
+        from huggingface_hub import snapshot_download
+        model_dir = Path(snapshot_download(
+            repo_id=model_name,
+            allow_patterns=["*.json", "onnx/model.onnx", "model.onnx", "1_Pooling/*"],
+        ))
+
+    model_path = next((p for p in (model_dir / "model.onnx", model_dir / "onnx" / "model.onnx") if p.exists()), None)
+    if model_path is None:
+        raise FileNotFoundError(f"No model.onnx found for ONNX model: {model_name}")
+
+    if quantize:
+        quantized_path = model_path.with_name("model_int8.onnx")
+        if not quantized_path.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            logger.info(f"Quantizing ONNX model to int8: {quantized_path}")
+            quantize_dynamic(str(model_path), str(quantized_path), weight_type=QuantType.QInt8)
+        model_path = quantized_path
+
+    logger.info(f"Loading ONNX model: {model_path}")
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = 1
+    session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+
+    tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+    if tokenizer.padding is None:
+        tokenizer.enable_padding()
+    if tokenizer.truncation is None:
+        tokenizer.enable_truncation(max_length=512)
+
+    # Follow the sentence-transformers export so results match SentenceTransformerProvider
+    pooling = "mean"
+    pooling_config = model_dir / "1_Pooling" / "config.json"
+    if pooling_config.exists():
+        if json.loads(pooling_config.read_text()).get("pooling_mode_cls_token"):
+            pooling = "cls"
+    modules_config = model_dir / "modules.json"
+    normalize = modules_config.exists() and "Normalize" in modules_config.read_text()
+
+    return (session, tokenizer, pooling, normalize), model_path.stat().st_size
+
+
+@register_provider("onnx")
+class OnnxProvider(EmbeddingProvider):
+    """
+    CPU-optimized local provider running exported sentence-embedding models in ONNX Runtime.
+    The model name in embeddings.csv is a local directory or a Hugging Face repo id containing
+    model.onnx (or onnx/model.onnx) and tokenizer.json.
+    """
+    process_pool = True
+
+    def get_model(self, model_name: str):
+        db_config = app_settings.db
+        threads = worker_threads() or db_config.onnx_intra_op_threads
+        options = (threads, db_config.onnx_quantize or db_config.embedding_precision == "int8")
+        return get_model_manager().get("onnx", model_name, options, lambda: _load_onnx_model(model_name, *options))
+
+    def _encode(self, texts: List[str], model_name: str) -> np.ndarray:
+        session, tokenizer, pooling, normalize = self.get_model(model_name)
+        input_names = {i.name for i in session.get_inputs()}
+        batch_size = max(1, app_settings.db.onnx_batch_size)
+
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            encodings = tokenizer.encode_batch(texts[start:start + batch_size])
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": attention_mask,
+            }
+            if "token_type_ids" in input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+            token_embeddings = session.run(None, feeds)[0]
+            if token_embeddings.ndim == 2:  # model already exports pooled sentence embeddings
+                pooled = token_embeddings
+            elif pooling == "cls":
+                pooled = token_embeddings[:, 0]
+            else:
+                mask = attention_mask[..., None].astype(np.float32)
+                pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if normalize:
+                pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            embeddings.append(pooled)
+
+        return as_float32(np.concatenate(embeddings))
+
+    # dense_embed implementation
+    async def dense_embed(self, text: str, model_name: str) -> np.ndarray:
+        embeddings = await asyncio.to_thread(self._encode, [text], model_name)
+        return embeddings[0]
+
+    # batched dense_embed implementation
+    async def dense_embed_batch(self, texts: List[str], model_name: str) -> np.ndarray:
+        return await asyncio.to_thread(self._encode, texts, model_name)
+
+    # sparse_embed implementation
+    async def sparse_embed(self, text: str, model_name: str) -> Dict[str, int]:
+        def tokenize_and_count():
+            _, tokenizer, _, _ = self.get_model(model_name)
+            return dict(Counter(tokenizer.encode(text, add_special_tokens=False).ids))
+        return await asyncio.to_thread(tokenize_and_count)
+
+    # unload this provider's models from the model manager
     def cleanup_embedding_model(self):
-        return self.get_model().cache_clear()
+        get_model_manager().unload("onnx")
+
+
+@register_provider("hash")
+class HashProvider(EmbeddingProvider):
+    """
+    Deterministic provider for tests and load tests, nothing is downloaded or loaded.
+    Dense embeddings are signed feature hashes of the lower-cased words, normalized to unit length,
+    and sparse embeddings count the hashed word ids. The model name ends with the vector dimension,
+    e.g. 'hash-384'.
+    """
 
+    @staticmethod
+    def _dimension(model_name: str) -> int:
+        match = re.search(r"(\d+)$", model_name or "")
+        if match is None:
+            raise ValueError(f"hash model name must end with the vector dimension, e.g. 'hash-384': {model_name}")
+        return int(match.group(1))
+
+    @staticmethod
+    def _token_ids(text: str) -> List[int]:
+        return [int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+                for word in re.findall(r"\w+", text.lower())]
+
+    def _encode(self, texts: List[str], model_name: str) -> np.ndarray:
+        dimension = self._dimension(model_name)
+        embeddings = np.zeros((len(texts), dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token_id in self._token_ids(text):
+                embeddings[row, token_id % dimension] += 1.0 if token_id >> 63 else -1.0
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return as_float32(embeddings / np.clip(norms, 1e-12, None))
+
+    # dense_embed implementation
+    async def dense_embed(self, text: str, model_name: str) -> np.ndarray:
+        return self._encode([text], model_name)[0]
+
+    # batched dense_embed implementation
+    async def dense_embed_batch(self, texts: List[str], model_name: str) -> np.ndarray:
+        return self._encode(texts, model_name)
+
+    # sparse_embed implementation
+    async def sparse_embed(self, text: str, model_name: str) -> Dict[str, int]:
+        return dict(Counter(token_id & 0x7fffffff for token_id in self._token_ids(text)))
@@ -1,4 +1,10 @@
 from mcp_server.server import app_settings
+from mcp_server.utils.embeddings import get_provider
+from mcp_server.utils.embedding_cache import EmbeddingCache
+from mcp_server.utils.profiling import note_cache
+import asyncio
+import sqlite3
+import numpy as np
 import pandas as pd
 from functools import lru_cache
 from typing import List, Optional
@@ -40,4 +46,48 @@ def get_embedding_config(
     row = matching_rows.iloc[0]
     
     # Choose columns based on config_type flag
-    return [row['embedding_provider'], row['embedding_model'], row['sparse_tokenizer_provider'], row['sparse_tokenizer_model']]
\ No newline at end of file
+    return [row['embedding_provider'], row['embedding_model'], row['sparse_tokenizer_provider'], row['sparse_tokenizer_model']]
+
+
+@lru_cache()
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Return the persistent embedding cache, or None when it is not configured."""
+    db_config = app_settings.db
+    if not db_config.embedding_cache_path:
+        return None
+    cache = EmbeddingCache(
+        db_config.embedding_cache_path,
+        max_bytes=int(db_config.embedding_cache_max_mb * 1024 * 1024),
+        memory_entries=db_config.embedding_cache_memory_entries,
+        read_only=db_config.embedding_cache_read_only,
+    )
+    try:
+        cache.warm_load()
+    except sqlite3.Error as e:
+        logger.warning(f"Embedding cache warm-load failed: {e}")
+    return cache
+
+
+async def embed_query(provider_name: str, model_name: str, text: str) -> np.ndarray:
+    """
+    Dense-embed a query, served from the persistent embedding cache when possible.
+    Cache failures are logged and never fail the embedding.
+    """
+    cache = get_embedding_cache()
+    if cache is not None:
+        try:
+            vector = await asyncio.to_thread(cache.get, provider_name, model_name, text)
+            note_cache("embedding", vector is not None)
+            if vector is not None:
+                return vector
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+
+    vector = await get_provider(provider_name).dense_embed(text, model_name)
+
+    if cache is not None:
+        try:
+            await asyncio.to_thread(cache.put, provider_name, model_name, text, vector)
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+    return vector
@@ -1,10 +1,142 @@
-from typing import Optional, Union, List, Any
+import difflib
+from typing import Optional, Union, List, Any, Dict
 from datetime import datetime, date, time
 
+# Operators of KDB.AI filter conditions
+LOGICAL_OPERATORS = ('and', 'or', 'not')
+COMPARISON_OPERATORS = ('=', '<>', '<', '>', '<=', '>=')
+FILTER_OPERATORS = (*LOGICAL_OPERATORS, *COMPARISON_OPERATORS, 'in', 'like', 'within', 'fuzzy')
+
+NUMERIC_COLUMN_TYPES = {"uint8", "int16", "int32", "int64", "float32", "float64"}
+TEXT_COLUMN_TYPES = {"str", "bytes", "strs", "char"}
+
+
 def is_nested_filter(item):
     if not isinstance(item, list) or len(item) < 2:
         return False
-    return item[0] in ['and', 'or', 'not', '=', '<>', '<', '>', '<=', '>=', 'in', 'like', 'within', 'fuzzy']
+    return item[0] in FILTER_OPERATORS
+
+
+class InvalidFilter(ValueError):
+    """Raised when a filter does not fit the filter syntax or the table schema."""
+
+    def __init__(self, path: str, message: str):
+        super().__init__(f"Invalid filter at {path}: {message}")
+        self.path = path
+
+
+def invalid_filter_response(e: InvalidFilter, **context: Any) -> Dict[str, Any]:
+    return {
+        "status": "error",
+        "error": "invalid_filter",
+        "path": e.path,
+        "message": str(e),
+        **context,
+    }
+
+
+def _is_temporal_type(col_type: str) -> bool:
+    return col_type.startswith("datetime64") or col_type in {"datetime", "date", "time"}
+
+
+def _check_value(path: str, column: str, col_type: str, value: Any) -> None:
+    """Check that a literal can be compared to a column of type col_type."""
+    if value is None:
+        return
+    if col_type in NUMERIC_COLUMN_TYPES:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise InvalidFilter(path, f"column '{column}' is {col_type}, expected a number, got {value!r}")
+    elif col_type == "bool":
+        if not isinstance(value, bool) and value not in (0, 1):
+            raise InvalidFilter(path, f"column '{column}' is bool, expected true or false, got {value!r}")
+    elif col_type in TEXT_COLUMN_TYPES or col_type == "guid":
+        if not isinstance(value, str):
+            raise InvalidFilter(path, f"column '{column}' is {col_type}, expected a string, got {value!r}")
+    elif _is_temporal_type(col_type):
+        if isinstance(value, (datetime, date, time)):
+            return
+        try:
+            if col_type == "time":
+                time.fromisoformat(value.split("T")[-1])
+            else:
+                datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except (AttributeError, ValueError):
+            raise InvalidFilter(path, f"column '{column}' is {col_type}, expected an ISO 8601 string such as "
+                                      f"'2025-01-31T12:00:00', got {value!r}")
+
+
+def _check_column(path: str, column: Any, types: Dict[str, str]) -> str:
+    if not isinstance(column, str):
+        raise InvalidFilter(path, f"expected a column name, got {column!r}")
+    if column not in types:
+        close = difflib.get_close_matches(column, list(types), n=3)
+        hint = f", did you mean {' or '.join(repr(c) for c in close)}?" if close else f", columns: {list(types)}"
+        raise InvalidFilter(path, f"unknown column '{column}'{hint}")
+    return types[column]
+
+
+def _validate_condition(condition: Any, path: str, types: Dict[str, str], index_columns: set) -> None:
+    if not isinstance(condition, (list, tuple)) or not condition:
+        raise InvalidFilter(path, f"expected a condition such as [\"=\", \"column\", value], got {condition!r}")
+    op = condition[0]
+    if op not in FILTER_OPERATORS:
+        raise InvalidFilter(f"{path}[0]", f"unknown operator {op!r}, supported operators: {list(FILTER_OPERATORS)}")
+    operands = condition[1:]
+
+    if op == 'not':
+        if len(operands) != 1:
+            raise InvalidFilter(path, f"'not' takes 1 condition, got {len(operands)}")
+        _validate_condition(operands[0], f"{path}[1]", types, index_columns)
+        return
+    if op in ('and', 'or'):
+        if len(operands) < 2:
+            raise InvalidFilter(path, f"'{op}' takes at least 2 conditions, got {len(operands)}")
+        for i, operand in enumerate(operands, start=1):
+            _validate_condition(operand, f"{path}[{i}]", types, index_columns)
+        return
+
+    if len(operands) != 2:
+        raise InvalidFilter(path, f"'{op}' takes a column and a value, got {len(operands)} operands")
+    column, value = operands
+    col_type = _check_column(f"{path}[1]", column, types)
+    if column in index_columns:
+        raise InvalidFilter(f"{path}[1]", f"column '{column}' holds the vectors of an index and cannot be filtered")
+    value_path = f"{path}[2]"
+
+    if op in ('in', 'within'):
+        if not isinstance(value, (list, tuple)):
+            raise InvalidFilter(value_path, f"'{op}' takes a list of values, got {value!r}")
+        if op == 'within' and len(value) != 2:
+            raise InvalidFilter(value_path, f"'within' takes [lower, upper], got {len(value)} values")
+        for i, item in enumerate(value):
+            _check_value(f"{value_path}[{i}]", column, col_type, item)
+    elif op == 'like':
+        if col_type not in TEXT_COLUMN_TYPES:
+            raise InvalidFilter(path, f"'like' needs a text column, column '{column}' is {col_type}")
+        if not isinstance(value, str):
+            raise InvalidFilter(value_path, f"'like' takes a pattern string such as '*word*', got {value!r}")
+    elif op == 'fuzzy':
+        if col_type not in TEXT_COLUMN_TYPES:
+            raise InvalidFilter(path, f"'fuzzy' needs a text column, column '{column}' is {col_type}")
+    else:
+        _check_value(value_path, column, col_type, value)
+
+
+def validate_filters(filters: Optional[List[Any]], schema: List[dict], index_columns: Optional[set] = None) -> None:
+    """
+    Check filters against the table schema before they are sent to KDB.AI: the structure and arity
+    of every condition, its operator, that its column exists, and that its values fit the column type.
+    Raises InvalidFilter naming the position of the first problem, e.g. filters[1][2].
+    """
+    if filters is None:
+        return
+    if not isinstance(filters, (list, tuple)):
+        raise InvalidFilter("filters", f"expected a list of conditions, got {filters!r}")
+    if filters and isinstance(filters[0], str):
+        raise InvalidFilter("filters", f"expected a list of conditions, wrap a single condition in a list: [{list(filters)!r}]")
+    types = {column["name"]: column["type"] for column in schema}
+    for i, condition in enumerate(filters):
+        _validate_condition(condition, f"filters[{i}]", types, index_columns or set())
 
 
 # function to convert ISO format datetime strings to correct python object as per table schema
@@ -68,5 +200,5 @@ def cast_temporal_value(col, val, schema):
         elif field_type == "date":
             result = date.fromisoformat(val.split("T")[0])
         elif field_type == "time":
-            result = time.fromisoformat(val.split("T")[1])
+            result = time.fromisoformat(val.split("T")[-1])
     return result
\ No newline at end of file
@@ -0,0 +1,199 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from mcp_server.server import app_settings
+from mcp_server.utils.embeddings import get_provider
+from mcp_server.utils.embeddings_helpers import get_embedding_config
+from mcp_server.utils.kdbai import kdbai_call
+from mcp_server.utils.arrow_loader import ARROW_SUFFIXES, PARQUET_SUFFIXES, iter_arrow_chunks
+
+logger = logging.getLogger(__name__)
+
+# Index types whose column holds sparse token counts rather than a dense vector
+SPARSE_INDEX_TYPES = {"bm25"}
+
+# (progress, total, message)
+ProgressCallback = Callable[[int, Optional[int], str], Awaitable[None]]
+
+
+class IngestError(Exception):
+    """Raised when an ingestion fails part way, rows_inserted is how many rows made it in."""
+
+    def __init__(self, message: str, rows_inserted: int):
+        super().__init__(message)
+        self.rows_inserted = rows_inserted
+
+
+def iter_row_chunks(rows: List[Dict[str, Any]], chunk_size: int) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(rows), chunk_size):
+        yield pd.DataFrame(rows[start:start + chunk_size])
+
+
+def resolve_ingest_path(file_path: str, allowed_dir: str) -> Path:
+    """
+    Resolve file_path, relative paths against allowed_dir, and reject it unless it lies inside allowed_dir.
+    Symlinks are followed before the check, so they cannot lead out of the directory.
+    """
+    if not allowed_dir:
+        raise PermissionError("Reading files is disabled, set --db.ingest-allowed-dir to allow file_path")
+    base = Path(allowed_dir).expanduser().resolve()
+    path = (base / Path(file_path).expanduser()).resolve()
+    if not path.is_relative_to(base):
+        raise PermissionError(f"File '{file_path}' is outside the allowed ingest directory {base}")
+    return path
+
+
+def iter_file_chunks(file_path: str, schema: List[Dict[str, str]], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Read a local CSV, JSON, Parquet or Arrow IPC file in chunks of chunk_size rows."""
+    path = Path(file_path).expanduser()
+    if not path.is_file():
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    suffix = path.suffix.lower()
+    if suffix in PARQUET_SUFFIXES or suffix in ARROW_SUFFIXES:
+        yield from iter_arrow_chunks(file_path, schema, chunk_size)
+    elif suffix == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif suffix in (".jsonl", ".ndjson"):
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+    elif suffix == ".json":
+        df = pd.read_json(path)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    else:
+        raise ValueError(
+            f"Unsupported file type '{suffix}', expected .csv, .jsonl, .ndjson, .json, .parquet, .arrow or .feather"
+        )
+
+
+def _to_vector(value: Any, dtype: str) -> np.ndarray:
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.ascontiguousarray(value, dtype=dtype)
+
+
+def coerce_to_schema(df: pd.DataFrame, schema: List[Dict[str, str]]) -> pd.DataFrame:
+    """Convert the columns of df, typically parsed from JSON or CSV, to the types of the table schema."""
+    column_types = {c['name']: c['type'] for c in schema}
+    unknown = [c for c in df.columns if c not in column_types]
+    if unknown:
+        raise ValueError(f"Columns not in table schema: {unknown}")
+
+    df = df.copy()
+    for name in df.columns:
+        col_type = column_types[name]
+        if col_type == "bytes":
+            df[name] = df[name].map(lambda v: v if isinstance(v, bytes) else str(v).encode("utf-8"))
+        elif col_type == "str":
+            df[name] = df[name].astype(str)
+        elif col_type in ("float32s", "float64s"):
+            df[name] = df[name].map(lambda v, t=col_type[:-1]: _to_vector(v, t))
+        elif col_type == "datetime64[ns]":
+            df[name] = pd.to_datetime(df[name])
+        elif col_type == "timedelta64[ns]":
+            df[name] = pd.to_timedelta(df[name])
+        elif col_type in ("bool", "uint8", "int16", "int32", "int64", "float32", "float64"):
+            df[name] = df[name].astype(col_type)
+    return df
+
+
+def embedding_targets(table, database_name: str, table_name: str,
+                      columns: List[str]) -> List[Tuple[str, str, str, str]]:
+    """
+    Index columns missing from the input that have to be computed,
+    as (column, 'dense' or 'sparse', provider, model) using the embeddings.csv configuration.
+    """
+    missing = [i for i in table.indexes if i['column'] not in columns]
+    if not missing:
+        return []
+
+    provider, model, sparse_provider, sparse_model = get_embedding_config(database_name, table_name)
+    targets = []
+    for index in missing:
+        if index.get('type') in SPARSE_INDEX_TYPES:
+            if sparse_provider is None:
+                raise ValueError(f"No sparse tokenizer configured for {database_name}.{table_name} in embeddings csv")
+            targets.append((index['column'], "sparse", sparse_provider, sparse_model))
+        else:
+            if provider is None:
+                raise ValueError(f"No embedding model configured for {database_name}.{table_name} in embeddings csv")
+            targets.append((index['column'], "dense", provider, model))
+    return targets
+
+
+async def embed_chunk(df: pd.DataFrame, text_column: str, targets: List[Tuple[str, str, str, str]]) -> pd.DataFrame:
+    texts = df[text_column].map(lambda v: v.decode("utf-8") if isinstance(v, bytes) else str(v)).tolist()
+    for column, kind, provider_name, model_name in targets:
+        provider = get_provider(provider_name)
+        if kind == "dense":
+            # Rows of one 2-D float32 array, no per-row copies
+            df[column] = list(await provider.dense_embed_batch(texts, model_name))
+        else:
+            df[column] = await asyncio.gather(*(provider.sparse_embed(text, model_name) for text in texts))
+    return df
+
+
+async def ingest_chunks(table,
+                        database_name: str,
+                        table_name: str,
+                        chunks: Iterator[pd.DataFrame],
+                        text_column: Optional[str] = None,
+                        total: Optional[int] = None,
+                        progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+    """
+    Embed and insert chunks into a table as a pipeline: the next chunk is read and embedded while
+    up to ingest_max_inflight earlier chunks are being inserted.
+    """
+    max_inflight = max(1, app_settings.db.ingest_max_inflight)
+    inflight: "deque[asyncio.Task]" = deque()
+    targets = None
+    rows_inserted = 0
+    chunk_count = 0
+
+    async def insert(df: pd.DataFrame) -> int:
+        await asyncio.to_thread(kdbai_call, table.insert, df)
+        return len(df)
+
+    async def complete_oldest() -> None:
+        nonlocal rows_inserted
+        rows_inserted += await inflight.popleft()
+        if progress is not None:
+            await progress(rows_inserted, total, f"Inserted {rows_inserted} rows into {database_name}.{table_name}")
+
+    try:
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            chunk_count += 1
+            chunk = await asyncio.to_thread(coerce_to_schema, chunk, table.schema)
+            if targets is None:
+                targets = embedding_targets(table, database_name, table_name, list(chunk.columns))
+                if targets and text_column is None:
+                    raise ValueError(
+                        f"text_column is required to compute index columns {[t[0] for t in targets]}"
+                    )
+            if targets:
+                chunk = await embed_chunk(chunk, text_column, targets)
+
+            if len(inflight) >= max_inflight:
+                await complete_oldest()
+            inflight.append(asyncio.create_task(insert(chunk)))
+
+        while inflight:
+            await complete_oldest()
+    except Exception as e:
+        # Let inserts already sent finish so the reported row count is accurate
+        for result in await asyncio.gather(*inflight, return_exceptions=True):
+            if not isinstance(result, BaseException):
+                rows_inserted += result
+        raise IngestError(str(e), rows_inserted) from e
+
+    logger.info(f"Inserted {rows_inserted} rows in {chunk_count} chunks into {database_name}.{table_name}")
+    return {"rowsInserted": rows_inserted, "chunks": chunk_count}
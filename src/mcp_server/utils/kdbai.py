@@ -1,45 +1,325 @@
+import asyncio
+import inspect
 import logging
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from enum import Enum
 from functools import lru_cache
-from typing import Optional, Union
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar, Union
+import httpx
+import requests
 import kdbai_client as kdbai
 from kdbai_client.rerankers import CohereReranker, JinaAIReranker, VoyageAIReranker
 from mcp_server.settings import KDBAIConfig
 from mcp_server.server import app_settings
+from mcp_server.utils.circuit_breaker import CircuitBreaker, backoff_delays
+from mcp_server.utils.deadlines import current_deadline
 
 db_config = app_settings.db
 logger = logging.getLogger(__name__)
 
-@lru_cache()
+T = TypeVar("T")
+
+# A QIPC session is a single socket, so calls on it must not interleave across threads.
+_call_lock = threading.RLock()
+
+# Connected sessions keyed by config, guarded by _client_lock
+_clients: Dict[KDBAIConfig, kdbai.Session] = {}
+_client_lock = threading.Lock()
+# One connection attempt at a time per config, shared by requests and the background reconnect
+_connect_locks: Dict[KDBAIConfig, threading.Lock] = {}
+# When the last connection attempt per config gave up, so callers queued behind it fail with it
+_connect_failed_at: Dict[KDBAIConfig, float] = {}
+_reconnect_thread: Optional[threading.Thread] = None
+
+# Socket time a qipc call gets past its tool call's deadline, so the deadline reports the timeout first
+_SOCKET_TIMEOUT_GRACE = 1.0
+
+_breaker = CircuitBreaker(db_config.breaker_failure_threshold, db_config.breaker_reset_timeout)
+
+
+class KDBAIUnavailableError(Exception):
+    """Raised without touching the network while the KDB.AI circuit breaker is open."""
+
+
+class FailureKind(Enum):
+    CONNECTION = "connection"
+    TIMEOUT = "timeout"
+    AUTHENTICATION = "authentication"
+    REQUEST = "request"
+
+
+# Timeouts while connecting, as opposed to a call outliving its timeout on a live connection
+_CONNECT_TIMEOUTS = (requests.exceptions.ConnectTimeout, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# kdbai_client re-raises transport errors as RuntimeError/KDBAIException, these are its messages for them.
+# "Attempted to use closed session" is not one: sessions are only closed here, after being replaced.
+_CONNECTION_MESSAGES = (
+    "error during creating connection",
+    "error during request",
+    "failed to open a session",
+)
+
+
+def classify_failure(exc: BaseException) -> FailureKind:
+    """Classify an exception raised by a KDB.AI call, following its cause chain."""
+    seen = set()
+    current: Optional[BaseException] = exc
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if isinstance(current, _CONNECT_TIMEOUTS):
+            return FailureKind.CONNECTION
+        if isinstance(current, (TimeoutError, socket.timeout, requests.exceptions.Timeout, httpx.TimeoutException)):
+            return FailureKind.TIMEOUT
+        if isinstance(current, (ConnectionError, requests.exceptions.ConnectionError, httpx.TransportError)):
+            return FailureKind.CONNECTION
+        if isinstance(current, OSError) and not isinstance(current, FileNotFoundError):
+            return FailureKind.CONNECTION
+        message = str(current).lower()
+        if "query timed out" in message:  # pykx qipc socket timeout
+            return FailureKind.TIMEOUT
+        if "authentication error" in message:
+            return FailureKind.AUTHENTICATION
+        if any(m in message for m in _CONNECTION_MESSAGES):
+            return FailureKind.CONNECTION
+        current = current.__cause__ or current.__context__
+    return FailureKind.REQUEST
+
+
+def is_connection_failure(exc: BaseException) -> bool:
+    return classify_failure(exc) in (FailureKind.CONNECTION, FailureKind.TIMEOUT)
+
+
+def _qipc_connection(session: Optional[kdbai.Session]):
+    # kdbai_client keeps its pykx connection private, only its socket timeout is changed here
+    return getattr(getattr(session, "_session", None), "_gw", None)
+
+
+@contextmanager
+def _socket_timeout(config: KDBAIConfig):
+    """Bound the qipc socket by the deadline of the calling tool instead of the session default."""
+    deadline = current_deadline()
+    remaining = None if deadline is None else deadline.remaining()
+    with _client_lock:
+        connection = _qipc_connection(_clients.get(config))
+    info = getattr(connection, "_connection_info", None)
+    if remaining is None or not isinstance(info, dict):
+        yield
+        return
+    default = info.get("timeout", 0.0)
+    info["timeout"] = remaining + _SOCKET_TIMEOUT_GRACE
+    try:
+        yield
+    finally:
+        info["timeout"] = default
+
+
+def kdbai_call(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking KDB.AI client call, serialised on the shared session in qipc mode.
+    Connection failures trip the circuit breaker and hand reconnection to the background.
+    A call that times out on a live connection is failed without counting against KDB.AI.
+    """
+    try:
+        if db_config.mode == "rest":
+            result = func(*args, **kwargs)
+        else:
+            with _call_lock:
+                try:
+                    with _socket_timeout(db_config):
+                        result = func(*args, **kwargs)
+                except Exception as e:
+                    if classify_failure(e) == FailureKind.TIMEOUT:
+                        # pykx reads the late reply before the next call's, however long KDB.AI takes
+                        _retire_session(db_config)
+                    raise
+    except Exception as e:
+        if classify_failure(e) == FailureKind.CONNECTION:
+            record_connection_failure(e)
+        raise
+    _breaker.record_success()
+    return result
+
+
+async def kdbai_acall(func: Callable[..., Union[T, Awaitable[T]]], *args: Any, **kwargs: Any) -> T:
+    """
+    Await a KDB.AI call of either backend: coroutines of the async REST client run on the event loop,
+    blocking kdbai_client calls run through kdbai_call in a worker thread.
+    """
+    if not inspect.iscoroutinefunction(func):
+        return await asyncio.to_thread(kdbai_call, func, *args, **kwargs)
+    try:
+        result = await func(*args, **kwargs)
+    except Exception as e:
+        if classify_failure(e) == FailureKind.CONNECTION:
+            record_connection_failure(e)
+        raise
+    _breaker.record_success()
+    return result
+
+
+def use_async_rest() -> bool:
+    return db_config.mode == "rest" and db_config.rest_async
+
+
+def _connect(config: KDBAIConfig) -> kdbai.Session:
+    if config.password:
+        conn_options = {"username":config.username, "password":config.password.get_secret_value(), "reconnection_attempts":2}
+    else:
+        conn_options = {"reconnection_attempts":2}
+
+    protocol = "http"
+    if config.mode == "rest":
+        protocol = config.rest_protocol
+    else:  # qipc mode
+        if config.qipc_tls:
+            conn_options["tls"] = True
+        # Bound blocking socket operations so a call abandoned by its deadline cannot hang forever.
+        # Calls made for a tool with a deadline use that deadline instead, see _socket_timeout.
+        socket_timeout = max(config.query_timeout, config.search_timeout)
+        if socket_timeout > 0:
+            conn_options["timeout"] = socket_timeout
+
+    endpoint = f"{protocol}://{config.host}:{config.port}"
+    return kdbai.Session(endpoint=endpoint, mode=config.mode, options=conn_options)
+
+
+def _connect_lock(config: KDBAIConfig) -> threading.Lock:
+    with _client_lock:
+        return _connect_locks.setdefault(config, threading.Lock())
+
+
+def _store_client(config: KDBAIConfig, client: kdbai.Session) -> kdbai.Session:
+    """Cache a new session, or close it and return the one already cached."""
+    with _client_lock:
+        current = _clients.setdefault(config, client)
+    if current is not client:
+        _close_session(client)
+    return current
+
+
 def get_kdbai_client(config: Optional[KDBAIConfig] = None) -> kdbai.Session:
+    """
+    Shared session for config, connecting it if needed. Blocks while connecting and backing off
+    between attempts, async callers run it in a worker thread.
+    """
     if config is None:
         config = db_config
 
+    with _client_lock:
+        client = _clients.get(config)
+    if client is not None:
+        return client
+
+    # Concurrent first callers wait for one connection instead of each opening their own
+    waiting_since = time.monotonic()
+    with _connect_lock(config):
+        with _client_lock:
+            client = _clients.get(config)
+        if client is not None:
+            return client
+        if _connect_failed_at.get(config, float("-inf")) >= waiting_since:
+            raise KDBAIUnavailableError(
+                f"KDB.AI at {config.host}:{config.port} is unavailable, reconnecting in the background"
+            )
+        return _connect_with_retry(config)
+
+
+def _connect_with_retry(config: KDBAIConfig) -> kdbai.Session:
+    if not _breaker.allow_request():
+        raise KDBAIUnavailableError(
+            f"KDB.AI at {config.host}:{config.port} is unavailable, reconnecting in the background. "
+            f"Retry in {_breaker.retry_after():.1f}s"
+        )
+
     logger.debug(f"KDBAIConfig: {config=}")
     logger.info(f"Connecting to KDB.AI at {config.host}:{config.port}")
     retry = config.retry
+    delays = backoff_delays(config.retry_backoff, config.retry_backoff_max)
     for attempt in range(1, retry + 1):
         try:
-            if config.password:
-                conn_options = {"username":config.username, "password":config.password.get_secret_value(), "reconnection_attempts":2}
-            else:
-                conn_options = {"reconnection_attempts":2}
-
-            protocol = "http"
-            if config.mode == "rest":
-                protocol = config.rest_protocol
-            else:  # qipc mode
-                if config.qipc_tls:
-                    conn_options["tls"] = True
-
-            endpoint = f"{protocol}://{config.host}:{config.port}"
-            client = kdbai.Session(endpoint=endpoint, mode=config.mode, options=conn_options)
-            logger.info("Connected to KDB.AI")
-            return client
+            client = _connect(config)
         except Exception as e:
             logger.warning(f"KDB.AI connectivity attempt {attempt}/{retry} failed: {str(e)}")
-            if attempt == retry:
-                logger.error(f"Failed to connect to KDB.AI after {retry} attempts")
+            if not is_connection_failure(e):
                 raise
+            _breaker.record_failure()
+            if attempt == retry or not _breaker.allow_request():
+                logger.error(f"Failed to connect to KDB.AI after {attempt} attempts")
+                _connect_failed_at[config] = time.monotonic()
+                _schedule_reconnect(config)
+                raise
+            time.sleep(next(delays))
+            continue
+
+        logger.info("Connected to KDB.AI")
+        _breaker.record_success()
+        return _store_client(config, client)
+
+
+def _close_session(session: kdbai.Session) -> None:
+    try:
+        session.close()
+    except Exception as e:
+        logger.debug(f"Closing KDB.AI session failed: {e}")
+
+
+def _retire_session(config: KDBAIConfig) -> None:
+    """Close the session a call timed out on, the next call connects a fresh one."""
+    with _client_lock:
+        session = _clients.pop(config, None)
+    if session is not None:
+        logger.warning(f"Closing KDB.AI session to {config.host}:{config.port} after a timed out call")
+        _close_session(session)
+
+
+def record_connection_failure(exc: BaseException, config: Optional[KDBAIConfig] = None) -> None:
+    """Drop the broken session and reconnect in the background instead of on the request path."""
+    if config is None:
+        config = db_config
+    logger.warning(f"KDB.AI connection failure detected ({classify_failure(exc).value}): {exc}")
+    _breaker.record_failure()
+    with _client_lock:
+        _clients.pop(config, None)
+    _schedule_reconnect(config)
+
+
+def _schedule_reconnect(config: KDBAIConfig) -> None:
+    global _reconnect_thread
+    with _client_lock:
+        if _reconnect_thread is not None and _reconnect_thread.is_alive():
+            return
+        _reconnect_thread = threading.Thread(
+            target=_reconnect_loop, args=(config,), name="kdbai-reconnect", daemon=True
+        )
+        _reconnect_thread.start()
+
+
+def _reconnect_loop(config: KDBAIConfig) -> None:
+    for attempt, delay in enumerate(backoff_delays(config.retry_backoff, config.retry_backoff_max), start=1):
+        time.sleep(delay)
+        with _connect_lock(config):
+            with _client_lock:
+                if config in _clients:  # a request reconnected first
+                    return
+            try:
+                client = _connect(config)
+            except Exception as e:
+                if not is_connection_failure(e):
+                    logger.error(f"KDB.AI background reconnection stopped: {e}")
+                    return
+                logger.debug(f"KDB.AI background reconnection attempt {attempt} failed: {e}")
+                continue
+            _store_client(config, client)
+        _breaker.record_success()
+        logger.info(f"Reconnected to KDB.AI at {config.host}:{config.port} after {attempt} attempts")
+        return
+
+
+def get_connection_state() -> str:
+    return _breaker.state
 
 
 @lru_cache()
@@ -82,18 +362,50 @@ def get_table(table_name: str, database_name: Optional[str] = None) -> kdbai.Tab
     try:
         client = get_kdbai_client()
         logger.debug(f"Retrieving table '{table_name}' from database '{database_name}'")
-        return client.database(database_name).table(table_name)
+        return kdbai_call(lambda: client.database(database_name).table(table_name))
     except Exception as e:
-        if "Error during creating connection" in str(e):
-            logger.warning("KDBAI connection issue detected. Reinitializing...")
-            cleanup_kdbai_client()
-            client = get_kdbai_client()
-            return client.database(database_name).table(table_name)
-        else:
-            logger.error(f"Error retrieving KDBAI table '{table_name}': {e}")
-            raise
+        logger.error(f"Error retrieving KDBAI table '{table_name}': {e}")
+        # The table may have been dropped or recreated, don't keep serving its old catalog entry
+        from mcp_server.utils.catalog import get_catalog
+        catalog = get_catalog()
+        if catalog is not None:
+            catalog.request_refresh()
+        raise
+
+
+async def get_table_async(table_name: str, database_name: Optional[str] = None):
+    """
+    get_table for async callers. Returns a table of the async REST client when it is enabled,
+    otherwise a kdbai_client table fetched in a worker thread.
+    """
+    if not use_async_rest():
+        return await asyncio.to_thread(get_table, table_name, database_name)
+
+    if database_name is None:
+        database_name = db_config.database_name
+    if not _breaker.allow_request():
+        raise KDBAIUnavailableError(
+            f"KDB.AI at {db_config.host}:{db_config.port} is unavailable. Retry in {_breaker.retry_after():.1f}s"
+        )
+
+    from mcp_server.utils.kdbai_async import get_async_kdbai_client
+    try:
+        return await kdbai_acall(get_async_kdbai_client().table, database_name, table_name)
+    except Exception as e:
+        logger.error(f"Error retrieving KDBAI table '{table_name}': {e}")
+        from mcp_server.utils.catalog import get_catalog
+        catalog = get_catalog()
+        if catalog is not None:
+            catalog.request_refresh()
+        raise
 
 
 def cleanup_kdbai_client():
-    get_kdbai_client.cache_clear()
+    with _client_lock:
+        sessions = list(_clients.values())
+        _clients.clear()
+    # qipc calls in flight finish first, their socket is bounded by the call's deadline
+    with _call_lock:
+        for session in sessions:
+            _close_session(session)
     logger.info("KDBAI client cache cleared")
@@ -0,0 +1,191 @@
+import asyncio
+import importlib.util
+import json
+import logging
+import weakref
+from base64 import b64encode
+from copy import deepcopy
+from typing import Any, Dict, List, Optional
+
+import httpx
+from kdbai_client.constants import Headers, RestPath, _resttype_to_pytype
+from kdbai_client.kdbai_exception import KDBAIException
+from kdbai_client.utils import JsonSerializer, qipc_to_table
+from mcp_server.settings import KDBAIConfig
+from mcp_server.server import app_settings
+
+logger = logging.getLogger(__name__)
+
+# Results larger than this are decoded in a worker thread rather than on the event loop
+_INLINE_DECODE_BYTES = 256 * 1024
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class _JsonEncoder(JsonSerializer):
+    """kdbai_client's request encoding, falling back to str() for other values as its query requests do."""
+
+    def default(self, obj):
+        try:
+            return super().default(obj)
+        except TypeError:
+            return str(obj)
+
+
+class AsyncTable:
+    """
+    Table of the native async REST backend.
+    Mirrors the kdbai_client Table calls used by the tools, with query, search and info as coroutines.
+    """
+
+    def __init__(self, client: "AsyncKDBAIClient", database: str, name: str, meta: Dict[str, Any]):
+        self._client = client
+        self.database = database
+        self.name = name
+        self._meta = deepcopy(meta)
+        # Same column type names as kdbai_client tables
+        for column in self._meta.get('schema') or []:
+            col_type = column['type']
+            column['type'] = 'general' if col_type in ['', ' '] else _resttype_to_pytype[col_type]
+            if not column.get('attributes'):
+                column.pop('attributes', None)
+
+    @property
+    def schema(self) -> List[Dict[str, Any]]:
+        return self._meta.get('schema', [])
+
+    @property
+    def indexes(self) -> List[Dict[str, Any]]:
+        return self._meta.get('index', [])
+
+    def _path(self, path: str) -> str:
+        return path.format(db_name=self.database, table_name=self.name)
+
+    async def query(self,
+                    filter: Optional[List[Any]] = None,
+                    sort_columns: Optional[List[str]] = None,
+                    group_by: Optional[List[str]] = None,
+                    aggs: Optional[Dict[str, Any]] = None,
+                    limit: Optional[int] = None):
+        payload = {k: v for k, v in {
+            'sortColumns': sort_columns,
+            'groupBy': group_by,
+            'aggs': aggs,
+            'limit': limit,
+            'filter': filter,
+        }.items() if v is not None}
+        content = await self._client.request_qipc(self._path(RestPath.TABLE_QUERY), payload)
+        return await self._client.decode(content, is_list=False)
+
+    async def search(self,
+                     vectors: Dict[str, Any],
+                     n: Optional[int] = None,
+                     index_params: Optional[Dict[str, Any]] = None,
+                     options: Optional[Dict[str, Any]] = None,
+                     filter: Optional[List[Any]] = None,
+                     sort_columns: Optional[List[str]] = None,
+                     group_by: Optional[List[str]] = None,
+                     aggs: Optional[Dict[str, Any]] = None):
+        payload = {'vectors': vectors, **{k: v for k, v in {
+            'n': n,
+            'indexParams': index_params,
+            'options': options,
+            'sortColumns': sort_columns,
+            'groupBy': group_by,
+            'aggs': aggs,
+            'filter': filter,
+        }.items() if v is not None}}
+        content = await self._client.request_qipc(self._path(RestPath.TABLE_SEARCH), payload)
+        return await self._client.decode(content, is_list=True)
+
+    async def info(self) -> Dict[str, Any]:
+        return await self._client.request_json("GET", self._path(RestPath.TABLE_INFO_GET))
+
+
+class AsyncKDBAIClient:
+    """
+    Native asyncio client for the KDB.AI REST API on a pooled httpx connection set.
+
+    Up to `pool_size` keep-alive connections are shared by all concurrent calls, with HTTP/2
+    multiplexing over https when the h2 package is installed. Requests and responses use the same
+    encodings as kdbai_client: JSON requests, and q IPC responses decoded with pykx.
+    """
+
+    def __init__(self, config: KDBAIConfig):
+        headers = {}
+        if config.password:
+            credentials = f"{config.username}:{config.password.get_secret_value()}"
+            headers['Authorization'] = "Basic " + b64encode(credentials.encode("utf-8")).decode("ascii")
+        timeout = max(config.query_timeout, config.search_timeout)
+        self.endpoint = f"{config.rest_protocol}://{config.host}:{config.port}"
+        self._http = httpx.AsyncClient(
+            base_url=self.endpoint,
+            headers=headers,
+            http2=_http2_available(),
+            limits=httpx.Limits(max_connections=config.rest_pool_size,
+                                max_keepalive_connections=config.rest_pool_size),
+            timeout=httpx.Timeout(timeout if timeout > 0 else None),
+        )
+
+    async def _send(self, method: str, path: str, headers: Dict[str, str], body: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        content = None if body is None else json.dumps(body, cls=_JsonEncoder)
+        response = await self._http.request(method, path, content=content, headers=headers)
+        if response.status_code == 401:
+            raise KDBAIException("Authentication error")
+        if response.status_code != 200:
+            try:
+                error = response.json()
+                error = error.get('error', error) if isinstance(error, dict) else error
+            except ValueError:
+                error = response.text
+            raise KDBAIException(error)
+        return response
+
+    async def request_json(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Any:
+        response = await self._send(method, path, Headers.JSON_JSON if body is not None else Headers.ACCEPT_JSON, body)
+        return response.json()['result']
+
+    async def request_qipc(self, path: str, body: Dict[str, Any]) -> bytes:
+        response = await self._send("POST", path, Headers.JSON_QIPC, body)
+        return response.content
+
+    async def decode(self, content: bytes, is_list: bool):
+        if len(content) <= _INLINE_DECODE_BYTES:
+            return qipc_to_table(content, 'pd', is_list=is_list)
+        return await asyncio.to_thread(qipc_to_table, content, 'pd', is_list)
+
+    async def database_names(self) -> List[str]:
+        return await self.request_json("GET", RestPath.DATABASE_LIST)
+
+    async def table_names(self, database_name: str) -> List[str]:
+        result = await self.request_json("GET", RestPath.DATABASE_GET.format(db_name=database_name))
+        return [meta['table'] for meta in result.get('tables') or []]
+
+    async def database_info(self, database_name: str) -> Dict[str, Any]:
+        return await self.request_json("GET", RestPath.DATABASE_INFO_GET.format(db_name=database_name))
+
+    async def databases_info(self) -> Dict[str, Any]:
+        return await self.request_json("GET", RestPath.DATABASES_INFO_GET)
+
+    async def table(self, database_name: str, table_name: str) -> AsyncTable:
+        meta = await self.request_json("GET", RestPath.TABLE_GET.format(db_name=database_name, table_name=table_name))
+        return AsyncTable(self, database_name, table_name, meta)
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+# httpx clients belong to the event loop they were created on, keep one per loop
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncKDBAIClient]" = weakref.WeakKeyDictionary()
+
+
+def get_async_kdbai_client() -> AsyncKDBAIClient:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = AsyncKDBAIClient(app_settings.db)
+        _clients[loop] = client
+        logger.info(f"Async KDB.AI REST client for {client.endpoint} (HTTP/2 {'on' if _http2_available() else 'off'})")
+    return client
@@ -0,0 +1,133 @@
+import gc
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from mcp_server.server import app_settings
+
+logger = logging.getLogger(__name__)
+
+
+class _Resident:
+    def __init__(self, model: Any, size: int, load_seconds: float):
+        self.model = model
+        self.size = size
+        self.load_seconds = load_seconds
+        self.used_at = time.monotonic()
+
+
+class ModelManager:
+    """
+    Loaded embedding models, unloaded least recently used first beyond a memory budget.
+
+    Models are keyed by provider, model name and loading options. A model is loaded once, also
+    when several calls ask for it at the same time, and its loader reports its resident size.
+    When the loaded models add up to more than `max_bytes` the least recently used ones are
+    unloaded; the model just loaded always stays. A budget <= 0 keeps every model.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes if max_bytes > 0 else None
+        self._models: "OrderedDict[Tuple[str, str, Hashable], _Resident]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[Tuple[str, str, Hashable], threading.Lock] = {}
+        self._evictions = 0
+
+    def get(self, provider: str, model_name: str, options: Hashable,
+            loader: Callable[[], Tuple[Any, int]]) -> Any:
+        """The loaded model, loading it with `loader`, which returns the model and its size in bytes."""
+        key = (provider, model_name, options)
+        with self._lock:
+            resident = self._touch(key)
+            if resident is not None:
+                return resident.model
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        with loading:
+            with self._lock:
+                resident = self._touch(key)
+                if resident is not None:
+                    return resident.model
+            start = time.perf_counter()
+            try:
+                model, size = loader()
+            except BaseException:
+                with self._lock:
+                    self._loading.pop(key, None)
+                raise
+            resident = _Resident(model, size, time.perf_counter() - start)
+            logger.info(f"Loaded {provider} model {model_name} {options or ''}: {size / 2**20:.1f} MB in {resident.load_seconds:.1f}s")
+            with self._lock:
+                self._models[key] = resident
+                self._loading.pop(key, None)
+                evicted = self._evict_over_budget()
+        if evicted:
+            gc.collect()
+        return model
+
+    def _touch(self, key) -> Optional[_Resident]:
+        resident = self._models.get(key)
+        if resident is not None:
+            resident.used_at = time.monotonic()
+            self._models.move_to_end(key)
+        return resident
+
+    def _evict_over_budget(self) -> int:
+        evicted = 0
+        while self.max_bytes is not None and len(self._models) > 1 and self.resident_bytes() > self.max_bytes:
+            (provider, model_name, options), resident = self._models.popitem(last=False)
+            self._evictions += 1
+            evicted += 1
+            logger.info(f"Unloaded {provider} model {model_name} {options or ''} ({resident.size / 2**20:.1f} MB), "
+                        f"over the {self.max_bytes / 2**20:.0f} MB model budget")
+        return evicted
+
+    def resident_bytes(self) -> int:
+        return sum(r.size for r in self._models.values())
+
+    def unload(self, provider: Optional[str] = None) -> int:
+        """Unload the models of a provider, or all models. Returns the number unloaded."""
+        with self._lock:
+            keys = [k for k in self._models if provider is None or k[0] == provider]
+            for key in keys:
+                del self._models[key]
+        if keys:
+            gc.collect()
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "maxBytes": self.max_bytes,
+                "residentBytes": self.resident_bytes(),
+                "evictions": self._evictions,
+                # Most recently used first
+                "models": [{
+                    "provider": provider,
+                    "model": model_name,
+                    "options": options,
+                    "bytes": resident.size,
+                    "loadSeconds": round(resident.load_seconds, 2),
+                    "idleSeconds": round(now - resident.used_at, 1),
+                } for (provider, model_name, options), resident in reversed(self._models.items())],
+            }
+
+
+def torch_model_bytes(model: Any) -> int:
+    """Bytes of a torch module's parameters and buffers, including dynamically quantized weights."""
+    def size(value: Any) -> int:
+        if isinstance(value, (tuple, list)):
+            return sum(size(v) for v in value)
+        if hasattr(value, "element_size") and hasattr(value, "nelement"):
+            return value.element_size() * value.nelement()
+        return 0
+    return sum(size(value) for value in model.state_dict().values())
+
+
+@lru_cache()
+def get_model_manager() -> ModelManager:
+    return ModelManager(int(app_settings.db.embedding_model_memory_mb * 1024 * 1024))
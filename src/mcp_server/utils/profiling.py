@@ -0,0 +1,68 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+
+class QueryProfile:
+    """Wall-clock time per stage and cache outcomes of one tool call."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.caches: Dict[str, bool] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def to_dict(self, rows: Optional[int], size: Optional[int]) -> Dict[str, Any]:
+        return {
+            "totalMs": round((time.perf_counter() - self.started_at) * 1000, 2),
+            "stagesMs": {stage: round(seconds * 1000, 2) for stage, seconds in self.stages.items()},
+            "rows": rows,
+            "bytes": size,
+            "cacheHits": dict(self.caches),
+        }
+
+
+# Profile of the tool call being run, copied into the tasks and threads it starts
+_current: ContextVar[Optional[QueryProfile]] = ContextVar("kdbai_query_profile", default=None)
+
+
+@contextmanager
+def profiling(enabled: bool) -> Iterator[Optional[QueryProfile]]:
+    """Profile the stages run inside the block, yields None when profiling is off."""
+    if not enabled:
+        yield None
+        return
+    profile = QueryProfile()
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    profile = _current.get()
+    if profile is not None:
+        profile.add(stage, seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as a stage of the current profile, if any."""
+    if _current.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def note_cache(name: str, hit: bool) -> None:
+    profile = _current.get()
+    if profile is not None:
+        profile.caches[name] = hit
@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from mcp_server.server import app_settings
+from mcp_server.utils.embeddings import get_provider
+from mcp_server.utils.embeddings_helpers import embed_query
+from mcp_server.utils.profiling import note_cache
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    def __init__(self, text: str):
+        self.text = text
+        # (kind, provider, model) -> dense or sparse query vector
+        self.vectors: Dict[Tuple[str, str, str], Any] = {}
+        self.used_at = time.monotonic()
+
+
+class QueryHandleStore:
+    """
+    Bounded store of query texts and the vectors computed for them, addressed by opaque handles.
+
+    A handle is derived from the query text, so the same text always gets the same handle. Vectors
+    are kept per provider and model, which lets one handle serve every table and index: a vector
+    that is missing is computed from the stored text once. Entries expire `ttl` seconds after their
+    last use and the least recently used entries are evicted beyond `capacity`.
+    """
+
+    def __init__(self, capacity: int, ttl: float):
+        self.capacity = max(1, capacity)
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def handle_for(text: str) -> str:
+        return "qh_" + hashlib.sha256(text.encode("utf-8")).hexdigest()[:24]
+
+    def _get(self, handle: str) -> Optional[_Entry]:
+        entry = self._entries.get(handle)
+        if entry is None:
+            return None
+        if self.ttl > 0 and time.monotonic() - entry.used_at > self.ttl:
+            del self._entries[handle]
+            return None
+        entry.used_at = time.monotonic()
+        self._entries.move_to_end(handle)
+        return entry
+
+    def register(self, text: str) -> str:
+        handle = self.handle_for(text)
+        with self._lock:
+            if self._get(handle) is None:
+                self._entries[handle] = _Entry(text)
+                while len(self._entries) > self.capacity:
+                    self._entries.popitem(last=False)
+        return handle
+
+    def text(self, handle: str) -> Optional[str]:
+        with self._lock:
+            entry = self._get(handle)
+            return None if entry is None else entry.text
+
+    def get_vector(self, handle: str, kind: str, provider: str, model: str) -> Any:
+        with self._lock:
+            entry = self._get(handle)
+            return None if entry is None else entry.vectors.get((kind, provider, model))
+
+    def put_vector(self, handle: str, kind: str, provider: str, model: str, vector: Any) -> None:
+        with self._lock:
+            entry = self._get(handle)
+            if entry is not None:
+                entry.vectors[(kind, provider, model)] = vector
+
+
+@lru_cache()
+def get_query_handles() -> QueryHandleStore:
+    db_config = app_settings.db
+    return QueryHandleStore(db_config.query_handle_entries, db_config.query_handle_ttl)
+
+
+def resolve_query(query: Optional[str], query_handle: Optional[str]) -> Tuple[str, str]:
+    """
+    Query text and handle of a search. A valid handle takes precedence over the text,
+    otherwise the text is registered and its handle returned.
+    """
+    store = get_query_handles()
+    if query_handle:
+        text = store.text(query_handle)
+        if text is not None:
+            return text, query_handle
+        if not query:
+            raise ValueError(f"query_handle '{query_handle}' is unknown or expired, pass the query text instead")
+        logger.info(f"query_handle '{query_handle}' is unknown or expired, embedding the query text")
+    if not query:
+        raise ValueError("Either query or query_handle is required")
+    return query, store.register(query)
+
+
+async def dense_query_vector(handle: str, text: str, provider_name: str, model_name: str):
+    """Dense vector of a query, computed once per handle, provider and model."""
+    store = get_query_handles()
+    vector = store.get_vector(handle, "dense", provider_name, model_name)
+    note_cache("queryHandle", vector is not None)
+    if vector is None:
+        vector = await embed_query(provider_name, model_name, text)
+        store.put_vector(handle, "dense", provider_name, model_name, vector)
+    return vector
+
+
+async def sparse_query_vector(handle: str, text: str, provider_name: str, model_name: str):
+    """Sparse vector of a query, computed once per handle, provider and model."""
+    store = get_query_handles()
+    vector = store.get_vector(handle, "sparse", provider_name, model_name)
+    if vector is None:
+        vector = await get_provider(provider_name).sparse_embed(text, model_name)
+        store.put_vector(handle, "sparse", provider_name, model_name, vector)
+    return vector
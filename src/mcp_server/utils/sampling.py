@@ -0,0 +1,184 @@
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from mcp_server.utils.kdbai import kdbai_call
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_TYPES = {"uint8", "int16", "int32", "int64", "float32", "float64"}
+TEMPORAL_TYPES = {"datetime64[ns]", "datetime64[M]", "datetime64[D]",
+                  "timedelta64[ns]", "timedelta64[m]", "timedelta64[s]", "timedelta64[ms]"}
+ORDERABLE_TYPES = NUMERIC_TYPES | TEMPORAL_TYPES
+
+# Number of sub-windows a value window is split into when it holds too many rows to fetch
+_WINDOWS = 8
+# Rows fetched relative to the rows sampled from a window
+_OVERSAMPLE = 2.0
+# Rows a window may hold and still be fetched whole, whatever its share of the sample
+_FETCH_ROWS = 1000
+# Most KDB.AI queries one sample may issue, counts and fetches included
+MAX_QUERIES = 64
+# Most strata a stratified sample may draw from, each needs a query besides the grouped count
+MAX_STRATA = MAX_QUERIES - 1
+
+
+def pick_order_column(schema: List[Dict[str, str]], exclude: set) -> Optional[Dict[str, str]]:
+    """First temporal column, else first numeric column, to draw value windows on."""
+    candidates = [c for c in schema if c['name'] not in exclude]
+    for types in (TEMPORAL_TYPES, NUMERIC_TYPES):
+        for c in candidates:
+            if c['type'] in types:
+                return c
+    return None
+
+
+def _to_number(value: Any) -> float:
+    if isinstance(value, (datetime, np.datetime64)):
+        return float(pd.Timestamp(value).value)
+    if isinstance(value, (timedelta, np.timedelta64)):
+        return float(pd.Timedelta(value).value)
+    return float(value)
+
+
+def _from_number(value: float, col_type: str) -> Any:
+    # Rounded down, python datetimes carry microseconds. Windows share their edges, so rounding
+    # only moves rows between neighbouring windows and never drops or repeats them.
+    if col_type.startswith("datetime64"):
+        return pd.Timestamp(int(value) // 1000 * 1000).to_pydatetime()
+    if col_type.startswith("timedelta64"):
+        return pd.Timedelta(int(value) // 1000 * 1000).to_pytimedelta()
+    if col_type.startswith(("int", "uint")):
+        return int(np.floor(value))
+    return float(value)
+
+
+def _window(column: Dict[str, str], start: Any, end: Any) -> List[List[Any]]:
+    """Filters of the half-open window [start, end), an edge of None leaves that side open."""
+    conditions = []
+    if start is not None:
+        conditions.append([">=", column['name'], start])
+    if end is not None:
+        conditions.append(["<", column['name'], end])
+    return conditions
+
+
+def _edges(column: Dict[str, str], lo: float, hi: float) -> List[Any]:
+    """Values splitting [lo, hi] into up to _WINDOWS windows of equal width, fewer at the column's resolution."""
+    edges = []
+    for x in np.linspace(lo, hi, _WINDOWS + 1)[1:-1]:
+        edge = _from_number(x, column['type'])
+        if _to_number(edge) > lo and (not edges or edge > edges[-1]):
+            edges.append(edge)
+    return edges
+
+
+def _fetch_limit(k: int) -> int:
+    return max(_FETCH_ROWS, int(np.ceil(k * _OVERSAMPLE)))
+
+
+def _subsample(df: pd.DataFrame, k: int, rng: np.random.Generator) -> pd.DataFrame:
+    if len(df) <= k:
+        return df
+    return df.iloc[np.sort(rng.choice(len(df), k, replace=False))]
+
+
+def sample_rows(table,
+                size: int,
+                rng: np.random.Generator,
+                order_column: Optional[Dict[str, str]],
+                filters: Optional[List[Any]] = None,
+                aggs: Optional[Dict[str, Any]] = None,
+                max_queries: int = MAX_QUERIES) -> Tuple[pd.DataFrame, str]:
+    """
+    Uniform random sample of up to `size` rows without transferring the table.
+
+    The value range of order_column is split into half-open windows and the rows in each are
+    counted. The sample is spread over the windows as a uniform draw of row positions would spread
+    it, so dense windows get more rows. Windows holding more rows than can be fetched at once are
+    split again, the others are fetched whole and sampled. At most `max_queries` queries are sent:
+    once they run out, the remaining windows are sampled from their first rows. Small tables are
+    fetched whole and subsampled. Without an orderable column the first rows are returned.
+
+    Returns the sample and the method used: 'full', 'windows' or 'head'.
+    """
+    filters = list(filters or [])
+    if size <= 0:
+        return pd.DataFrame(), "full"
+
+    if order_column is None:
+        return kdbai_call(table.query, filter=filters or None, aggs=aggs, limit=size), "head"
+
+    if max_queries < 2:
+        # No query to spare for counting, sample from the first rows
+        limit = _fetch_limit(size)
+        df = kdbai_call(table.query, filter=filters or None, aggs=aggs, limit=limit)
+        return _subsample(df, size, rng).reset_index(drop=True), "full" if len(df) < limit else "head"
+
+    name = order_column['name']
+    bounds = kdbai_call(table.query, filter=filters or None,
+                        aggs={"n": ["count", name], "lo": ["min", name], "hi": ["max", name]}).iloc[0]
+    count = int(bounds["n"])
+    queries = 1
+
+    def count_rows(start: Any, end: Any) -> int:
+        result = kdbai_call(table.query, filter=filters + _window(order_column, start, end), aggs={"n": ["count", name]})
+        return int(result["n"].iloc[0])
+
+    # Windows left to sample from: (start, end, numeric lo, numeric hi, rows in it, rows to sample)
+    lo = hi = None
+    if count > _fetch_limit(size) and not pd.isna(bounds["lo"]):
+        lo, hi = _to_number(bounds["lo"]), _to_number(bounds["hi"])
+    pending = deque([(None, None, lo, hi, count, size)])
+    frames: List[pd.DataFrame] = []
+    split = truncated = False
+    while pending:
+        start, end, lo, hi, rows, k = pending.popleft()
+        limit = _fetch_limit(k)
+        edges = _edges(order_column, lo, hi) if rows > limit and lo is not None else []
+        # Counting the sub-windows and fetching from each must leave a query for every pending window
+        if edges and queries + len(pending) + 2 * (len(edges) + 1) <= max_queries:
+            points = [start, *edges, end]
+            numbers = [lo, *(_to_number(e) for e in edges), hi]
+            counts = [count_rows(points[i], points[i + 1]) for i in range(len(edges) + 1)]
+            queries += len(counts)
+            takes = rng.multivariate_hypergeometric(counts, min(k, sum(counts)))
+            for i, (n, take) in enumerate(zip(counts, takes)):
+                if take > 0:
+                    pending.append((points[i], points[i + 1], numbers[i], numbers[i + 1], n, int(take)))
+            split = True
+            continue
+
+        df = kdbai_call(table.query, filter=(filters + _window(order_column, start, end)) or None, aggs=aggs, limit=limit)
+        queries += 1
+        truncated = truncated or rows > limit
+        frames.append(_subsample(df, k, rng))
+
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    method = "windows" if split else "head" if truncated else "full"
+    return df.reset_index(drop=True), method
+
+
+def stratum_sizes(counts: Dict[Any, int], size: int, allocation: str) -> Dict[Any, int]:
+    """Split a sample size across strata, proportionally to their row counts or equally."""
+    strata = [k for k, n in counts.items() if n > 0]
+    if not strata:
+        return {}
+    if allocation == "equal":
+        shares = {k: size / len(strata) for k in strata}
+    else:
+        total = sum(counts[k] for k in strata)
+        shares = {k: size * counts[k] / total for k in strata}
+    # Largest remainder rounding so the sizes add up to the sample size
+    sizes = {k: min(int(s), counts[k]) for k, s in shares.items()}
+    remaining = size - sum(sizes.values())
+    for k in sorted(strata, key=lambda k: shares[k] - int(shares[k]), reverse=True):
+        if remaining <= 0:
+            break
+        if sizes[k] < counts[k]:
+            sizes[k] += 1
+            remaining -= 1
+    return sizes
@@ -0,0 +1,143 @@
+import json
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from mcp_server.server import app_settings
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(database: str, table: str, index: str, **params: Any) -> Tuple[str, str, str, str]:
+    """Build the cache key for a search, every parameter other than the query vector is part of it."""
+    return database, table, index, json.dumps(params, sort_keys=True, default=str)
+
+
+class _Bucket:
+    """Ring buffer of unit-normalised query vectors and the results they produced."""
+
+    def __init__(self, dims: int, capacity: int):
+        self.vectors = np.zeros((capacity, dims), dtype=np.float32)
+        self.created_at = np.zeros(capacity, dtype=np.float64)
+        self.results: List[Any] = [None] * capacity
+        self.size = 0
+        self.next = 0
+
+    def add(self, vector: np.ndarray, result: Any) -> None:
+        slot = self.next
+        self.vectors[slot] = vector
+        self.created_at[slot] = time.monotonic()
+        self.results[slot] = result
+        self.next = (slot + 1) % len(self.results)
+        self.size = min(self.size + 1, len(self.results))
+
+
+class SemanticCache:
+    """
+    Search result cache matched on query-vector similarity rather than on query text.
+
+    Recent query vectors are kept per (database, table, index, search parameters) in a flat
+    NumPy matrix. A lookup computes cosine similarity against every cached vector of its key
+    and returns the result of the closest one if it is at or above `threshold`. Entries expire
+    after `ttl` seconds, and all entries of a table are dropped when its row count is seen to change.
+    """
+
+    def __init__(self, threshold: float, capacity: int, ttl: float):
+        self.threshold = threshold
+        self.capacity = max(1, capacity)
+        self.ttl = ttl
+        self._buckets: Dict[Tuple[str, str, str, str], _Bucket] = {}
+        self._row_counts: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._invalidations = 0
+        self._similarity_total = 0.0
+
+    @staticmethod
+    def _normalise(vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def lookup(self, key: Tuple[str, str, str, str], vector: np.ndarray) -> Optional[Tuple[Any, float, float]]:
+        """Return (result, similarity, age in seconds) of the closest fresh cached query, or None on a miss."""
+        query = self._normalise(vector)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or bucket.size == 0 or bucket.vectors.shape[1] != query.shape[0]:
+                self._misses += 1
+                return None
+
+            similarities = bucket.vectors[:bucket.size] @ query
+            ages = time.monotonic() - bucket.created_at[:bucket.size]
+            candidates = np.where(ages < self.ttl, similarities, -np.inf) if self.ttl > 0 else similarities
+            best = int(np.argmax(candidates))
+
+            if candidates[best] >= self.threshold:
+                self._hits += 1
+                self._similarity_total += float(candidates[best])
+                return bucket.results[best], float(candidates[best]), float(ages[best])
+            if similarities.max() >= self.threshold:
+                # A close enough query exists but its result is too old to serve
+                self._stale += 1
+            self._misses += 1
+            return None
+
+    def store(self, key: Tuple[str, str, str, str], vector: np.ndarray, result: Any) -> None:
+        query = self._normalise(vector)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or bucket.vectors.shape[1] != query.shape[0]:
+                bucket = self._buckets[key] = _Bucket(query.shape[0], self.capacity)
+            bucket.add(query, result)
+
+    def invalidate_table(self, database: str, table: str) -> None:
+        with self._lock:
+            keys = [k for k in self._buckets if k[0] == database and k[1] == table]
+            for k in keys:
+                del self._buckets[k]
+            if keys:
+                self._invalidations += 1
+                logger.debug(f"Semantic cache invalidated for table {database}.{table}")
+
+    def observe_row_count(self, database: str, table: str, row_count: int) -> None:
+        """Record a table's row count as reported by KDB.AI, a change invalidates its cached results."""
+        with self._lock:
+            previous = self._row_counts.get((database, table))
+            self._row_counts[(database, table)] = row_count
+        if previous is not None and previous != row_count:
+            self.invalidate_table(database, table)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hitRate": self._hits / lookups if lookups else 0.0,
+                "staleMisses": self._stale,
+                "avgHitSimilarity": self._similarity_total / self._hits if self._hits else None,
+                "invalidations": self._invalidations,
+                "keys": len(self._buckets),
+                "entries": sum(b.size for b in self._buckets.values()),
+                "threshold": self.threshold,
+                "ttl": self.ttl,
+            }
+
+
+@lru_cache()
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """Return the semantic result cache, or None when it is disabled."""
+    db_config = app_settings.db
+    if not db_config.semantic_cache:
+        return None
+    return SemanticCache(
+        threshold=db_config.semantic_cache_threshold,
+        capacity=db_config.semantic_cache_entries,
+        ttl=db_config.semantic_cache_ttl,
+    )
@@ -0,0 +1,95 @@
+import datetime
+import logging
+from functools import lru_cache
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pydantic_core
+from mcp_server.server import app_settings
+from mcp_server.utils.profiling import QueryProfile
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache()
+def _orjson():
+    try:
+        import orjson
+    except ImportError:
+        logger.warning("fast_json is enabled but orjson is not installed, using the default JSON encoding. "
+                       "Add orjson in the pyproject.toml")
+        return None
+    return orjson
+
+
+def fast_json_enabled() -> bool:
+    """True when tool responses are serialized with orjson."""
+    return app_settings.mcp.fast_json and _orjson() is not None
+
+
+def frame_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Records of a DataFrame with values left as numpy scalars and arrays, which orjson serializes natively.
+    Unlike to_dict('records') no value is boxed into a Python object.
+    """
+    columns = [str(c) for c in df.columns]
+    arrays = [df[c].to_numpy() for c in df.columns]
+    return [dict(zip(columns, row)) for row in zip(*arrays)]
+
+
+def _default(value: Any) -> Any:
+    # Called by orjson for the types it does not serialize itself
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    if value is pd.NaT:
+        return None
+    if isinstance(value, np.ndarray):
+        # Non-contiguous arrays and dtypes orjson does not support
+        return value.tolist()
+    if isinstance(value, (pd.Timedelta, np.timedelta64)):
+        # Same rendering as normalized timespan columns: time of day
+        return (pd.Timestamp("1970-01-01") + pd.Timedelta(value)).time().isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+def _dumps_bytes(obj: Any) -> bytes:
+    orjson = _orjson()
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    return orjson.dumps(obj, default=_default, option=options)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize a tool response with orjson, including numpy arrays, numpy scalars and datetimes."""
+    return _dumps_bytes(obj).decode("utf-8")
+
+
+def to_tool_result(response: Dict[str, Any], profile: Optional[QueryProfile] = None) -> Any:
+    """
+    The response as pre-serialized JSON text when fast_json is enabled, otherwise unchanged.
+    With a profile, the response gets a 'profile' entry including the time and size of its serialization.
+    Without fast_json FastMCP serializes the response itself, the profile then measures the same encoding.
+    """
+    if not fast_json_enabled():
+        if profile is not None:
+            start = time.perf_counter()
+            size = len(pydantic_core.to_json(response, fallback=str))
+            profile.add("serialization", time.perf_counter() - start)
+            response = {**response, "profile": profile.to_dict(response.get("recordsCount"), size)}
+        return response
+
+    start = time.perf_counter()
+    body = _dumps_bytes(response)
+    if profile is None:
+        return body.decode("utf-8")
+    profile.add("serialization", time.perf_counter() - start)
+    # Splice the profile in as the last entry rather than encoding the records a second time
+    entry = b'"profile":' + _dumps_bytes(profile.to_dict(response.get("recordsCount"), len(body)))
+    return (body[:-1] + (b"," if len(body) > 2 else b"") + entry + b"}").decode("utf-8")
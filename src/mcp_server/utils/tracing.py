@@ -0,0 +1,55 @@
+import json
+import logging
+import os
+import time
+from typing import Any, Dict
+
+from mcp.server.fastmcp import FastMCP
+
+logger = logging.getLogger(__name__)
+
+
+class ToolCallTrace:
+    """
+    Append-only JSON Lines file of tool calls, one {"ts", "tool", "arguments", "ms", "error"} object per line.
+
+    Each record is written with a single write on a file opened in append mode, so the workers forked
+    by the supervisor share the file without interleaving their lines.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        logger.info(f"Recording tool calls to {path}")
+
+    def record(self, tool: str, arguments: Dict[str, Any], started_at: float, seconds: float, error: bool) -> None:
+        line = json.dumps({
+            "ts": round(started_at, 6),
+            "tool": tool,
+            "arguments": arguments,
+            "ms": round(seconds * 1000, 2),
+            "error": error,
+        }, default=str)
+        try:
+            os.write(self._fd, (line + "\n").encode("utf-8"))
+        except OSError as e:
+            logger.warning(f"Failed to record tool call to {self.path}: {e}")
+
+
+class TracingFastMCP(FastMCP):
+    """FastMCP server recording every tool call it runs, with its arguments, to a trace file for replay."""
+
+    def __init__(self, *args: Any, trace_path: str, **kwargs: Any):
+        self.trace = ToolCallTrace(trace_path)
+        super().__init__(*args, **kwargs)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]):
+        started_at = time.time()
+        start = time.perf_counter()
+        error = True
+        try:
+            result = await super().call_tool(name, arguments)
+            error = False
+            return result
+        finally:
+            self.trace.record(name, arguments, started_at, time.perf_counter() - start, error)
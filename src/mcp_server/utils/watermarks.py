@@ -0,0 +1,76 @@
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Optional, Tuple
+
+from mcp_server.server import app_settings
+
+logger = logging.getLogger(__name__)
+
+
+class _Cursor:
+    def __init__(self, target: Tuple[str, str, str], watermark: Any):
+        # (database, table, time column) the watermark applies to
+        self.target = target
+        self.watermark = watermark
+        self.used_at = time.monotonic()
+
+
+class WatermarkStore:
+    """
+    Bounded store of polling cursors, each holding the watermark a client has read a table up to.
+
+    A cursor belongs to one database, table and time column. Its watermark only moves forward,
+    so a late response to an earlier poll cannot make the next poll read rows again. Cursors expire
+    `ttl` seconds after their last use and the least recently used ones are evicted beyond `capacity`.
+    """
+
+    def __init__(self, capacity: int, ttl: float):
+        self.capacity = max(1, capacity)
+        self.ttl = ttl
+        self._cursors: "OrderedDict[str, _Cursor]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, cursor: str) -> Optional[_Cursor]:
+        entry = self._cursors.get(cursor)
+        if entry is None:
+            return None
+        if self.ttl > 0 and time.monotonic() - entry.used_at > self.ttl:
+            del self._cursors[cursor]
+            return None
+        entry.used_at = time.monotonic()
+        self._cursors.move_to_end(cursor)
+        return entry
+
+    def create(self, target: Tuple[str, str, str], watermark: Any) -> str:
+        cursor = "wm_" + secrets.token_hex(12)
+        with self._lock:
+            self._cursors[cursor] = _Cursor(target, watermark)
+            while len(self._cursors) > self.capacity:
+                self._cursors.popitem(last=False)
+        return cursor
+
+    def get(self, cursor: str) -> Optional[Tuple[Tuple[str, str, str], Any]]:
+        """Target and watermark of a cursor, None when it is unknown or expired."""
+        with self._lock:
+            entry = self._get(cursor)
+            return None if entry is None else (entry.target, entry.watermark)
+
+    def advance(self, cursor: str, watermark: Any) -> Any:
+        """Move a cursor to watermark if that is later, and return its watermark."""
+        with self._lock:
+            entry = self._get(cursor)
+            if entry is None:
+                return watermark
+            if watermark is not None and (entry.watermark is None or watermark > entry.watermark):
+                entry.watermark = watermark
+            return entry.watermark
+
+
+@lru_cache()
+def get_watermarks() -> WatermarkStore:
+    db_config = app_settings.db
+    return WatermarkStore(db_config.watermark_cursor_entries, db_config.watermark_cursor_ttl)